@@ -0,0 +1,686 @@
+import re
+import json
+import zlib
+import bittensor as bt
+from enum import Enum
+from typing import Any, List, Optional, Tuple
+from datura.stream_budget import StreamMemoryBudget
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Outside of a string only braces and quotes change the state, inside of a string only quotes and escapes do.
+STRUCTURE_PATTERN = re.compile(rb'[{}"]')
+STRING_PATTERN = re.compile(rb'["\\]')
+
+# Miners serialize the event type as the first key, so it can be read without decoding the frame.
+TYPE_PATTERN = re.compile(rb'\s*\{\s*"type"\s*:\s*"([^"\\]*)"')
+
+# The same for msgpack: a map header followed by the fixstr key "type".
+MSGPACK_TYPE_KEY = b"\xa4type"
+
+OPEN_BRACE = ord("{")
+QUOTE = ord('"')
+
+LENGTH_PREFIX_SIZE = 4
+
+# The highest bit of a length prefix marks a compressed frame.
+COMPRESSED_FLAG = 1 << (LENGTH_PREFIX_SIZE * 8 - 1)
+
+# Events smaller than this are not worth compressing, text tokens never are.
+COMPRESSION_THRESHOLD = 4 * 1024
+
+# Frames that decompress to more than this are dropped.
+MAX_DECOMPRESSED_SIZE = 64 * 1024 * 1024
+
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+FRAMING_EVENT_TYPE = "framing"
+
+
+class StreamFraming(str, Enum):
+    # Bare concatenated JSON objects, understood by every validator and miner version.
+    CONCATENATED = "concatenated"
+    # One JSON object per line.
+    NDJSON = "ndjson"
+    # Every JSON object preceded by its size as a 4-byte big-endian integer.
+    LENGTH_PREFIXED = "length_prefixed"
+
+
+class StreamEncoding(str, Enum):
+    JSON = "json"
+    # Binary, only sent with length-prefixed framing. Needs the msgpack package on both sides.
+    MSGPACK = "msgpack"
+
+
+class StreamCompression(str, Enum):
+    NONE = "none"
+    GZIP = "gzip"
+    # Needs the zstandard package on both sides.
+    ZSTD = "zstd"
+
+
+def get_stream_framing(value: Optional[str]) -> StreamFraming:
+    """Framing requested by a validator, unknown or missing values fall back to concatenated JSON."""
+    try:
+        return StreamFraming(value)
+    except ValueError:
+        return StreamFraming.CONCATENATED
+
+
+def get_stream_encoding(value: Optional[str]) -> StreamEncoding:
+    """Encoding requested by a validator, falls back to JSON when it's unknown or msgpack is not installed."""
+    try:
+        encoding = StreamEncoding(value)
+    except ValueError:
+        return StreamEncoding.JSON
+
+    if encoding == StreamEncoding.MSGPACK and msgpack is None:
+        return StreamEncoding.JSON
+
+    return encoding
+
+
+def get_stream_compression(value: Optional[str]) -> StreamCompression:
+    """Compression requested by a validator, zstd falls back to gzip when zstandard is not installed."""
+    try:
+        compression = StreamCompression(value)
+    except ValueError:
+        return StreamCompression.NONE
+
+    if compression == StreamCompression.ZSTD and zstandard is None:
+        return StreamCompression.GZIP
+
+    return compression
+
+
+def negotiate_stream_format(
+    framing: Optional[str],
+    encoding: Optional[str],
+    compression: Optional[str] = None,
+) -> Tuple[StreamFraming, StreamEncoding, StreamCompression]:
+    """
+    Framing, encoding and compression a miner answers with.
+    Binary and compressed frames can only be delimited by a length prefix.
+    """
+    stream_framing = get_stream_framing(framing)
+    stream_encoding = get_stream_encoding(encoding)
+    stream_compression = get_stream_compression(compression)
+
+    if (
+        stream_encoding == StreamEncoding.MSGPACK
+        or stream_compression != StreamCompression.NONE
+    ):
+        stream_framing = StreamFraming.LENGTH_PREFIXED
+
+    return stream_framing, stream_encoding, stream_compression
+
+
+def compress(body: bytes, compression: StreamCompression) -> bytes:
+    if compression == StreamCompression.ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(body)
+
+    compressor = zlib.compressobj(level=6, wbits=GZIP_WBITS)
+    return compressor.compress(body) + compressor.flush()
+
+
+def encode_frame(
+    data: Any,
+    framing: StreamFraming = StreamFraming.CONCATENATED,
+    encoding: StreamEncoding = StreamEncoding.JSON,
+    compression: StreamCompression = StreamCompression.NONE,
+) -> bytes:
+    if encoding == StreamEncoding.MSGPACK:
+        body = msgpack.packb(data, use_bin_type=True)
+    else:
+        body = json.dumps(data).encode("utf-8")
+
+    if framing == StreamFraming.NDJSON:
+        return body + b"\n"
+
+    if framing == StreamFraming.LENGTH_PREFIXED:
+        header = 0
+
+        if (
+            compression != StreamCompression.NONE
+            and len(body) >= COMPRESSION_THRESHOLD
+        ):
+            body = compress(body, compression)
+            header = COMPRESSED_FLAG
+
+        return (header | len(body)).to_bytes(LENGTH_PREFIX_SIZE, "big") + body
+
+    return body
+
+
+def encode_framing_event(
+    framing: StreamFraming,
+    encoding: StreamEncoding = StreamEncoding.JSON,
+    compression: StreamCompression = StreamCompression.NONE,
+) -> bytes:
+    """
+    Announces the framing, encoding and compression of the following frames. It is always sent
+    as bare JSON, so validators that don't know about framing still parse (and ignore) it.
+    """
+    event = {"type": FRAMING_EVENT_TYPE, "content": framing.value}
+
+    if encoding != StreamEncoding.JSON:
+        event["encoding"] = encoding.value
+
+    if compression != StreamCompression.NONE:
+        event["compression"] = compression.value
+
+    return json.dumps(event).encode("utf-8")
+
+
+def read_msgpack_type(raw) -> Optional[str]:
+    """Type of a msgpack event whose first key is "type", read from its first bytes."""
+    head = bytes(raw[:16])
+
+    if not head:
+        return None
+
+    marker = head[0]
+
+    if 0x80 <= marker <= 0x8F:
+        position = 1
+    elif marker == 0xDE:
+        position = 3
+    elif marker == 0xDF:
+        position = 5
+    else:
+        return None
+
+    if head[position : position + len(MSGPACK_TYPE_KEY)] != MSGPACK_TYPE_KEY:
+        return None
+
+    position += len(MSGPACK_TYPE_KEY)
+
+    if position >= len(head):
+        return None
+
+    marker = head[position]
+
+    if 0xA0 <= marker <= 0xBF:
+        length = marker & 0x1F
+        position += 1
+    elif marker == 0xD9 and position + 1 < len(head):
+        length = head[position + 1]
+        position += 2
+    else:
+        return None
+
+    value = bytes(raw[position : position + length])
+
+    if len(value) != length:
+        return None
+
+    return value.decode("utf-8", errors="ignore")
+
+
+class OversizedFrameError(ValueError):
+    pass
+
+
+class Decompressor:
+    """
+    Decompresses one frame as its bytes arrive. Output is produced in bounded steps, so a frame is
+    rejected as soon as it decompresses to more than `max_size` bytes instead of being inflated whole.
+    """
+
+    def __init__(
+        self,
+        compression: StreamCompression,
+        size: int,
+        max_size: int = MAX_DECOMPRESSED_SIZE,
+    ):
+        self.decompressor = None
+        self.writer = None
+
+        if compression == StreamCompression.ZSTD and zstandard is not None:
+            # zstd objects can't limit their output, the writer hands it over in chunks instead.
+            self.writer = zstandard.ZstdDecompressor().stream_writer(self)
+        else:
+            self.decompressor = zlib.decompressobj(wbits=GZIP_WBITS)
+
+        self.remaining = size
+        self.max_size = max_size
+        self.output = bytearray()
+        self.error = None
+        self.is_oversized = False
+
+    def write(self, data: bytes) -> int:
+        """Receives the output of the zstd writer."""
+        self.append(data)
+        return len(data)
+
+    def append(self, data: bytes):
+        self.output += data
+
+        if len(self.output) > self.max_size:
+            raise OversizedFrameError(
+                f"frame decompresses to more than {self.max_size} bytes"
+            )
+
+    def feed(self, data: bytes):
+        self.remaining -= len(data)
+
+        if self.error is not None:
+            return
+
+        try:
+            if self.writer is not None:
+                self.writer.write(data)
+            else:
+                while data:
+                    # One byte over the limit is enough to reject the frame.
+                    max_length = self.max_size - len(self.output) + 1
+                    self.append(self.decompressor.decompress(data, max_length))
+                    data = self.decompressor.unconsumed_tail
+        except OversizedFrameError as e:
+            self.is_oversized = True
+            self.error = e
+            self.output = bytearray()
+        except Exception as e:
+            # zlib.error or zstandard.ZstdError
+            self.error = e
+
+
+class Frame:
+    """
+    A complete frame of the miner stream that is decoded only when its data is needed.
+    JSON frames can be forwarded as they were received, without decoding and encoding them again.
+    """
+
+    __slots__ = ("raw", "encoding", "log_prefix", "_type", "_data", "_is_decoded")
+
+    def __init__(self, raw: bytes, encoding: StreamEncoding, log_prefix: str = ""):
+        # Bytes, or a memory map of the frame when it was spilled to disk.
+        self.raw = raw
+        self.encoding = encoding
+        self.log_prefix = log_prefix
+        self._type = None
+        self._data = None
+        self._is_decoded = False
+
+    @property
+    def type(self) -> Optional[str]:
+        if self._type is None:
+            if self.encoding == StreamEncoding.MSGPACK:
+                self._type = read_msgpack_type(self.raw)
+            else:
+                match = TYPE_PATTERN.match(self.raw)
+
+                if match is not None:
+                    self._type = match.group(1).decode("utf-8", errors="ignore")
+
+            # Events that don't start with their type are decoded.
+            if self._type is None and isinstance(self.data, dict):
+                self._type = self.data.get("type")
+
+        return self._type
+
+    def decode(self) -> Any:
+        """Decodes the frame without keeping the result, None if it's invalid."""
+        try:
+            if self.encoding == StreamEncoding.MSGPACK:
+                return msgpack.unpackb(self.raw, raw=False)
+
+            return json.loads(bytes(self.raw).decode("utf-8", errors="ignore"))
+        except (ValueError, TypeError) as e:
+            bt.logging.debug(
+                f"{self.log_prefix}Failed to decode frame: {e} from {self.raw[:200]}"
+            )
+            return None
+
+    @property
+    def data(self) -> Any:
+        """Decoded frame, None if it's invalid."""
+        if not self._is_decoded:
+            self._is_decoded = True
+            self._data = self.decode()
+
+        return self._data
+
+    @property
+    def content(self) -> Any:
+        data = self.data
+        return data.get("content") if isinstance(data, dict) else None
+
+    def decode_content(self) -> Any:
+        """Content of the frame, decoded without keeping the result."""
+        data = self.decode()
+        return data.get("content") if isinstance(data, dict) else None
+
+    @property
+    def text(self) -> str:
+        """The frame as a JSON string, as received for JSON frames."""
+        if self.encoding == StreamEncoding.JSON:
+            return bytes(self.raw).decode("utf-8", errors="ignore")
+
+        return json.dumps(self.decode())
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class JSONFrameDecoder:
+    """
+    Incremental decoder for a miner stream of JSON (or msgpack) objects.
+
+    The stream starts as concatenated JSON. Bytes are scanned once: the decoder keeps the brace depth and
+    string state between calls to `feed`, so a frame split over many chunks is never re-parsed. Anything
+    between top-level objects (whitespace, stray bytes) is skipped.
+
+    When the miner announces another framing with a `framing` event, the rest of the stream is split on
+    newlines or length prefixes instead of being scanned, and decoded as msgpack if the event says so.
+    Each complete frame is decoded exactly once.
+
+    With a memory budget, frames larger than its `max_frame_bytes` are skipped without being
+    buffered, and kept raw frames are accounted for (or spilled to disk) by the budget.
+    """
+
+    def __init__(
+        self,
+        log_prefix: str = "",
+        raw_frames: bool = False,
+        budget: Optional[StreamMemoryBudget] = None,
+    ):
+        self.log_prefix = log_prefix
+        # Return undecoded `Frame` objects instead of decoded objects.
+        self.raw_frames = raw_frames
+        self.budget = budget
+        self.max_frame_size = budget.max_frame_bytes if budget else None
+        self.dropped_frames = 0
+        # Bytes left of a skipped length-prefixed frame, or whether a skipped line is being read.
+        self.skip_remaining = 0
+        self.is_skipping_line = False
+        self.decoder = json.JSONDecoder(strict=False)
+        self.framing = StreamFraming.CONCATENATED
+        self.encoding = StreamEncoding.JSON
+        self.compression = StreamCompression.NONE
+        # Compressed frame being received.
+        self.decompressor: Optional[Decompressor] = None
+        self.buffer = bytearray()
+        self.position = 0
+        self.depth = 0
+        self.in_string = False
+        self.frame_start = None
+
+    def feed(self, data: bytes) -> List[Any]:
+        """Adds a chunk of bytes and returns the JSON objects completed by it."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        self.buffer += data
+        objects = []
+
+        if self.framing == StreamFraming.CONCATENATED:
+            self.scan_concatenated(objects)
+
+        # The framing can change while scanning concatenated JSON.
+        if self.framing == StreamFraming.NDJSON:
+            self.split_lines(objects)
+        elif self.framing == StreamFraming.LENGTH_PREFIXED:
+            self.split_length_prefixed(objects)
+
+        return objects
+
+    def scan_concatenated(self, objects: List[Any]):
+        buffer = self.buffer
+        position = self.position
+
+        while True:
+            if self.in_string:
+                match = STRING_PATTERN.search(buffer, position)
+
+                if match is None:
+                    position = len(buffer)
+                    break
+
+                index = match.start()
+
+                if buffer[index] == QUOTE:
+                    self.in_string = False
+                    position = index + 1
+                    continue
+
+                # Escape, skip the escaped byte. Wait for more data if it's not there yet.
+                if index + 1 >= len(buffer):
+                    position = index
+                    break
+
+                position = index + 2
+                continue
+
+            match = STRUCTURE_PATTERN.search(buffer, position)
+
+            if match is None:
+                position = len(buffer)
+                break
+
+            index = match.start()
+            byte = buffer[index]
+            position = index + 1
+
+            if byte == QUOTE:
+                self.in_string = True
+            elif byte == OPEN_BRACE:
+                if self.depth == 0:
+                    self.frame_start = index
+                self.depth += 1
+            elif self.depth > 0:
+                self.depth -= 1
+
+                # Oversized frames are still scanned to find their end, but not kept.
+                if self.depth == 0 and self.frame_start is not None:
+                    frame = self.copy(self.frame_start, position)
+                    self.frame_start = None
+
+                    if self.is_oversized(len(frame)):
+                        self.drop_frame(frame)
+                    else:
+                        self.decode_frame(frame, objects)
+
+                    if self.framing != StreamFraming.CONCATENATED:
+                        break
+
+        if self.frame_start is not None and self.is_oversized(
+            position - self.frame_start
+        ):
+            self.drop_frame(bytes(buffer[self.frame_start : self.frame_start + 200]))
+            self.frame_start = None
+
+        # Drop everything that belongs to no frame, once per call.
+        keep_from = self.frame_start if self.frame_start is not None else position
+        self.trim(keep_from, position)
+
+        if self.frame_start is not None:
+            self.frame_start = 0
+
+    def split_lines(self, objects: List[Any]):
+        buffer = self.buffer
+        position = self.position
+
+        while True:
+            index = buffer.find(b"\n", position)
+
+            if index == -1:
+                break
+
+            if self.is_skipping_line:
+                self.is_skipping_line = False
+            elif self.is_oversized(index - position):
+                self.drop_frame(bytes(buffer[position : position + 200]))
+            elif index > position:
+                self.decode_frame(self.copy(position, index), objects)
+
+            position = index + 1
+
+        if self.is_oversized(len(buffer) - position):
+            if not self.is_skipping_line:
+                self.is_skipping_line = True
+                self.drop_frame(bytes(buffer[position : position + 200]))
+
+            position = len(buffer)
+
+        self.trim(position, position)
+
+    def split_length_prefixed(self, objects: List[Any]):
+        buffer = self.buffer
+        position = self.position
+
+        while True:
+            if self.skip_remaining > 0:
+                skipped = min(len(buffer) - position, self.skip_remaining)
+                self.skip_remaining -= skipped
+                position += skipped
+
+                if self.skip_remaining > 0:
+                    break
+
+                continue
+
+            if self.decompressor is not None:
+                # Compressed frames are decompressed as they arrive instead of being buffered.
+                end = min(len(buffer), position + self.decompressor.remaining)
+                self.decompressor.feed(bytes(buffer[position:end]))
+                position = end
+
+                if self.decompressor.remaining > 0:
+                    break
+
+                self.finish_decompression(objects)
+                continue
+
+            if len(buffer) - position < LENGTH_PREFIX_SIZE:
+                break
+
+            start = position + LENGTH_PREFIX_SIZE
+            header = int.from_bytes(buffer[position:start], "big")
+            size = header & ~COMPRESSED_FLAG
+
+            if self.is_oversized(size):
+                self.drop_frame(bytes(buffer[start : start + 200]))
+                self.skip_remaining = size
+                position = start
+                continue
+
+            if header & COMPRESSED_FLAG:
+                self.decompressor = Decompressor(
+                    self.compression,
+                    size,
+                    max_size=min(
+                        self.max_frame_size or MAX_DECOMPRESSED_SIZE,
+                        MAX_DECOMPRESSED_SIZE,
+                    ),
+                )
+                position = start
+                continue
+
+            end = start + header
+
+            if end > len(buffer):
+                break
+
+            self.decode_frame(self.copy(start, end), objects)
+            position = end
+
+        self.trim(position, position)
+
+    def finish_decompression(self, objects: List[Any]):
+        decompressor, self.decompressor = self.decompressor, None
+
+        if decompressor.is_oversized:
+            self.drop_frame(b"")
+            return
+
+        if decompressor.error is not None:
+            bt.logging.debug(
+                f"{self.log_prefix}Failed to decompress frame: {decompressor.error}"
+            )
+            return
+
+        self.decode_frame(bytes(decompressor.output), objects)
+
+    def is_oversized(self, size: int) -> bool:
+        return self.max_frame_size is not None and size > self.max_frame_size
+
+    def drop_frame(self, head: bytes):
+        self.dropped_frames += 1
+
+        if self.budget is not None:
+            self.budget.record_dropped_frames(1)
+
+        bt.logging.warning(f"{self.log_prefix}Dropping an oversized frame: {head[:100]}")
+
+    def copy(self, start: int, end: int) -> bytes:
+        """Copies a frame out of the buffer, without the intermediate bytearray of a slice."""
+        with memoryview(self.buffer) as view:
+            return bytes(view[start:end])
+
+    def trim(self, keep_from: int, position: int):
+        """Drops the consumed bytes before `keep_from` and stores where scanning resumes."""
+        if keep_from > 0:
+            del self.buffer[:keep_from]
+
+        self.position = position - keep_from
+
+    def decode_frame(self, frame: bytes, objects: List[Any]):
+        if self.raw_frames:
+            self.append_raw_frame(frame, objects)
+            return
+
+        if self.encoding == StreamEncoding.MSGPACK:
+            try:
+                objects.append(msgpack.unpackb(frame, raw=False))
+            except (ValueError, msgpack.UnpackException) as e:
+                bt.logging.debug(
+                    f"{self.log_prefix}Failed to decode msgpack object: {e} from {frame[:200]}"
+                )
+            return
+
+        try:
+            json_data = self.decoder.decode(frame.decode("utf-8", errors="ignore"))
+        except json.JSONDecodeError as e:
+            bt.logging.debug(
+                f"{self.log_prefix}Failed to decode JSON object: {e} from {frame[:200]}"
+            )
+            return
+
+        if isinstance(json_data, dict) and json_data.get("type") == FRAMING_EVENT_TYPE:
+            self.framing, self.encoding, self.compression = negotiate_stream_format(
+                json_data.get("content"),
+                json_data.get("encoding"),
+                json_data.get("compression"),
+            )
+            return
+
+        objects.append(json_data)
+
+    def append_raw_frame(self, raw: bytes, objects: List[Any]):
+        frame = Frame(raw, self.encoding, self.log_prefix)
+
+        if frame.type == FRAMING_EVENT_TYPE:
+            data = frame.data or {}
+            self.framing, self.encoding, self.compression = negotiate_stream_format(
+                data.get("content"), data.get("encoding"), data.get("compression")
+            )
+            return
+
+        if self.budget is not None:
+            frame.raw = self.budget.keep(raw)
+
+        objects.append(frame)
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered bytes of an incomplete frame."""
+        return len(self.buffer)
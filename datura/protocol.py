@@ -4,14 +4,28 @@ import typing
 import json
 from datetime import datetime
 from abc import ABC, abstractmethod
-from typing import List, Union, Callable, Awaitable, Dict, Optional, Any
+from typing import (
+    List,
+    Union,
+    Callable,
+    Awaitable,
+    ClassVar,
+    Dict,
+    Optional,
+    Any,
+    Tuple,
+)
 from starlette.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from enum import Enum
 
 from aiohttp import ClientResponse
-from datura.services.twitter_utils import TwitterUtils
-from datura.services.web_search_utils import WebSearchUtils
+from datura.services.link_extraction import (
+    extract_markdown_links,
+    find_twitter_links,
+)
+from datura.framing import Frame, JSONFrameDecoder
+from datura.stream_budget import StreamMemoryBudget
 import traceback
 
 
@@ -92,6 +106,91 @@ class ScraperTextRole(str, Enum):
     FINAL_SUMMARY = "summary"
 
 
+class StreamEventHandler:
+    """Handles one event type of a miner stream in the validator."""
+
+    # Whether the event is yielded to organic consumers.
+    is_forwarded = True
+
+    def handle(self, synapse: "ScraperStreamingSynapse", frame: Frame):
+        pass
+
+
+class TextsEventHandler(StreamEventHandler):
+    is_forwarded = False
+
+    def handle(self, synapse, frame):
+        synapse.texts = frame.content or {}
+
+
+class CompletionEventHandler(StreamEventHandler):
+    def handle(self, synapse, frame):
+        synapse.completion = frame.content or ""
+
+
+class PromptAnalysisEventHandler(StreamEventHandler):
+    is_forwarded = False
+
+    def handle(self, synapse, frame):
+        prompt_analysis = TwitterPromptAnalysisResult()
+        prompt_analysis.fill(frame.content or {})
+        synapse.set_prompt_analysis(prompt_analysis)
+
+
+class FieldEventHandler(StreamEventHandler):
+    """Keeps the frame and decodes it onto a synapse field when the final synapse is built."""
+
+    def __init__(self, field: str):
+        self.field = field
+
+    def handle(self, synapse, frame):
+        synapse.keep_field_event(self.field, frame)
+
+
+class ToolResultEventHandler(StreamEventHandler):
+    """Keeps the frame of a tool result, it's decoded when a `ToolResult` attribute is first read."""
+
+    def __init__(self, event_type: str):
+        self.event_type = event_type
+
+    def handle(self, synapse, frame):
+        synapse.keep_tool_result(self.event_type, frame)
+
+
+STREAM_EVENT_HANDLERS: Dict[str, StreamEventHandler] = {
+    "text": StreamEventHandler(),
+    "texts": TextsEventHandler(),
+    "completion": CompletionEventHandler(),
+    "prompt_analysis": PromptAnalysisEventHandler(),
+    "tweets": FieldEventHandler("miner_tweets"),
+}
+
+
+def register_stream_event_handler(event_type: str, handler: StreamEventHandler):
+    STREAM_EVENT_HANDLERS[event_type] = handler
+
+
+class ToolResult:
+    """
+    Synapse attribute with the result of a tool, sent by the miner as an event of `event_type`.
+    Declaring it registers the event, the frame is decoded on first access and cached.
+    """
+
+    def __init__(self, event_type: str):
+        self.event_type = event_type
+
+    def __set_name__(self, owner, name):
+        register_stream_event_handler(
+            self.event_type, ToolResultEventHandler(self.event_type)
+        )
+
+    def __get__(self, synapse, owner):
+        if synapse is None:
+            return self
+
+        return synapse.get_tool_result(self.event_type)
+
+
 class ScraperStreamingSynapse(bt.StreamingSynapse):
     messages: str = pydantic.Field(
         ...,
@@ -167,6 +266,24 @@ class ScraperStreamingSynapse(bt.StreamingSynapse):
         description="Date filter specified by user.",
     )
 
+    stream_framing: Optional[str] = pydantic.Field(
+        None,
+        title="Stream Framing",
+        description="Framing of the streamed JSON events requested by the validator: concatenated, ndjson or length_prefixed.",
+    )
+
+    stream_encoding: Optional[str] = pydantic.Field(
+        None,
+        title="Stream Encoding",
+        description="Encoding of the streamed events requested by the validator: json or msgpack. Msgpack implies length_prefixed framing.",
+    )
+
+    stream_compression: Optional[str] = pydantic.Field(
+        None,
+        title="Stream Compression",
+        description="Compression of large streamed events supported by the validator: none, gzip or zstd. Compression implies length_prefixed framing.",
+    )
+
     prompt_analysis: TwitterPromptAnalysisResult = pydantic.Field(
         default_factory=lambda: TwitterPromptAnalysisResult(),
         title="Prompt Analysis",
@@ -201,58 +318,23 @@ class ScraperStreamingSynapse(bt.StreamingSynapse):
         description="A list of JSON objects representing the extracted links content from the tweets.",
     )
 
-    search_results: Optional[Any] = pydantic.Field(
-        default_factory=dict,
-        title="Search Results",
-        description="Optional JSON object containing search results from SERP",
+    # Search results of the tools, decoded from the stream on first access.
+    search_results: ClassVar[ToolResult] = ToolResult("search")
+    google_news_search_results: ClassVar[ToolResult] = ToolResult("google_search_news")
+    google_image_search_results: ClassVar[ToolResult] = ToolResult(
+        "google_image_search"
     )
+    wikipedia_search_results: ClassVar[ToolResult] = ToolResult("wikipedia_search")
+    youtube_search_results: ClassVar[ToolResult] = ToolResult("youtube_search")
+    arxiv_search_results: ClassVar[ToolResult] = ToolResult("arxiv_search")
+    reddit_search_results: ClassVar[ToolResult] = ToolResult("reddit_search")
+    hacker_news_search_results: ClassVar[ToolResult] = ToolResult("hacker_news_search")
+    discord_search_results: ClassVar[ToolResult] = ToolResult("discord_search")
 
-    google_news_search_results: Optional[Any] = pydantic.Field(
-        default_factory=dict,
-        title="Google News Search Results",
-        description="Optional JSON object containing search results from SERP Google News",
-    )
-
-    google_image_search_results: Optional[Any] = pydantic.Field(
-        default_factory=dict,
-        title="Google Image Search Results",
-        description="Optional JSON object containing image search results from SERP Google",
-    )
-
-    wikipedia_search_results: Optional[Any] = pydantic.Field(
-        default_factory=dict,
-        title="Wikipedia Search Results",
-        description="Optional JSON object containing search results from Wikipedia",
-    )
-
-    youtube_search_results: Optional[Any] = pydantic.Field(
-        default_factory=dict,
-        title="YouTube Search Results",
-        description="Optional JSON object containing search results from YouTube",
-    )
-
-    arxiv_search_results: Optional[Any] = pydantic.Field(
-        default_factory=dict,
-        title="Arxiv Search Results",
-        description="Optional JSON object containing search results from Arxiv",
-    )
-
-    reddit_search_results: Optional[Any] = pydantic.Field(
-        default_factory=dict,
-        title="Reddit Search Results",
-        description="Optional JSON object containing search results from Reddit",
-    )
-
-    hacker_news_search_results: Optional[Any] = pydantic.Field(
-        default_factory=dict,
-        title="Hacker News Search Results",
-        description="Optional JSON object containing search results from Hacker News",
-    )
-
-    discord_search_results: Optional[Any] = pydantic.Field(
-        default_factory=dict,
-        title="Discord Search Results",
-        description="Optional JSON object containing search results from Discord",
+    is_stream_truncated: bool = pydantic.Field(
+        False,
+        title="Is Stream Truncated",
+        description="Set by the validator when frames of the miner stream were dropped or the stream was cut for exceeding the memory limits.",
     )
 
     is_intro_text: bool = pydantic.Field(
@@ -267,6 +349,17 @@ class ScraperStreamingSynapse(bt.StreamingSynapse):
         description="A dictionary of texts in the StreamPrompting scenario, containing a role (intro, twitter summary, search summary, summary) and content. Immutable.",
     )
 
+    # Shallow copies share private attributes, so these are created once the first event arrives.
+    _field_event_frames: Optional[Dict[str, Frame]] = pydantic.PrivateAttr(None)
+    _tool_result_frames: Optional[Dict[str, Frame]] = pydantic.PrivateAttr(None)
+    _tool_results: Optional[Dict[str, Any]] = pydantic.PrivateAttr(None)
+    _markdown_links: Optional[Dict[str, Tuple]] = pydantic.PrivateAttr(None)
+    # Set by the validator before querying, the copies sent to every miner share it.
+    _memory_budget: Optional[StreamMemoryBudget] = pydantic.PrivateAttr(None)
+
+    def set_memory_budget(self, budget: StreamMemoryBudget):
+        self._memory_budget = budget
+
     def set_prompt_analysis(self, data: any):
         self.prompt_analysis = data
 
@@ -276,6 +369,16 @@ class ScraperStreamingSynapse(bt.StreamingSynapse):
     def get_twitter_completion(self) -> Optional[str]:
         return self.texts.get(ScraperTextRole.TWITTER_SUMMARY.value, "")
 
+    def get_miner_tweet(self, tweet_id: str) -> Optional[Dict]:
+        return next(
+            (
+                tweet
+                for tweet in self.miner_tweets.get("data", [])
+                if tweet["id"] == tweet_id
+            ),
+            None,
+        )
+
     def get_search_completion(self) -> Dict[str, str]:
         """Gets the search completion text from the texts dictionary based on tools used."""
 
@@ -311,6 +414,18 @@ class ScraperStreamingSynapse(bt.StreamingSynapse):
 
         return completions
 
+    def get_markdown_links(self, role: str) -> Tuple[List[str], Dict[str, List[str]]]:
+        """Markdown links of the text of a role, parsed once per synapse."""
+        if self._markdown_links is None:
+            self._markdown_links = {}
+
+        if role not in self._markdown_links:
+            self._markdown_links[role] = extract_markdown_links(
+                self.texts.get(role, "")
+            )
+
+        return self._markdown_links[role]
+
     def get_search_links(self) -> List[str]:
         """Extracts web links from each summary making sure to filter by domain for each tool used.
         In Reddit and Hacker News Search, the links are filtered by domains.
@@ -321,32 +436,26 @@ class ScraperStreamingSynapse(bt.StreamingSynapse):
         completions = self.get_search_completion()
         links = []
 
-        for key, value in completions.items():
+        for key in completions:
+            all_links, links_by_domain = self.get_markdown_links(key)
+
             if key == ScraperTextRole.REDDIT_SUMMARY.value:
-                links.extend(WebSearchUtils.find_links_by_domain(value, "reddit.com"))
+                links.extend(links_by_domain.get("reddit.com", []))
             elif key == ScraperTextRole.HACKER_NEWS_SUMMARY.value:
-                links.extend(
-                    WebSearchUtils.find_links_by_domain(value, "news.ycombinator.com")
-                )
+                links.extend(links_by_domain.get("news.ycombinator.com", []))
             elif key == ScraperTextRole.SEARCH_SUMMARY.value:
                 if any(
                     tool in self.tools
                     for tool in ["Google Search", "Google News Search"]
                 ):
-                    links.extend(WebSearchUtils.find_links(value))
+                    links.extend(all_links)
                 else:
                     if "Wikipedia Search" in self.tools:
-                        links.extend(
-                            WebSearchUtils.find_links_by_domain(value, "wikipedia.org")
-                        )
+                        links.extend(links_by_domain.get("wikipedia.org", []))
                     if "ArXiv Search" in self.tools:
-                        links.extend(
-                            WebSearchUtils.find_links_by_domain(value, "arxiv.org")
-                        )
+                        links.extend(links_by_domain.get("arxiv.org", []))
                     if "Youtube Search" in self.tools:
-                        links.extend(
-                            WebSearchUtils.find_links_by_domain(value, "youtube.com")
-                        )
+                        links.extend(links_by_domain.get("youtube.com", []))
 
         return links
 
@@ -354,105 +463,43 @@ class ScraperStreamingSynapse(bt.StreamingSynapse):
         if self.completion is None:
             self.completion = ""
 
-        buffer = ""  # Initialize an empty buffer to accumulate data across chunks
+        # Keeps incomplete frames across chunks. Frames are yielded as they are, spilled ones
+        # included, and only decoded when a consumer reads them.
+        budget = self._memory_budget
+        decoder = JSONFrameDecoder(
+            log_prefix=f"Host: {response.real_url.host}:{response.real_url.port}; hotkey: {self.axon.hotkey}; ",
+            raw_frames=True,
+            budget=budget,
+        )
+        received_bytes = 0
 
         try:
             async for chunk in response.content.iter_any():
-                chunk_str = chunk.decode("utf-8", errors="ignore")
+                received_bytes += len(chunk)
 
-                # Attempt to parse the chunk as JSON, updating the buffer with remaining incomplete JSON data
-                json_objects, buffer = extract_json_chunk(
-                    chunk_str, response, self.axon.hotkey, buffer
-                )
-                for json_data in json_objects:
-                    content_type = json_data.get("type")
-
-                    if content_type == "text":
-                        text_content = json_data.get("content", "")
-                        role = json_data.get("role")
-
-                        yield json.dumps(
-                            {"type": "text", "role": role, "content": text_content}
-                        )
-                    elif content_type == "texts":
-                        texts = json_data.get("content", "")
-                        self.texts = texts
-                    elif content_type == "completion":
-                        completion = json_data.get("content", "")
-                        self.completion = completion
-
-                        yield json.dumps({"type": "completion", "content": completion})
-                    elif content_type == "prompt_analysis":
-                        prompt_analysis_json = json_data.get("content", "{}")
-                        prompt_analysis = TwitterPromptAnalysisResult()
-                        prompt_analysis.fill(prompt_analysis_json)
-                        self.set_prompt_analysis(prompt_analysis)
-
-                    elif content_type == "tweets":
-                        tweets_json = json_data.get("content", "[]")
-                        self.miner_tweets = tweets_json
-                        yield json.dumps({"type": "tweets", "content": tweets_json})
-
-                    elif content_type == "search":
-                        search_json = json_data.get("content", "{}")
-                        self.search_results = search_json
-                        yield json.dumps({"type": "search", "content": search_json})
-
-                    elif content_type == "google_search_news":
-                        search_json = json_data.get("content", "{}")
-                        self.google_news_search_results = search_json
-                        yield json.dumps(
-                            {"type": "google_search_news", "content": search_json}
-                        )
-
-                    elif content_type == "wikipedia_search":
-                        search_json = json_data.get("content", "{}")
-                        self.wikipedia_search_results = search_json
-                        yield json.dumps(
-                            {"type": "wikipedia_search", "content": search_json}
-                        )
-
-                    elif content_type == "youtube_search":
-                        search_json = json_data.get("content", "{}")
-                        self.youtube_search_results = search_json
-                        yield json.dumps(
-                            {"type": "youtube_search", "content": search_json}
-                        )
-
-                    elif content_type == "arxiv_search":
-                        search_json = json_data.get("content", "{}")
-                        self.arxiv_search_results = search_json
-                        yield json.dumps(
-                            {"type": "arxiv_search", "content": search_json}
-                        )
-
-                    elif content_type == "reddit_search":
-                        search_json = json_data.get("content", "{}")
-                        self.reddit_search_results = search_json
-                        yield json.dumps(
-                            {"type": "reddit_search", "content": search_json}
-                        )
-
-                    elif content_type == "hacker_news_search":
-                        search_json = json_data.get("content", "{}")
-                        self.hacker_news_search_results = search_json
-                        yield json.dumps(
-                            {"type": "hacker_news_search", "content": search_json}
-                        )
-
-                    elif content_type == "discord_search":
-                        search_json = json_data.get("content", "{}")
-                        self.discord_search_results = search_json
-                        yield json.dumps(
-                            {"type": "discord_search", "content": search_json}
-                        )
-
-                    elif content_type == "google_image_search":
-                        search_json = json_data.get("content", "{}")
-                        self.google_image_search_results = search_json
-                        yield json.dumps(
-                            {"type": "google_image_search", "content": search_json}
-                        )
+                if budget is not None and received_bytes > budget.max_stream_bytes:
+                    bt.logging.warning(
+                        f"process_streaming_response: hotkey: {self.axon.hotkey}, stream cut after {budget.max_stream_bytes} bytes"
+                    )
+                    budget.record_truncated_stream()
+                    self.is_stream_truncated = True
+                    break
+
+                frames = decoder.feed(chunk)
+
+                if decoder.dropped_frames:
+                    self.is_stream_truncated = True
+
+                for frame in frames:
+                    handler = STREAM_EVENT_HANDLERS.get(frame.type)
+
+                    if handler is None:
+                        continue
+
+                    handler.handle(self, frame)
+
+                    if handler.is_forwarded:
+                        yield frame
         except json.JSONDecodeError as e:
             port = response.real_url.port
             host = response.real_url.host
@@ -479,7 +526,48 @@ class ScraperStreamingSynapse(bt.StreamingSynapse):
     def deserialize(self) -> str:
         return self.completion
 
+    def keep_field_event(self, field: str, frame: Frame):
+        if self._field_event_frames is None:
+            self._field_event_frames = {}
+
+        self._field_event_frames[field] = frame
+
+    def keep_tool_result(self, event_type: str, frame: Frame):
+        if self._tool_result_frames is None:
+            self._tool_result_frames = {}
+            self._tool_results = {}
+
+        self._tool_result_frames[event_type] = frame
+        self._tool_results.pop(event_type, None)
+
+    def get_tool_result(self, event_type: str) -> Any:
+        if self._tool_result_frames is None:
+            return {}
+
+        if event_type not in self._tool_results:
+            frame = self._tool_result_frames.get(event_type)
+            # Cached here, the frame itself only keeps the raw bytes.
+            content = frame.decode_content() if frame is not None else None
+            self._tool_results[event_type] = content if content is not None else {}
+
+        return self._tool_results[event_type]
+
+    def decode_field_events(self):
+        """Decodes the events kept for synapse fields, before the final synapse is built from them."""
+        if not self._field_event_frames:
+            return
+
+        for field, frame in self._field_event_frames.items():
+            content = frame.content
+
+            if content is not None:
+                setattr(self, field, content)
+
+        self._field_event_frames.clear()
+
     def extract_response_json(self, response: ClientResponse) -> dict:
+        self.decode_field_events()
+
         headers = {
             k.decode("utf-8"): v.decode("utf-8")
             for k, v in response.__dict__["_raw_headers"]
@@ -492,7 +580,7 @@ class ScraperStreamingSynapse(bt.StreamingSynapse):
                 if key.startswith(prefix)
             }
 
-        completion_links = TwitterUtils().find_twitter_links(self.completion)
+        completion_links = find_twitter_links(self.completion)
         search_completion_links = self.get_search_links()
 
         return {
@@ -506,17 +594,11 @@ class ScraperStreamingSynapse(bt.StreamingSynapse):
             "model": self.model,
             "completion": self.completion,
             "miner_tweets": self.miner_tweets,
-            "search_results": self.search_results,
-            "google_news_search_results": self.google_news_search_results,
-            "wikipedia_search_results": self.wikipedia_search_results,
-            "youtube_search_results": self.youtube_search_results,
-            "arxiv_search_results": self.arxiv_search_results,
-            "hacker_news_search_results": self.hacker_news_search_results,
-            "reddit_search_results": self.reddit_search_results,
             "prompt_analysis": self.prompt_analysis.dict(),
             "completion_links": completion_links,
             "search_completion_links": search_completion_links,
             "texts": self.texts,
+            "is_stream_truncated": self.is_stream_truncated,
             "start_date": self.start_date,
             "end_date": self.end_date,
             "date_filter_type": self.date_filter_type,
@@ -527,42 +609,6 @@ class ScraperStreamingSynapse(bt.StreamingSynapse):
         arbitrary_types_allowed = True
 
 
-def extract_json_chunk(chunk, response, hotkey, buffer=""):
-    """
-    Extracts JSON objects from a chunk of data, handling cases where JSON objects are split across multiple chunks.
-
-    :param chunk: The current chunk of data to process.
-    :param response: The response object, used for logging.
-    :param buffer: A buffer holding incomplete JSON data from previous chunks.
-    :return: A tuple containing a list of extracted JSON objects and the updated buffer.
-    """
-    buffer += chunk  # Add the current chunk to the buffer
-    json_objects = []
-
-    while True:
-        try:
-            json_obj, end = json.JSONDecoder(strict=False).raw_decode(buffer)
-            json_objects.append(json_obj)
-            buffer = buffer[end:]
-        except json.JSONDecodeError as e:
-            if e.pos == len(buffer):
-                # Reached the end of the buffer without finding a complete JSON object
-                break
-            elif e.msg.startswith("Unterminated string"):
-                # Incomplete JSON object at the end of the chunk
-                break
-            else:
-                # Invalid JSON data encountered
-                port = response.real_url.port
-                host = response.real_url.host
-                bt.logging.debug(
-                    f"Host: {host}:{port}; hotkey: {hotkey}; Failed to decode JSON object: {e} from {buffer}"
-                )
-                break
-
-    return json_objects, buffer
-
-
 class SearchSynapse(bt.Synapse):
     """A class to represent search api synapse"""
 
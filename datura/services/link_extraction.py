@@ -0,0 +1,59 @@
+import re
+from typing import Dict, List, Optional, Tuple
+from datura.services.twitter_utils import TWITTER_LINK_PATTERN
+
+MARKDOWN_LINK_PATTERN = re.compile(r"\[.*?\]\((https?://[^\s\)]+)\)")
+# Host of a link, followed by nothing or by a non-empty path.
+LINK_HOST_PATTERN = re.compile(
+    r"https?://([a-zA-Z0-9-]+(?:\.[a-zA-Z0-9-]+)*)(?:/[^\s\)]+)?"
+)
+
+# Domains whose links are validated separately, a link belongs to a domain or any of its subdomains.
+LINK_DOMAINS = {
+    "reddit.com",
+    "news.ycombinator.com",
+    "wikipedia.org",
+    "arxiv.org",
+    "youtube.com",
+}
+
+
+def get_link_domain(link: str) -> Optional[str]:
+    """Returns the known domain the link belongs to, if any."""
+    match = LINK_HOST_PATTERN.fullmatch(link)
+
+    if not match:
+        return None
+
+    host = match.group(1)
+
+    while True:
+        if host in LINK_DOMAINS:
+            return host
+
+        _, dot, host = host.partition(".")
+
+        if not dot:
+            return None
+
+
+def extract_markdown_links(text: str) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    Parses the markdown links of a text in one pass.
+
+    Returns every link in order of appearance and the links of each known domain.
+    """
+    links = MARKDOWN_LINK_PATTERN.findall(text)
+    links_by_domain = {}
+
+    for link in links:
+        domain = get_link_domain(link)
+
+        if domain is not None:
+            links_by_domain.setdefault(domain, []).append(link)
+
+    return links, links_by_domain
+
+
+def find_twitter_links(text: str) -> List[str]:
+    return [match.group() for match in TWITTER_LINK_PATTERN.finditer(text)]
@@ -4,16 +4,18 @@ from urllib.parse import urlparse
 
 VALID_DOMAINS = ["twitter.com", "x.com"]
 
+TWITTER_LINK_PATTERN = re.compile(
+    r"https?://(?:"
+    + "|".join(re.escape(domain) for domain in VALID_DOMAINS)
+    + r")/(?![^/]*?(?:Twitter|Admin)[^/]*?/)"
+    r"(?P<username>[a-zA-Z0-9_]{1,15})/status/(?P<id>\d+)",
+    re.IGNORECASE,
+)
+
 
 class TwitterUtils:
     def __init__(self):
-        self.twitter_link_regex = re.compile(
-            r"https?://(?:"
-            + "|".join(re.escape(domain) for domain in VALID_DOMAINS)
-            + r")/(?![^/]*?(?:Twitter|Admin)[^/]*?/)"
-            r"(?P<username>[a-zA-Z0-9_]{1,15})/status/(?P<id>\d+)",
-            re.IGNORECASE,
-        )
+        self.twitter_link_regex = TWITTER_LINK_PATTERN
 
     @staticmethod
     def extract_tweet_id(url: str) -> str:
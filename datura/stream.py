@@ -1,8 +1,8 @@
 from datura.protocol import (
     ScraperStreamingSynapse,
     TwitterPromptAnalysisResult,
-    extract_json_chunk,
 )
+from datura.framing import JSONFrameDecoder
 import bittensor as bt
 import aiohttp
 import json
@@ -10,6 +10,19 @@ import asyncio
 import time
 
 
+def log_final_synapse(uid, final_synapse, start_time):
+    duration = time.time() - start_time
+    process_time = final_synapse.dendrite.process_time
+    if process_time is not None:
+        bt.logging.debug(
+            f"Miner uid {uid} finished with final synapse after {duration:.2f}s from start time. Dendrite process time: {process_time:.2f}s"
+        )
+    else:
+        bt.logging.debug(
+            f"Miner uid {uid} finished with final synapse after {duration:.2f}s from start time. Dendrite process time is None"
+        )
+
+
 async def process_async_responses(async_responses, uids, start_time):
     tasks = [collect_generator_results(resp) for resp in async_responses]
     responses = await asyncio.gather(*tasks)
@@ -18,17 +31,7 @@ async def process_async_responses(async_responses, uids, start_time):
             (chunk for chunk in response if isinstance(chunk, bt.Synapse)), None
         )
         if final_synapse:
-            end_time = time.time()
-            duration = end_time - start_time
-            process_time = final_synapse.dendrite.process_time
-            if process_time is not None:
-                bt.logging.debug(
-                    f"Miner uid {uid} finished with final synapse after {duration:.2f}s from start time. Dendrite process time: {process_time:.2f}s"
-                )
-            else:
-                bt.logging.debug(
-                    f"Miner uid {uid} finished with final synapse after {duration:.2f}s from start time. Dendrite process time is None"
-                )
+            log_final_synapse(uid, final_synapse, start_time)
             yield final_synapse  # Yield final synapse
         else:
             stream_text = "".join(
@@ -38,6 +41,35 @@ async def process_async_responses(async_responses, uids, start_time):
                 yield stream_text  # Yield stream text as soon as it's available
 
 
+async def process_async_responses_as_completed(async_responses, uids, start_time):
+    """
+    Yields a (uid, final_synapse) tuple for each miner as soon as its stream ends, in completion order.
+    Miners whose stream ends without a final synapse are skipped.
+    """
+
+    async def collect_with_uid(uid, response):
+        return uid, await collect_final_synapse(response)
+
+    tasks = [
+        asyncio.ensure_future(
+            collect_with_uid(uid.item() if hasattr(uid, "item") else uid, resp)
+        )
+        for uid, resp in zip(uids, async_responses)
+    ]
+
+    try:
+        for completed_task in asyncio.as_completed(tasks):
+            uid, final_synapse = await completed_task
+            if final_synapse:
+                log_final_synapse(uid, final_synapse, start_time)
+                yield uid, final_synapse
+    finally:
+        # Stop collecting streams nobody is waiting for anymore.
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
 async def collect_generator_results(response):
     results = []
     async for result in response:
@@ -45,6 +77,15 @@ async def collect_generator_results(response):
     return results
 
 
+async def collect_final_synapse(response):
+    """Consumes a miner stream and returns its final synapse, the chunks before it are not kept."""
+    final_synapse = None
+    async for result in response:
+        if isinstance(result, bt.Synapse):
+            final_synapse = result
+    return final_synapse
+
+
 # async def collect_generator_results(response):
 #     results = []
 #     async for result in process_single_response(response):
@@ -57,6 +98,7 @@ async def process_single_response(response):
     completion = ""
     prompt_analysis = None
     miner_tweets = []
+    decoder = JSONFrameDecoder()
 
     try:
         async for chunk in response:
@@ -65,9 +107,8 @@ async def process_single_response(response):
                 if chunk.is_failure:
                     raise Exception("Dendrite's status code indicates failure")
             else:
-                chunk_str = chunk.decode("utf-8")
                 try:
-                    json_objects, remaining_chunk = extract_json_chunk(chunk_str)
+                    json_objects = decoder.feed(chunk)
                     for json_data in json_objects:
                         content_type = json_data.get("type")
 
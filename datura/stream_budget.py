@@ -0,0 +1,104 @@
+import os
+import mmap
+import resource
+import tempfile
+import bittensor as bt
+from typing import Dict, Optional, Union
+
+# Smaller frames are always kept in memory, spilling them would cost more than it saves.
+SPILL_MIN_BYTES = 64 * 1024
+
+
+def get_rss() -> int:
+    """Resident set size of the process in bytes."""
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Peak instead of current RSS, in kilobytes on Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def spill_to_disk(data: bytes) -> Optional[mmap.mmap]:
+    """Writes the data to an anonymous temporary file and returns a read-only memory map of it."""
+    try:
+        with tempfile.TemporaryFile() as file:
+            file.write(data)
+            file.flush()
+            # The mapping stays valid after the file is closed.
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        bt.logging.error(f"Failed to spill {len(data)} bytes to disk: {e}")
+        return None
+
+
+class StreamMemoryBudget:
+    """
+    Memory limits of the miner streams of one step, shared by the streams of all queried miners.
+
+    Every miner stream is cut after `max_stream_bytes` and frames larger than `max_frame_bytes`
+    are dropped. Once the frames kept by all streams reach `max_step_bytes`, further large frames
+    are spilled to temporary files and read back through memory maps when they are decoded.
+    """
+
+    def __init__(
+        self,
+        max_frame_bytes: int,
+        max_stream_bytes: int,
+        max_step_bytes: int,
+        spill_min_bytes: int = SPILL_MIN_BYTES,
+    ):
+        self.max_frame_bytes = max_frame_bytes
+        self.max_stream_bytes = max_stream_bytes
+        self.max_step_bytes = max_step_bytes
+        self.spill_min_bytes = spill_min_bytes
+
+        self.kept_bytes = 0
+        self.spilled_bytes = 0
+        self.spilled_frames = 0
+        self.dropped_frames = 0
+        self.truncated_streams = 0
+        self.start_rss = get_rss()
+        self.peak_rss = self.start_rss
+
+    def keep(self, raw: bytes) -> Union[bytes, mmap.mmap]:
+        """Accounts for a frame kept until scoring, returns it as is or spilled to disk."""
+        size = len(raw)
+
+        if size < self.spill_min_bytes:
+            self.kept_bytes += size
+            return raw
+
+        if self.kept_bytes + size > self.max_step_bytes:
+            spilled = spill_to_disk(raw)
+
+            if spilled is not None:
+                self.spilled_bytes += size
+                self.spilled_frames += 1
+                return spilled
+
+        self.kept_bytes += size
+        self.sample_rss()
+        return raw
+
+    def record_dropped_frames(self, count: int):
+        self.dropped_frames += count
+
+    def record_truncated_stream(self):
+        self.truncated_streams += 1
+
+    def sample_rss(self):
+        self.peak_rss = max(self.peak_rss, get_rss())
+
+    def get_event(self) -> Dict:
+        self.sample_rss()
+
+        return {
+            "stream_peak_rss_mb": self.peak_rss / 1024 / 1024,
+            "stream_rss_growth_mb": (self.peak_rss - self.start_rss) / 1024 / 1024,
+            "stream_kept_mb": self.kept_bytes / 1024 / 1024,
+            "stream_spilled_mb": self.spilled_bytes / 1024 / 1024,
+            "stream_spilled_frames": self.spilled_frames,
+            "stream_dropped_frames": self.dropped_frames,
+            "stream_truncated_streams": self.truncated_streams,
+        }
@@ -1,5 +1,4 @@
 import re
-import json
 import bittensor as bt
 from typing import Type
 from datura.tools.bittensor.pinecone_indexer import PineconeIndexer
@@ -80,11 +79,5 @@ class BittensorDocsTool(BaseTool):
                 "content": data,
             }
 
-            await send(
-                {
-                    "type": "http.response.body",
-                    "body": json.dumps(response_body).encode("utf-8"),
-                    "more_body": False,
-                }
-            )
+            await response_streamer.send_event(response_body, more_body=False)
             bt.logging.info("Bittensor Documentation search results data sent")
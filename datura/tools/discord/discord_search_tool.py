@@ -1,4 +1,3 @@
-import json
 import bittensor as bt
 from typing import Type
 from pydantic import BaseModel, Field
@@ -64,11 +63,5 @@ class DiscordSearchTool(BaseTool):
                 "content": data,
             }
 
-            await send(
-                {
-                    "type": "http.response.body",
-                    "body": json.dumps(messages_response_body).encode("utf-8"),
-                    "more_body": False,
-                }
-            )
+            await response_streamer.send_event(messages_response_body, more_body=False)
             bt.logging.info("Discord search results data sent")
@@ -5,7 +5,6 @@ from pydantic import BaseModel, Field
 
 from datura.tools.search.serp_advanced_google_search import SerpAdvancedGoogleSearch
 from datura.tools.base import BaseTool
-import json
 import bittensor as bt
 
 
@@ -61,12 +60,8 @@ class HackerNewsSearchTool(BaseTool):
 
         response_streamer.more_body = False
 
-        await send(
-            {
-                "type": "http.response.body",
-                "body": json.dumps(search_results_response_body).encode("utf-8"),
-                "more_body": False,
-            }
+        await response_streamer.send_event(
+            search_results_response_body, more_body=False
         )
 
         bt.logging.info("Wikipedia search results data sent")
@@ -1,49 +1,137 @@
-import json
 import asyncio
 from starlette.types import Send
 from datura.protocol import ScraperTextRole
+from datura.framing import (
+    StreamCompression,
+    StreamEncoding,
+    StreamFraming,
+    encode_frame,
+    encode_framing_event,
+)
 import bittensor as bt
 
 
 class ResponseStreamer:
-    def __init__(self, send: Send) -> None:
+    def __init__(
+        self,
+        send: Send,
+        framing: StreamFraming = StreamFraming.CONCATENATED,
+        encoding: StreamEncoding = StreamEncoding.JSON,
+        compression: StreamCompression = StreamCompression.NONE,
+        flush_interval: float = 0,
+        flush_bytes: int = 0,
+    ) -> None:
         self.texts = {}
         self.role_order = []
         self.more_body = True
         self.send = send
-
-    async def send_text_event(self, text: str, role: ScraperTextRole):
-        text_data_json = json.dumps(
-            {"type": "text", "role": role.value, "content": text}
+        self.framing = framing
+        self.encoding = encoding
+        self.compression = compression
+
+        # Tokens are coalesced per role and flushed every `flush_interval` seconds or
+        # `flush_bytes` bytes, whichever comes first. With no interval every token is sent right away.
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.pending_tokens = {}
+        self.pending_bytes = {}
+        self.flush_tasks = {}
+
+    async def send_event(self, data, more_body: bool = True):
+        """Sends one event to the validator, framed and encoded as negotiated."""
+        await self.send(
+            {
+                "type": "http.response.body",
+                "body": encode_frame(
+                    data, self.framing, self.encoding, self.compression
+                ),
+                "more_body": more_body,
+            }
         )
+
+    async def send_framing_event(self):
+        """Tells the validator how the following events are framed. Nothing is sent for concatenated JSON."""
+        if self.framing == StreamFraming.CONCATENATED:
+            return
+
         await self.send(
             {
                 "type": "http.response.body",
-                "body": text_data_json.encode("utf-8"),
+                "body": encode_framing_event(
+                    self.framing, self.encoding, self.compression
+                ),
                 "more_body": True,
             }
         )
 
+    async def send_text_event(self, text: str, role: ScraperTextRole):
+        await self.send_event({"type": "text", "role": role.value, "content": text})
+
+    @property
+    def is_coalescing(self) -> bool:
+        return self.flush_interval > 0
+
+    async def add_token(self, token: str, role: ScraperTextRole):
+        if not self.is_coalescing:
+            await self.send_text_event(text=token, role=role)
+            return
+
+        self.pending_tokens.setdefault(role, []).append(token)
+        self.pending_bytes[role] = self.pending_bytes.get(role, 0) + len(
+            token.encode("utf-8")
+        )
+
+        if self.flush_bytes and self.pending_bytes[role] >= self.flush_bytes:
+            await self.flush(role)
+        elif role not in self.flush_tasks:
+            self.flush_tasks[role] = asyncio.create_task(self.flush_later(role))
+
+    async def flush_later(self, role: ScraperTextRole):
+        await asyncio.sleep(self.flush_interval)
+        self.flush_tasks.pop(role, None)
+        await self.flush(role)
+
+    async def flush(self, role: ScraperTextRole):
+        flush_task = self.flush_tasks.pop(role, None)
+
+        if flush_task is not None and flush_task is not asyncio.current_task():
+            flush_task.cancel()
+
+        tokens = self.pending_tokens.pop(role, None)
+        self.pending_bytes.pop(role, None)
+
+        if tokens:
+            await self.send_text_event(text="".join(tokens), role=role)
+
+    async def flush_all(self):
+        for role in list(self.pending_tokens.keys()):
+            await self.flush(role)
+
     async def stream_response(self, response, role: ScraperTextRole, wait_time=None):
         if role not in self.role_order:
             self.role_order.append(role)
 
         if role not in self.texts:
-            await self.send_text_event(text="\n\n", role=role)
+            await self.add_token(token="\n\n", role=role)
             self.texts[role] = ["\n\n"]
 
         async for chunk in response:
             token = chunk.choices[0].delta.content or ""
             self.texts[role].append(token)
 
-            await self.send_text_event(text=token, role=role)
+            await self.add_token(token=token, role=role)
 
-            if wait_time is not None:
+            # Pacing per token is only needed when tokens are not coalesced.
+            if wait_time is not None and not self.is_coalescing:
                 await asyncio.sleep(wait_time)
 
             bt.logging.trace(f"Streamed tokens: {token}")
 
+        await self.flush(role)
+
     async def send_texts_event(self):
+        await self.flush_all()
+
         texts = {}
 
         for key in self.texts:
@@ -54,12 +142,7 @@ class ResponseStreamer:
             "content": texts,
         }
 
-        await self.send(
-            {
-                "type": "http.response.body",
-                "body": json.dumps(texts_response_body).encode("utf-8"),
-            }
-        )
+        await self.send_event(texts_response_body, more_body=False)
 
     async def send_completion_event(self):
         completion_response_body = {
@@ -67,12 +150,7 @@ class ResponseStreamer:
             "content": self.get_full_text(),
         }
 
-        await self.send(
-            {
-                "type": "http.response.body",
-                "body": json.dumps(completion_response_body).encode("utf-8"),
-            }
-        )
+        await self.send_event(completion_response_body, more_body=False)
 
     def get_full_text(self):
         full_text = []
@@ -1,6 +1,5 @@
 from typing import Optional, Type
 
-import json
 import bittensor as bt
 from langchain.callbacks.manager import CallbackManagerForToolRun
 from langchain_community.utilities import ArxivAPIWrapper
@@ -69,12 +68,8 @@ class ArxivSearchTool(BaseTool):
 
         response_streamer.more_body = False
 
-        await send(
-            {
-                "type": "http.response.body",
-                "body": json.dumps(search_results_response_body).encode("utf-8"),
-                "more_body": False,
-            }
+        await response_streamer.send_event(
+            search_results_response_body, more_body=False
         )
 
         bt.logging.info("ArXiv search results data sent")
@@ -1,5 +1,4 @@
 import os
-import json
 import bittensor as bt
 from typing import Type
 from pydantic import BaseModel, Field
@@ -68,12 +67,8 @@ class SerpGoogleImageSearchTool(BaseTool):
 
         response_streamer.more_body = False
 
-        await send(
-            {
-                "type": "http.response.body",
-                "body": json.dumps(image_search_results_response_body).encode("utf-8"),
-                "more_body": False,
-            }
+        await response_streamer.send_event(
+            image_search_results_response_body, more_body=False
         )
 
         bt.logging.info("Google image search results data sent")
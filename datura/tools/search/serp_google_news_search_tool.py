@@ -1,5 +1,4 @@
 import os
-import json
 import bittensor as bt
 from typing import Type, Optional
 from pydantic import BaseModel, Field
@@ -74,12 +73,8 @@ class SerpGoogleNewsSearchTool(BaseTool):
 
         response_streamer.more_body = False
 
-        await send(
-            {
-                "type": "http.response.body",
-                "body": json.dumps(search_results_response_body).encode("utf-8"),
-                "more_body": False,
-            }
+        await response_streamer.send_event(
+            search_results_response_body, more_body=False
         )
 
         bt.logging.info("Web search results data sent")
@@ -1,5 +1,4 @@
 from typing import Optional, Type
-import json
 
 import bittensor as bt
 from langchain.callbacks.manager import CallbackManagerForToolRun
@@ -52,12 +51,8 @@ class WikipediaSearchTool(BaseTool):
 
         response_streamer.more_body = False
 
-        await send(
-            {
-                "type": "http.response.body",
-                "body": json.dumps(search_results_response_body).encode("utf-8"),
-                "more_body": False,
-            }
+        await response_streamer.send_event(
+            search_results_response_body, more_body=False
         )
 
         bt.logging.info("Wikipedia search results data sent")
@@ -2,7 +2,6 @@ from typing import Optional, Type
 from langchain.callbacks.manager import CallbackManagerForToolRun
 from pydantic import BaseModel, Field
 from youtube_search import YoutubeSearch
-import json
 import bittensor as bt
 from datura.tools.base import BaseTool
 
@@ -54,12 +53,8 @@ class YoutubeSearchTool(BaseTool):
 
         response_streamer.more_body = False
 
-        await send(
-            {
-                "type": "http.response.body",
-                "body": json.dumps(search_results_response_body).encode("utf-8"),
-                "more_body": False,
-            }
+        await response_streamer.send_event(
+            search_results_response_body, more_body=False
         )
 
         bt.logging.info("Youtube search results data sent")
@@ -17,6 +17,7 @@ from langchain.tools.render import render_text_description
 from datura.protocol import ScraperTextRole
 from openai import AsyncOpenAI
 from datura.tools.response_streamer import ResponseStreamer
+from datura.framing import negotiate_stream_format
 from datura.protocol import TwitterPromptAnalysisResult
 
 OpenAI.api_key = os.environ.get("OPENAI_API_KEY")
@@ -81,6 +82,9 @@ class ToolManager:
         region,
         date_filter,
         google_date_filter,
+        stream_framing=None,
+        stream_encoding=None,
+        stream_compression=None,
     ):
         self.prompt = prompt
         self.manual_tool_names = manual_tool_names
@@ -91,7 +95,19 @@ class ToolManager:
         self.date_filter = date_filter
         self.google_date_filter = google_date_filter
 
-        self.response_streamer = ResponseStreamer(send=send)
+        (
+            self.stream_framing,
+            self.stream_encoding,
+            self.stream_compression,
+        ) = negotiate_stream_format(stream_framing, stream_encoding, stream_compression)
+        self.response_streamer = ResponseStreamer(
+            send=send,
+            framing=self.stream_framing,
+            encoding=self.stream_encoding,
+            compression=self.stream_compression,
+            flush_interval=self.miner.config.miner.stream_flush_interval / 1000,
+            flush_bytes=self.miner.config.miner.stream_flush_bytes,
+        )
         self.send = send
         self.openai_summary_model = self.miner.config.miner.openai_summary_model
 
@@ -101,6 +117,8 @@ class ToolManager:
         self.twitter_data = None
 
     async def run(self):
+        await self.response_streamer.send_framing_event()
+
         actions = await self.detect_tools_to_use()
 
         toolkit_actions = {}
@@ -169,11 +187,8 @@ class ToolManager:
             "content": self.response_streamer.get_full_text(),
         }
 
-        await self.send(
-            {
-                "type": "http.response.body",
-                "body": json.dumps(completion_response_body).encode("utf-8"),
-            }
+        await self.response_streamer.send_event(
+            completion_response_body, more_body=False
         )
 
         if self.response_streamer.more_body:
@@ -294,7 +309,14 @@ class ToolManager:
             stream=True,
         )
 
-        response_streamer = ResponseStreamer(send=self.send)
+        response_streamer = ResponseStreamer(
+            send=self.send,
+            framing=self.stream_framing,
+            encoding=self.stream_encoding,
+            compression=self.stream_compression,
+            flush_interval=self.miner.config.miner.stream_flush_interval / 1000,
+            flush_bytes=self.miner.config.miner.stream_flush_bytes,
+        )
         await response_streamer.stream_response(
             response=response, role=ScraperTextRole.INTRO, wait_time=0.1
         )
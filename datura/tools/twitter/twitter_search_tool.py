@@ -1,4 +1,3 @@
-import json
 from typing import Type
 import bittensor as bt
 from pydantic import BaseModel, Field
@@ -89,12 +88,8 @@ class TwitterSearchTool(BaseTool):
                 "content": prompt_analysis.dict(),
             }
 
-            await send(
-                {
-                    "type": "http.response.body",
-                    "body": json.dumps(prompt_analysis_response_body).encode("utf-8"),
-                    "more_body": True,
-                }
+            await response_streamer.send_event(
+                prompt_analysis_response_body, more_body=True
             )
             bt.logging.info("Prompt Analysis sent")
 
@@ -104,11 +99,5 @@ class TwitterSearchTool(BaseTool):
             tweets_response_body = {"type": "tweets", "content": tweets}
             response_streamer.more_body = False
 
-            await send(
-                {
-                    "type": "http.response.body",
-                    "body": json.dumps(tweets_response_body).encode("utf-8"),
-                    "more_body": False,
-                }
-            )
+            await response_streamer.send_event(tweets_response_body, more_body=False)
             bt.logging.info(f"Tweet data sent. Number of tweets: {tweets_amount}")
@@ -271,39 +271,54 @@ def send_discord_alert(message, webhook_url):
         print(f"Failed to send Discord alert: {e}", exc_info=True)
 
 
-def resync_metagraph(self):
-    """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
-    bt.logging.info("resync_metagraph()")
+def fetch_metagraph(self) -> "bt.metagraph":
+    """Fetches a fresh metagraph from the chain without touching the one in use."""
+    return self.subtensor.metagraph(self.config.netuid)
 
-    # Copies state of metagraph before syncing.
-    previous_metagraph = copy.deepcopy(self.metagraph)
 
-    # Sync the metagraph.
-    self.metagraph.sync(subtensor=self.subtensor)
+def apply_metagraph(self, metagraph: "bt.metagraph"):
+    """
+    Publishes a synced metagraph and updates the hotkeys and moving averages based on it.
+    The published metagraph is never mutated afterwards, readers only need to take a reference to it.
+    """
+    previous_metagraph = self.metagraph
+    self.metagraph = metagraph
 
     # Check if the metagraph axon info has changed.
-    if previous_metagraph.axons == self.metagraph.axons:
+    if previous_metagraph.axons == metagraph.axons:
         return
 
     bt.logging.info(
         "Metagraph updated, re-syncing hotkeys, dendrite pool and moving averages"
     )
+    moving_averaged_scores = self.moving_averaged_scores.clone()
+
     # Zero out all hotkeys that have been replaced.
     for uid, hotkey in enumerate(self.hotkeys):
-        if hotkey != self.metagraph.hotkeys[uid]:
-            self.moving_averaged_scores[uid] = 0  # hotkey has been replaced
+        if uid < len(metagraph.hotkeys) and hotkey != metagraph.hotkeys[uid]:
+            moving_averaged_scores[uid] = 0  # hotkey has been replaced
 
     # Check to see if the metagraph has changed size.
     # If so, we need to add new hotkeys and moving averages.
-    if len(self.hotkeys) < len(self.metagraph.hotkeys):
+    if len(self.hotkeys) < len(metagraph.hotkeys):
         # Update the size of the moving average scores.
-        new_moving_average = torch.zeros((self.metagraph.n)).to(self.device)
-        min_len = min(len(self.hotkeys), len(self.moving_averaged_scores))
-        new_moving_average[:min_len] = self.moving_averaged_scores[:min_len]
-        self.moving_averaged_scores = new_moving_average
+        new_moving_average = torch.zeros((metagraph.n)).to(
+            self.config.neuron.device
+        )
+        min_len = min(len(self.hotkeys), len(moving_averaged_scores))
+        new_moving_average[:min_len] = moving_averaged_scores[:min_len]
+        moving_averaged_scores = new_moving_average
+
+    self.moving_averaged_scores = moving_averaged_scores
 
     # Update the hotkeys.
-    self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+    self.hotkeys = copy.deepcopy(metagraph.hotkeys)
+
+
+def resync_metagraph(self):
+    """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
+    bt.logging.info("resync_metagraph()")
+    apply_metagraph(self, fetch_metagraph(self))
 
 
 async def save_logs(prompt, logs, netuid):
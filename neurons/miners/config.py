@@ -103,6 +103,20 @@ def get_config() -> "bt.Config":
         help="OpenAI model used for fixing queries.",
     )
 
+    parser.add_argument(
+        "--miner.stream_flush_interval",
+        type=int,
+        default=50,
+        help="Milliseconds OpenAI tokens are buffered per role before they are streamed as one text event. Set to 0 to stream every token.",
+    )
+
+    parser.add_argument(
+        "--miner.stream_flush_bytes",
+        type=int,
+        default=1024,
+        help="Buffered text size in bytes that is streamed right away, before the flush interval ends.",
+    )
+
     # Adds subtensor specific arguments i.e. --subtensor.chain_endpoint ... --subtensor.network ...
     bt.subtensor.add_args(parser)
 
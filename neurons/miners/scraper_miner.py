@@ -63,6 +63,9 @@ class ScraperMiner:
                 region=synapse.region,
                 date_filter=date_filter,
                 google_date_filter=synapse.google_date_filter,
+                stream_framing=synapse.stream_framing,
+                stream_encoding=synapse.stream_encoding,
+                stream_compression=synapse.stream_compression,
             )
 
             await tool_manager.run()
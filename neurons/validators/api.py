@@ -7,6 +7,10 @@ import uvicorn
 import bittensor as bt
 import traceback
 from validator import Neuron
+from neurons.validators.utils.response_cache import ResponseCache
+from neurons.validators.utils.single_flight import organic_query_key
+from neurons.validators.utils.hedging import is_text_event
+from datura.dataset.date_filters import DateFilterType
 import time
 import asyncio
 from fastapi.middleware.cors import CORSMiddleware
@@ -25,12 +29,48 @@ app.add_middleware(
 EXPECTED_ACCESS_KEY = os.environ.get("EXPECTED_ACCESS_KEY", "hello")
 
 neu = Neuron()
+response_cache = ResponseCache(max_bytes=neu.config.neuron.response_cache_max_bytes)
+
+
+async def organic_stream(last_message):
+    """Streams an organic answer, replaying it from the response cache when possible."""
+    if not response_cache.is_enabled:
+        async for response in neu.scraper_validator.organic(last_message):
+            yield response
+        return
+
+    key = organic_query_key(last_message)
+    cached_chunks = response_cache.get(key)
+
+    if cached_chunks is not None:
+        bt.logging.info("Serving organic query from the response cache")
+        for chunk in cached_chunks:
+            yield chunk
+        return
+
+    chunks = []
+    has_text = False
+    async for response in neu.scraper_validator.organic(last_message):
+        has_text = has_text or is_text_event(response)
+        chunk = str(response)
+        chunks.append(chunk)
+        yield chunk
+
+    # Only reached when the stream ended without an exception, organic() raises for answers cut
+    # off partway. Answers without text, e.g. when the miner only sent tool events or every
+    # hedged miner failed, are not replayed to others either.
+    if has_text:
+        response_cache.set(
+            key,
+            chunks,
+            last_message.get("date_filter", DateFilterType.PAST_WEEK.value),
+        )
 
 
 async def response_stream(data):
     try:
         last_message = data["messages"][-1]
-        async for response in neu.scraper_validator.organic(last_message):
+        async for response in organic_stream(last_message):
             yield f"{response}"
 
     except Exception as e:
@@ -58,7 +98,7 @@ async def response_stream_event(data):
         else:
             uids = None
             merged_chunks = ""
-            async for response in neu.scraper_validator.organic(last_message):
+            async for response in organic_stream(last_message):
                 # Decode the chunk if necessary and merge
                 chunk = str(response)  # Assuming response is already a string
                 merged_chunks += chunk
@@ -160,6 +200,41 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/stats/response-cache", include_in_schema=False)
+async def response_cache_stats():
+    return response_cache.get_stats()
+
+
+@app.get("/stats/organic-hedging", include_in_schema=False)
+async def organic_hedging_stats():
+    return neu.scraper_validator.hedge_stats.get_stats()
+
+
+@app.get("/stats/synthetic-steps", include_in_schema=False)
+async def synthetic_steps_stats():
+    return neu.scheduler.get_metrics() if neu.scheduler else []
+
+
+@app.get("/stats/tweet-cache", include_in_schema=False)
+async def tweet_cache_stats():
+    return neu.scraper_validator.tweet_cache.get_stats()
+
+
+@app.get("/stats/link-metadata-cache", include_in_schema=False)
+async def link_metadata_cache_stats():
+    return neu.scraper_validator.link_metadata_cache.get_stats()
+
+
+@app.get("/stats/llm-score-cache", include_in_schema=False)
+async def llm_score_cache_stats():
+    return neu.scraper_validator.llm_score_cache.get_stats()
+
+
+@app.get("/stats/openai-scoring", include_in_schema=False)
+async def openai_scoring_stats():
+    return neu.scraper_validator.scoring_client.get_stats()
+
+
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
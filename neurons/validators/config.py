@@ -22,6 +22,7 @@ import argparse
 import bittensor as bt
 from loguru import logger
 from reward import DefaultRewardFrameworkConfig
+from datura.framing import StreamCompression, StreamEncoding, StreamFraming
 from distutils.util import strtobool
 
 
@@ -134,6 +135,20 @@ def add_args(cls, parser):
         default=DefaultRewardFrameworkConfig.performance_weight,
     )
 
+    parser.add_argument(
+        "--reward.twitter_content_batch_size",
+        type=int,
+        help="Number of validator tweets scored together in one JSON mode OpenAI request. Tweets missing from a malformed batch output are scored one by one. Set to 1 to score every tweet in its own request.",
+        default=1,
+    )
+
+    parser.add_argument(
+        "--reward.web_search_relavance_batch_size",
+        type=int,
+        help="Number of link titles scored together in one JSON mode OpenAI request. Links missing from a malformed batch output are scored one by one. Set to 1 to score every link in its own request.",
+        default=1,
+    )
+
     parser.add_argument(
         "--neuron.run_random_miner_syn_qs_interval",
         type=int,
@@ -148,6 +163,34 @@ def add_args(cls, parser):
         default=1800,
     )
 
+    parser.add_argument(
+        "--neuron.random_miner_syn_qs_concurrency",
+        type=int,
+        help="Maximum number of synthetic steps querying a random subset of miners that run at the same time.",
+        default=1,
+    )
+
+    parser.add_argument(
+        "--neuron.all_miner_syn_qs_concurrency",
+        type=int,
+        help="Maximum number of synthetic steps querying all miners that run at the same time.",
+        default=1,
+    )
+
+    parser.add_argument(
+        "--neuron.syn_qs_jitter",
+        type=float,
+        help="Maximum random delay, in seconds, added to each synthetic query interval.",
+        default=30,
+    )
+
+    parser.add_argument(
+        "--neuron.syn_qs_step_timeout",
+        type=float,
+        help="Deadline, in seconds, for one synthetic step including scoring. The step is cancelled when it is exceeded.",
+        default=1500,
+    )
+
     parser.add_argument(
         "--neuron.update_weight_interval",
         type=int,
@@ -162,6 +205,184 @@ def add_args(cls, parser):
         default=600,
     )
 
+    parser.add_argument(
+        "--neuron.dendrite_pool_size",
+        type=int,
+        help="Number of dendrites used to fan out a query across miners. Each dendrite keeps its own connection pool.",
+        default=3,
+    )
+
+    parser.add_argument(
+        "--neuron.fanout_shard_size",
+        type=int,
+        help="Maximum number of axons queried through a single dendrite in one shard of the fan-out.",
+        default=80,
+    )
+
+    parser.add_argument(
+        "--neuron.validation_queue_size",
+        type=int,
+        help="Maximum number of links waiting for a validation batch while miners are streaming.",
+        default=1000,
+    )
+
+    parser.add_argument(
+        "--neuron.validation_batch_size",
+        type=int,
+        help="Maximum number of links fetched from Apify in one validation batch.",
+        default=200,
+    )
+
+    parser.add_argument(
+        "--neuron.validation_batch_window",
+        type=float,
+        help="Seconds to wait for more links before sending a validation batch.",
+        default=10,
+    )
+
+    parser.add_argument(
+        "--neuron.organic_timeout_margin",
+        type=float,
+        help="Seconds added to the 95th percentile latency of a miner to get its organic query timeout.",
+        default=10,
+    )
+
+    parser.add_argument(
+        "--neuron.organic_min_timeout",
+        type=float,
+        help="Lower bound, in seconds, of the adaptive organic query timeout.",
+        default=30,
+    )
+
+    parser.add_argument(
+        "--neuron.organic_timeout_min_samples",
+        type=int,
+        help="Number of latency samples a miner needs before its organic query timeout is adapted. Until then the fixed timeout is used.",
+        default=20,
+    )
+
+    parser.add_argument(
+        "--neuron.organic_hedge_delay",
+        type=float,
+        help="Seconds without a text event from the queried miner before an organic query is also sent to another miner. Set to 0 to disable hedging.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.organic_hedge_max_miners",
+        type=int,
+        help="Maximum number of miners queried for one organic query when hedging.",
+        default=2,
+    )
+
+    parser.add_argument(
+        "--neuron.stream_framing",
+        type=str,
+        choices=[framing.value for framing in StreamFraming],
+        help="Framing of the JSON events streamed by miners. Miners that don't support it keep sending concatenated JSON.",
+        default=StreamFraming.LENGTH_PREFIXED.value,
+    )
+
+    parser.add_argument(
+        "--neuron.stream_encoding",
+        type=str,
+        choices=[encoding.value for encoding in StreamEncoding],
+        help="Encoding of the events streamed by miners. Msgpack needs the msgpack package and uses length-prefixed framing. JSON events are forwarded to organic clients as received, msgpack events are converted to JSON.",
+        default=StreamEncoding.JSON.value,
+    )
+
+    parser.add_argument(
+        "--neuron.stream_compression",
+        type=str,
+        choices=[compression.value for compression in StreamCompression],
+        help="Compression of large tool result events streamed by miners. Zstd falls back to gzip without the zstandard package.",
+        default=StreamCompression.ZSTD.value,
+    )
+
+    parser.add_argument(
+        "--neuron.response_cache_max_bytes",
+        type=int,
+        help="Maximum size in bytes of the organic response cache used by the API. Set to 0 to disable the cache.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.tweet_cache_ttl",
+        type=float,
+        help="Seconds a tweet fetched from Apify is reused to verify miner tweets in later steps. Set to 0 to disable the tweet cache.",
+        default=6 * 60 * 60,
+    )
+
+    parser.add_argument(
+        "--neuron.link_metadata_cache_ttl",
+        type=float,
+        help="Seconds the scraped title of a search link is reused in later steps, Wikipedia, ArXiv, Youtube, Reddit and Hacker News links use longer TTLs of their own. Set to 0 to disable the link metadata cache.",
+        default=24 * 60 * 60,
+    )
+
+    parser.add_argument(
+        "--neuron.link_metadata_failure_ttl",
+        type=float,
+        help="Seconds a search link that failed every scraping retry is considered not fetched without scraping it again.",
+        default=60 * 60,
+    )
+
+    parser.add_argument(
+        "--neuron.llm_score_cache_size",
+        type=int,
+        help="Number of LLM scoring responses kept in memory, reused when the same content is scored with the same prompt again. Older responses are read back from disk for a week. Set to 0 to disable the LLM score cache.",
+        default=10000,
+    )
+
+    parser.add_argument(
+        "--neuron.openai_max_concurrency",
+        type=int,
+        help="Maximum number of OpenAI scoring requests in flight at once, shared by every step.",
+        default=16,
+    )
+
+    parser.add_argument(
+        "--neuron.openai_rpm",
+        type=int,
+        help="OpenAI scoring requests per minute. Set to 0 to use the limit reported by OpenAI in its rate limit headers.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.openai_tpm",
+        type=int,
+        help="OpenAI scoring tokens per minute, estimated from the length of the prompts. Set to 0 to use the limit reported by OpenAI in its rate limit headers.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.openai_max_retries",
+        type=int,
+        help="Number of retries with jittered exponential backoff of a rate limited or failed OpenAI scoring request before it is dropped.",
+        default=5,
+    )
+
+    parser.add_argument(
+        "--neuron.max_miner_frame_bytes",
+        type=int,
+        help="Maximum size in bytes of a single event streamed by a miner, larger events are dropped and the response is flagged as truncated.",
+        default=16 * 1024 * 1024,
+    )
+
+    parser.add_argument(
+        "--neuron.max_miner_stream_bytes",
+        type=int,
+        help="Maximum number of bytes read from the stream of one miner, the rest of the stream is cut and the response is flagged as truncated.",
+        default=64 * 1024 * 1024,
+    )
+
+    parser.add_argument(
+        "--neuron.step_memory_budget_bytes",
+        type=int,
+        help="Bytes of miner events kept in memory per step, larger events past this budget are spilled to temporary files.",
+        default=1024 * 1024 * 1024,
+    )
+
     parser.add_argument(
         "--neuron.vpermit_tao_limit",
         type=int,
@@ -182,6 +403,20 @@ def add_args(cls, parser):
         help="A list of miner identifiers, hotkey",
         default=[],
     )
+    parser.add_argument(
+        "--neuron.maintenance_interval",
+        type=int,
+        help="Seconds between checks of the block height for metagraph syncs and weight setting.",
+        default=12,
+    )
+
+    parser.add_argument(
+        "--neuron.metagraph_sync_blocks",
+        type=int,
+        help="Blocks between metagraph syncs.",
+        default=25,
+    )
+
     parser.add_argument(
         "--neuron.checkpoint_block_length",
         type=int,
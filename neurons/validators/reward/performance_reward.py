@@ -74,8 +74,13 @@ class PerformanceRewardModel(BaseRewardModel):
         """
         return 0.2 * self.sigmoid_scale(axon_time)
 
-    def get_rewards(
-        self, prompt: str, responses: List[ScraperStreamingSynapse], name: str, uids
+    async def aget_rewards(
+        self,
+        prompt: str,
+        responses: List[ScraperStreamingSynapse],
+        name: str,
+        uids,
+        prefetched=None,
     ) -> Tuple[List[BaseRewardEvent]]:
         """
         Returns a list of reward events for the given responses.
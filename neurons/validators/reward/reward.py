@@ -17,6 +17,7 @@
 # DEALINGS IN THE SOFTWARE.
 
 import torch
+import asyncio
 import bittensor as bt
 from typing import List, Union
 from abc import abstractmethod
@@ -61,8 +62,13 @@ class BaseRewardModel:
         return str(self.name)
 
     @abstractmethod
-    def get_rewards(
-        self, prompt: str, responses: List[ScraperStreamingSynapse], name: str, uids
+    async def aget_rewards(
+        self,
+        prompt: str,
+        responses: List[ScraperStreamingSynapse],
+        name: str,
+        uids,
+        prefetched=None,
     ) -> Union[torch.FloatTensor, dict]: ...
 
     def __init__(self) -> None:
@@ -214,10 +220,29 @@ class BaseRewardModel:
             if completion is not None
         ]
 
-    def apply(
-        self, prompt: str, responses: List[ScraperStreamingSynapse], name: str, uids
+    def apply(self, *args, **kwargs) -> Union[torch.FloatTensor, dict]:
+        """Synchronous version of `aapply`, kept for callers outside of the event loop."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aapply(*args, **kwargs))
+
+        raise RuntimeError(
+            f"{self.name}.apply can't be called from a running event loop, await aapply instead."
+        )
+
+    async def aapply(
+        self,
+        prompt: str,
+        responses: List[ScraperStreamingSynapse],
+        name: str,
+        uids,
+        prefetched=None,
     ) -> Union[torch.FloatTensor, dict]:
-        """Applies the reward model across each call. Unsuccessful responses are zeroed."""
+        """Applies the reward model across each call. Unsuccessful responses are zeroed.
+
+        `prefetched` holds validator data collected for this model while miners were streaming, see ValidationPipeline.
+        """
         # Get indices of correctly responding calls.
 
         successful_completions_indices: List[int] = [
@@ -226,8 +251,8 @@ class BaseRewardModel:
             if resp.dendrite.status_code == 200 and resp.completion_links
         ]
 
-        reward_events, val_score_responses = self.get_rewards(
-            prompt, responses, name, uids
+        reward_events, val_score_responses = await self.aget_rewards(
+            prompt, responses, name, uids, prefetched=prefetched
         )
 
         # Reward each completion.
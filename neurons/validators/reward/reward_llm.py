@@ -10,7 +10,9 @@ import time
 from datura.utils import call_openai
 from transformers import AutoTokenizer, AutoModelForCausalLM
 
-from neurons.validators.utils.prompts import ScoringPrompt
+from neurons.validators.utils.prompts import BatchLinkContentPrompt, ScoringPrompt
+from neurons.validators.utils.llm_score_cache import LLMScoreCache, get_score_key
+from neurons.validators.utils.scoring_client import ScoringClient
 
 from enum import Enum
 import torch
@@ -21,6 +23,8 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 EXPECTED_ACCESS_KEY = os.environ.get("EXPECTED_ACCESS_KEY", "hello")
 URL_SUBNET_18 = os.environ.get("URL_SUBNET_18")
 
+OPENAI_SCORING_MODEL = "gpt-3.5-turbo-0125"
+
 
 class ScoringSource(Enum):
     Subnet18 = 1
@@ -30,12 +34,16 @@ class ScoringSource(Enum):
 
 
 class RewardLLM:
-    def __init__(self):
+    def __init__(
+        self, score_cache: LLMScoreCache = None, scoring_client: ScoringClient = None
+    ):
         self.tokenizer = None
         self.model = None
         self.device = None
         self.pipe = None
         self.scoring_prompt = ScoringPrompt()
+        self.score_cache = score_cache
+        self.scoring_client = scoring_client
 
     def init_tokenizer(self, device, model_name):
         # https://huggingface.co/VMware/open-llama-7b-open-instruct
@@ -124,39 +132,100 @@ class RewardLLM:
             bt.logging.warning(f"Error calling Subnet 18 scoring: {e}")
             return None
 
-    async def get_score_by_openai(self, messages):
+    def get_cached_scores(self, messages, name: str = None):
+        """Splits the messages into cached responses by key and messages to query."""
+        cached_responses = {}
+        uncached_messages = []
+
+        for message_dict in messages:
+            ((key, message_list),) = message_dict.items()
+
+            if self.score_cache is not None:
+                cached_response = self.score_cache.get(
+                    get_score_key(OPENAI_SCORING_MODEL, message_list)
+                )
+                self.score_cache.record(name, message_list, cached_response)
+
+                if cached_response is not None:
+                    cached_responses[key] = cached_response
+                    continue
+
+            uncached_messages.append(message_dict)
+
+        return cached_responses, uncached_messages
+
+    def cache_score(self, message_list, response):
+        if self.score_cache is not None:
+            self.score_cache.set(
+                get_score_key(OPENAI_SCORING_MODEL, message_list), response
+            )
+
+    async def query_openai(self, message, response_format=None):
+        try:
+            if self.scoring_client is not None:
+                return await self.scoring_client.complete(
+                    messages=message,
+                    temperature=0.0001,
+                    top_p=0.0001,
+                    seed=1234,
+                    model=OPENAI_SCORING_MODEL,
+                    response_format=response_format,
+                )
+
+            return await call_openai(
+                messages=message,
+                temperature=0.0001,
+                top_p=0.0001,
+                model=OPENAI_SCORING_MODEL,
+                response_format=response_format,
+            )
+        except Exception as e:
+            print(f"Error sending message to OpenAI: {e}")
+            return ""  # Return an empty string to indicate failure
+
+    async def query_scores(self, messages):
+        """Queries a score for each message, returns the responses by key."""
+        query_tasks = []
+        for message_dict in messages:  # Iterate over each dictionary in the list
+            ((key, message_list),) = message_dict.items()
+            query_tasks.append(self.query_openai(message_list))
+
+        query_responses = await asyncio.gather(*query_tasks, return_exceptions=True)
+
+        responses_by_key = {}
+        for response, message_dict in zip(query_responses, messages):
+            if isinstance(response, Exception):
+                print(f"Query failed with exception: {response}")
+                response = (
+                    ""  # Replace the exception with an empty string in the result
+                )
+            ((key, message_list),) = message_dict.items()
+            responses_by_key[key] = response
+            self.cache_score(message_list, response)
+
+        return responses_by_key
+
+    def order_by_messages(self, messages, responses_by_key):
+        # Reward models match responses to their messages by order.
+        result = {}
+        for message_dict in messages:
+            ((key, _),) = message_dict.items()
+            result[key] = responses_by_key.get(key)
+        return result
+
+    async def get_score_by_openai(self, messages, name: str = None):
         try:
             start_time = time.time()  # Start timing for query execution
-            query_tasks = []
-            for message_dict in messages:  # Iterate over each dictionary in the list
-                ((key, message_list),) = message_dict.items()
-
-                async def query_openai(message):
-                    try:
-                        return await call_openai(
-                            messages=message,
-                            temperature=0.0001,
-                            top_p=0.0001,
-                            model="gpt-3.5-turbo-0125",
-                        )
-                    except Exception as e:
-                        print(f"Error sending message to OpenAI: {e}")
-                        return ""  # Return an empty string to indicate failure
-
-                task = query_openai(message_list)
-                query_tasks.append(task)
-
-            query_responses = await asyncio.gather(*query_tasks, return_exceptions=True)
-
-            result = {}
-            for response, message_dict in zip(query_responses, messages):
-                if isinstance(response, Exception):
-                    print(f"Query failed with exception: {response}")
-                    response = (
-                        ""  # Replace the exception with an empty string in the result
-                    )
-                ((key, message_list),) = message_dict.items()
-                result[key] = response
+            responses_by_key, queried_messages = self.get_cached_scores(
+                messages, name
+            )
+            responses_by_key.update(await self.query_scores(queried_messages))
+            result = self.order_by_messages(messages, responses_by_key)
+
+            if self.score_cache is not None and len(queried_messages) < len(messages):
+                bt.logging.info(
+                    f"RewardLLM: {len(messages) - len(queried_messages)}/{len(messages)} {name} scores from cache"
+                )
 
             execution_time = time.time() - start_time  # Calculate execution time
             # print(f"Execution time for OpenAI queries: {execution_time} seconds")
@@ -165,13 +234,111 @@ class RewardLLM:
             print(f"Error processing OpenAI queries: {e}")
             return None
 
-    async def get_score_by_source(self, messages, source: ScoringSource):
+    def get_batch_messages(self, prompt, contents_by_id):
+        batch_prompt = BatchLinkContentPrompt()
+        return [
+            {"role": "system", "content": batch_prompt.get_system_message()},
+            {"role": "user", "content": batch_prompt.text(prompt, contents_by_id)},
+        ]
+
+    async def get_batch_scores_by_openai(self, prompt, contents):
+        """Scores the contents against the prompt in one JSON mode request."""
+        # Contents are numbered in the request, URLs as ids would cost more tokens.
+        keys_by_id = {str(index): key for index, key in enumerate(contents, start=1)}
+        response = await self.query_openai(
+            self.get_batch_messages(
+                prompt, {id: contents[key] for id, key in keys_by_id.items()}
+            ),
+            response_format={"type": "json_object"},
+        )
+        scores = BatchLinkContentPrompt().extract_scores(response or "")
+
+        return {
+            keys_by_id[id]: f"Score: {score:g}"
+            for id, score in scores.items()
+            if id in keys_by_id
+        }
+
+    async def llm_batch_processing(
+        self, prompt, contents, messages, batch_size: int, name: str = None
+    ):
+        """
+        Scores the contents against the prompt with up to `batch_size` contents per request.
+
+        `messages` are the single scoring messages of the contents, by the same keys. Batched
+        scores are cached by the batch request of each content alone, never by its single message.
+        The contents missing from a malformed batch output are scored with their single messages
+        one by one.
+        """
+        try:
+            batch_messages = []
+            for message_dict in messages:
+                ((key, _),) = message_dict.items()
+                if key in contents:
+                    batch_messages.append(
+                        {key: self.get_batch_messages(prompt, {"1": contents[key]})}
+                    )
+
+            responses_by_key, uncached_messages = self.get_cached_scores(
+                batch_messages, name
+            )
+            messages_by_key = {
+                key: message_list
+                for message_dict in uncached_messages
+                for key, message_list in message_dict.items()
+            }
+            keys = list(messages_by_key)
+            batches = [
+                keys[index : index + batch_size]
+                for index in range(0, len(keys), batch_size)
+            ]
+
+            batch_results = await asyncio.gather(
+                *[
+                    self.get_batch_scores_by_openai(
+                        prompt, {key: contents[key] for key in batch}
+                    )
+                    for batch in batches
+                ],
+                return_exceptions=True,
+            )
+
+            for batch_result in batch_results:
+                if isinstance(batch_result, Exception):
+                    bt.logging.error(f"RewardLLM: batch scoring failed: {batch_result}")
+                    continue
+
+                for key, response in batch_result.items():
+                    responses_by_key[key] = response
+                    self.cache_score(messages_by_key[key], response)
+
+            fallback_messages = [
+                message_dict
+                for message_dict in messages
+                if next(iter(message_dict)) not in responses_by_key
+            ]
+            responses_by_key.update(await self.query_scores(fallback_messages))
+
+            bt.logging.info(
+                f"RewardLLM: {len(keys)} {name} contents scored in {len(batches)} batches, "
+                f"{len(fallback_messages)} scored one by one, "
+                f"{len(batch_messages) - len(uncached_messages)} from cache"
+            )
+
+            return self.order_by_messages(messages, responses_by_key)
+        except Exception as e:
+            bt.logging.error(f"Error processing OpenAI batch queries: {e}")
+            return await self.llm_processing(messages, name=name)
+
+    async def get_score_by_source(
+        self, messages, source: ScoringSource, name: str = None
+    ):
         if source == ScoringSource.Subnet18:
             return self.call_to_subnet_18_scoring(messages)
         else:
-            return await self.get_score_by_openai(messages=messages)
+            return await self.get_score_by_openai(messages=messages, name=name)
 
-    async def llm_processing(self, messages):
+    async def llm_processing(self, messages, name: str = None):
         # Initialize score_responses as an empty dictionary to hold the scoring results
         score_responses = {}
 
@@ -186,7 +353,7 @@ class RewardLLM:
         for source in scoring_sources:
             # Attempt to score with the current source
             current_score_responses = await self.get_score_by_source(
-                messages=messages, source=source
+                messages=messages, source=source, name=name
             )
             if current_score_responses:
                 # Update the score_responses with the new scores
@@ -8,6 +8,7 @@ import bittensor as bt
 from neurons.validators.utils.prompts import LinkContentPrompt
 from datura.utils import clean_text
 from neurons.validators.apify.web_scraper_actor import WebScraperActor
+from neurons.validators.utils.link_metadata_cache import LinkMetadataCache
 import re
 import asyncio
 from neurons.validators.utils.prompts import (
@@ -31,15 +32,25 @@ class WebSearchContentRelevanceModel(BaseRewardModel):
     def name(self) -> str:
         return RewardModelType.search_content_relevance.value
 
-    def __init__(self, device: str, scoring_type: None, llm_reward: RewardLLM):
+    def __init__(
+        self,
+        device: str,
+        scoring_type: None,
+        llm_reward: RewardLLM,
+        link_metadata_cache: LinkMetadataCache,
+        batch_size: int = 1,
+    ):
         super().__init__()
         self.device = device
         self.reward_llm = llm_reward
 
         self.scoring_type = scoring_type
+        self.link_metadata_cache = link_metadata_cache
+        self.batch_size = batch_size
 
     async def llm_process_validator_links(self, prompt, links_with_metadata):
         scoring_messages = []
+        contents = {}
 
         for link_with_metadata in links_with_metadata:
             url = link_with_metadata.get("url")
@@ -49,13 +60,27 @@ class WebSearchContentRelevanceModel(BaseRewardModel):
             if result:
                 scoring_prompt, scoring_text = result
                 scoring_messages.append({url: scoring_text})
+                contents[url] = self.clean_text(title)
+
+        if self.batch_size > 1:
+            return await self.reward_llm.llm_batch_processing(
+                prompt,
+                contents,
+                scoring_messages,
+                batch_size=self.batch_size,
+                name=self.name,
+            )
 
         score_responses = await self.reward_llm.llm_processing(
-            scoring_messages
+            scoring_messages, name=self.name
         )  # Await the coroutine
         return score_responses
 
     async def scrape_links_with_retries(self, urls):
+        # Only links missing from the cache are scraped with Apify.
+        return await self.link_metadata_cache.fetch(urls, self.scrape_links_from_apify)
+
+    async def scrape_links_from_apify(self, urls):
         max_retries = 4
         non_fetched_links = urls
         links_with_metadata = []
@@ -85,24 +110,24 @@ class WebSearchContentRelevanceModel(BaseRewardModel):
 
         return links_with_metadata, non_fetched_links
 
+    def sample_links(self, response: ScraperStreamingSynapse) -> List[str]:
+        return random.sample(
+            response.search_completion_links,
+            min(APIFY_LINK_SCRAPE_AMOUNT, len(response.search_completion_links)),
+        )
+
     async def process_links(
-        self, prompt: str, responses: List[ScraperStreamingSynapse]
+        self, prompt: str, responses: List[ScraperStreamingSynapse], prefetched=None
     ):
         all_links = []
         start_time = time.time()
 
-        for response in responses:
-            links = [
-                link
-                for link in random.sample(
-                    response.search_completion_links,
-                    min(
-                        APIFY_LINK_SCRAPE_AMOUNT, len(response.search_completion_links)
-                    ),
-                )
-            ]
-
-            all_links.extend(links)
+        if prefetched is not None:
+            # Links were already scraped by the validation pipeline while miners were streaming
+            all_links = prefetched.all_links
+        else:
+            for response in responses:
+                all_links.extend(self.sample_links(response))
 
         unique_links = list(set(all_links))
 
@@ -110,9 +135,14 @@ class WebSearchContentRelevanceModel(BaseRewardModel):
             bt.logging.info("No unique links found to process.")
             return {}
 
-        links_with_metadata, non_fetched_links = await self.scrape_links_with_retries(
-            unique_links
-        )
+        if prefetched is not None:
+            links_with_metadata = prefetched.fetched
+            non_fetched_links = prefetched.non_fetched_links
+        else:
+            (
+                links_with_metadata,
+                non_fetched_links,
+            ) = await self.scrape_links_with_retries(unique_links)
 
         for response in responses:
             for link_with_metadata in links_with_metadata:
@@ -240,8 +270,13 @@ class WebSearchContentRelevanceModel(BaseRewardModel):
             bt.logging.error(f"Error in Prompt reward method: {str(e)}")
             return None
 
-    def get_rewards(
-        self, prompt: str, responses: List[ScraperStreamingSynapse], name: str, uids
+    async def aget_rewards(
+        self,
+        prompt: str,
+        responses: List[ScraperStreamingSynapse],
+        name: str,
+        uids,
+        prefetched=None,
     ) -> List[BaseRewardEvent]:
         try:
             completions: List[str] = self.get_successful_search_completions(responses)
@@ -251,8 +286,8 @@ class WebSearchContentRelevanceModel(BaseRewardModel):
             bt.logging.trace(
                 f"WebSearchContentRelevanceModel | prompt: {repr(prompt[:50])} ... {repr(prompt[-50:])}"
             )
-            val_score_responses = asyncio.get_event_loop().run_until_complete(
-                self.process_links(prompt=prompt, responses=responses)
+            val_score_responses = await self.process_links(
+                prompt=prompt, responses=responses, prefetched=prefetched
             )
 
             bt.logging.info(
@@ -20,7 +20,6 @@ import time
 import torch
 import bittensor as bt
 import random
-import asyncio
 import re
 from typing import List, Union
 from neurons.validators.reward.config import RewardModelType, RewardScoringType
@@ -111,8 +110,13 @@ class SummaryRelevanceRewardModel(BaseRewardModel):
             bt.logging.error(f"Summary Relevance get_scoring_text: {str(e)}")
             return None
 
-    def get_rewards(
-        self, prompt: str, responses: List[ScraperStreamingSynapse], name: str, uids
+    async def aget_rewards(
+        self,
+        prompt: str,
+        responses: List[ScraperStreamingSynapse],
+        name: str,
+        uids,
+        prefetched=None,
     ) -> List[BaseRewardEvent]:
         try:
             completions: List[str] = self.get_successful_completions_for_summary(
@@ -153,8 +157,8 @@ class SummaryRelevanceRewardModel(BaseRewardModel):
                 bt.logging.info(
                     f"Executing llm_processing on {len(messages)} summary relevance messages."
                 )
-                score_responses = asyncio.get_event_loop().run_until_complete(
-                    self.reward_llm.llm_processing(messages)
+                score_responses = await self.reward_llm.llm_processing(
+                    messages, name=self.name
                 )
 
                 if score_responses and isinstance(
@@ -42,6 +42,7 @@ from neurons.validators.apify.twitter_scraper_actor import TwitterScraperActor
 from datura.services.twitter_api_wrapper import TwitterAPIClient
 from neurons.validators.reward.reward_llm import RewardLLM
 from neurons.validators.utils.prompts import LinkContentPrompt
+from neurons.validators.utils.tweet_cache import TweetCache
 from datura.utils import clean_text
 import json
 from datetime import datetime
@@ -60,13 +61,22 @@ class TwitterContentRelevanceModel(BaseRewardModel):
     def name(self) -> str:
         return RewardModelType.twitter_content_relevance.value
 
-    def __init__(self, device: str, scoring_type: None, llm_reward: RewardLLM):
+    def __init__(
+        self,
+        device: str,
+        scoring_type: None,
+        llm_reward: RewardLLM,
+        tweet_cache: TweetCache,
+        batch_size: int = 1,
+    ):
         super().__init__()
         self.device = device
         self.reward_llm = llm_reward
 
         self.scoring_type = scoring_type
         self.tw_client = TwitterAPIClient()
+        self.tweet_cache = tweet_cache
+        self.batch_size = batch_size
 
     def clean_text(self, text):
         return clean_text(text)
@@ -74,6 +84,7 @@ class TwitterContentRelevanceModel(BaseRewardModel):
     async def llm_process_validator_tweets(self, prompt, tweets_list):
         start_llm_time = time.time()
         scoring_messages = []
+        contents = {}
         for tweet in tweets_list:
             val_text = tweet.full_text
             val_tweet_id = tweet.id
@@ -83,7 +94,20 @@ class TwitterContentRelevanceModel(BaseRewardModel):
             if result:
                 scoring_prompt, scoring_text = result
                 scoring_messages.append({str(val_tweet_id): scoring_text})
-        score_responses = await self.reward_llm.llm_processing(scoring_messages)
+                contents[str(val_tweet_id)] = self.clean_text(val_text)
+
+        if self.batch_size > 1:
+            score_responses = await self.reward_llm.llm_batch_processing(
+                prompt,
+                contents,
+                scoring_messages,
+                batch_size=self.batch_size,
+                name=self.name,
+            )
+        else:
+            score_responses = await self.reward_llm.llm_processing(
+                scoring_messages, name=self.name
+            )
 
         end_llm_time = time.time()
         llm_duration_minutes = (end_llm_time - start_llm_time) / 60
@@ -94,8 +118,22 @@ class TwitterContentRelevanceModel(BaseRewardModel):
 
     async def fetch_tweets_with_retries(self, urls):
         max_retries = 4
-        non_fetched_links = urls
-        tweets_list = []
+        extract_tweet_id = self.tw_client.utils.extract_tweet_id
+
+        # Only tweets missing from the cache are fetched from Apify.
+        cached_tweets = self.tweet_cache.get_many(
+            extract_tweet_id(link) for link in urls
+        )
+        tweets_list = list(cached_tweets.values())
+        non_fetched_links = [
+            link for link in urls if extract_tweet_id(link) not in cached_tweets
+        ]
+
+        if cached_tweets:
+            bt.logging.info(
+                f"Tweet cache: {len(cached_tweets)} tweets cached, fetching {len(non_fetched_links)} links. "
+                f"Stats: {self.tweet_cache.get_stats()}"
+            )
 
         for retry in range(max_retries):
             if not non_fetched_links:
@@ -104,12 +142,14 @@ class TwitterContentRelevanceModel(BaseRewardModel):
             fetched_tweets = await TwitterScraperActor().get_tweets(
                 urls=non_fetched_links
             )
+            self.tweet_cache.record_apify_run(len(fetched_tweets))
+            self.tweet_cache.set_many(fetched_tweets)
             fetched_tweet_ids = {tweet.id for tweet in fetched_tweets}
 
             non_fetched_links = [
                 link
                 for link in non_fetched_links
-                if self.tw_client.utils.extract_tweet_id(link) not in fetched_tweet_ids
+                if extract_tweet_id(link) not in fetched_tweet_ids
             ]
 
             tweets_list.extend(fetched_tweets)
@@ -122,20 +162,28 @@ class TwitterContentRelevanceModel(BaseRewardModel):
 
         return tweets_list, non_fetched_links
 
-    async def process_tweets(self, prompt, responses):
+    def sample_links(self, response: ScraperStreamingSynapse) -> List[str]:
+        if not response.completion_links:
+            return []
+
+        return random.sample(
+            response.completion_links,
+            min(APIFY_LINK_SCRAPE_AMOUNT, len(response.completion_links)),
+        )
+
+    async def process_tweets(self, prompt, responses, prefetched=None):
         try:
             non_fetched_links = {}
             start_time = time.time()
 
-            all_links = [
-                link
-                for response in responses
-                if response.completion_links
-                for link in random.sample(
-                    response.completion_links,
-                    min(APIFY_LINK_SCRAPE_AMOUNT, len(response.completion_links)),
-                )
-            ]
+            if prefetched is not None:
+                # Tweets were already fetched by the validation pipeline while miners were streaming
+                all_links = prefetched.all_links
+            else:
+                all_links = [
+                    link for response in responses for link in self.sample_links(response)
+                ]
+
             unique_links = list(
                 set(all_links)
             )  # Remove duplicates to avoid redundant tasks
@@ -143,9 +191,13 @@ class TwitterContentRelevanceModel(BaseRewardModel):
                 bt.logging.info("No unique links found to process.")
                 return
 
-            tweets_list, non_fetched_links = await self.fetch_tweets_with_retries(
-                unique_links
-            )
+            if prefetched is not None:
+                tweets_list = prefetched.fetched
+                non_fetched_links = prefetched.non_fetched_links
+            else:
+                tweets_list, non_fetched_links = await self.fetch_tweets_with_retries(
+                    unique_links
+                )
 
             for response in responses:
                 ids = [
@@ -206,7 +258,6 @@ class TwitterContentRelevanceModel(BaseRewardModel):
 
             miner_tweets = response.miner_tweets
 
-            miner_tweets_data = miner_tweets.get("data", [])
             # miner_tweets_meta = miner_tweets.get('meta', {})
             miner_tweets_users = miner_tweets.get("includes", {}).get("users", [])
             miner_tweets_amount = miner_tweets.get("meta", {}).get("result_count", 0)
@@ -233,14 +284,7 @@ class TwitterContentRelevanceModel(BaseRewardModel):
                 val_tweet_created_at = val_tweet.created_at
 
                 # Find the corresponding miner tweet by ID
-                miner_tweet = next(
-                    (
-                        tweet
-                        for tweet in miner_tweets_data
-                        if tweet["id"] == val_tweet_id
-                    ),
-                    None,
-                )
+                miner_tweet = response.get_miner_tweet(val_tweet_id)
 
                 # Initialize the score for this iteration
                 tweet_score = 0
@@ -383,8 +427,8 @@ class TwitterContentRelevanceModel(BaseRewardModel):
             bt.logging.warning("\n".join(tb_str) + error_message)
             return None
 
-    def get_rewards(
-        self, prompt: str, responses: List[bt.Synapse], name: str, uids
+    async def aget_rewards(
+        self, prompt: str, responses: List[bt.Synapse], name: str, uids, prefetched=None
     ) -> List[BaseRewardEvent]:
         try:
             completions: List[str] = self.get_successful_twitter_completions(responses)
@@ -395,8 +439,8 @@ class TwitterContentRelevanceModel(BaseRewardModel):
                 f"TwitterContentRelevanceModel | prompt: {repr(prompt[:50])} ... {repr(prompt[-50:])}"
             )
 
-            val_score_responses = asyncio.get_event_loop().run_until_complete(
-                self.process_tweets(prompt=prompt, responses=responses)
+            val_score_responses = await self.process_tweets(
+                prompt=prompt, responses=responses, prefetched=prefetched
             )
             bt.logging.info(f"TwitterContentRelevanceModel | PROMPT: {prompt}")
             bt.logging.info(
@@ -0,0 +1,298 @@
+import time
+import asyncio
+import traceback
+import bittensor as bt
+from typing import Any, Awaitable, Callable, Dict, List
+from dataclasses import dataclass, field
+from datura.protocol import ScraperStreamingSynapse
+from neurons.validators.reward.config import RewardModelType
+
+
+@dataclass
+class PrefetchedLinks:
+    """Validator data fetched for the links sampled from every response of a step."""
+
+    all_links: List[str] = field(default_factory=list)
+    fetched: List[Any] = field(default_factory=list)
+    non_fetched_links: List[str] = field(default_factory=list)
+
+
+class LinkBatcher:
+    """
+    Collects URLs from a bounded queue and fetches them in batches.
+    A batch is sent when it reaches `batch_size` URLs or `batch_window` seconds after its first URL.
+    Every URL is resolved through a future, so it's fetched once per step no matter how many miners cite it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        max_queue_size: int,
+        batch_size: int,
+        batch_window: float,
+    ):
+        self.name = name
+        self.fetch = fetch
+        self.batch_size = max(1, batch_size)
+        self.batch_window = batch_window
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        self.futures: Dict[str, asyncio.Future] = {}
+        self.batch_tasks = set()
+        self.batches_count = 0
+        self.worker = None
+
+    def start(self):
+        self.worker = asyncio.create_task(self.run())
+
+    async def submit(self, url: str) -> asyncio.Future:
+        future = self.futures.get(url)
+
+        if future is None:
+            future = asyncio.get_event_loop().create_future()
+            self.futures[url] = future
+            # Blocks while the queue is full, which slows down submission instead of growing memory.
+            await self.queue.put(url)
+
+        return future
+
+    async def run(self):
+        loop = asyncio.get_event_loop()
+        is_closed = False
+
+        while not is_closed:
+            url = await self.queue.get()
+
+            if url is None:
+                break
+
+            batch = [url]
+            deadline = loop.time() + self.batch_window
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+
+                if timeout <= 0:
+                    break
+
+                try:
+                    url = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+                if url is None:
+                    is_closed = True
+                    break
+
+                batch.append(url)
+
+            task = asyncio.create_task(self.fetch_batch(batch))
+            self.batch_tasks.add(task)
+            task.add_done_callback(self.batch_tasks.discard)
+
+    async def fetch_batch(self, urls: List[str]):
+        self.batches_count += 1
+        start_time = time.time()
+        results = {}
+
+        try:
+            results = await self.fetch(urls)
+        except Exception as e:
+            tb_str = traceback.format_exception(type(e), e, e.__traceback__)
+            bt.logging.error(
+                "\n".join(tb_str) + f"LinkBatcher {self.name}: batch fetch failed: {e}"
+            )
+
+        for url in urls:
+            future = self.futures[url]
+            if not future.done():
+                future.set_result(results.get(url))
+
+        bt.logging.info(
+            f"LinkBatcher {self.name}: fetched {len([url for url in urls if results.get(url) is not None])}/{len(urls)} links "
+            f"in {time.time() - start_time:.2f}s"
+        )
+
+    async def close(self):
+        if self.worker is None:
+            return
+
+        await self.queue.put(None)
+        await self.worker
+
+        while self.batch_tasks:
+            await asyncio.gather(*list(self.batch_tasks))
+
+    def cancel(self):
+        if self.worker is not None:
+            self.worker.cancel()
+
+        for task in list(self.batch_tasks):
+            task.cancel()
+
+        for future in self.futures.values():
+            if not future.done():
+                future.cancel()
+
+
+class ValidationPipeline:
+    """
+    Starts tweet and link validation for each miner as soon as its stream finishes,
+    so that Apify lookups overlap with the streaming of slower miners.
+
+    Usage for one step:
+        pipeline.start()
+        await pipeline.submit(uid, response)  # for every finished response
+        prefetched = await pipeline.finish()  # passed on to the reward models
+    """
+
+    def __init__(
+        self,
+        twitter_model=None,
+        search_model=None,
+        max_queue_size: int = 1000,
+        batch_size: int = 200,
+        batch_window: float = 10,
+    ):
+        self.twitter_model = twitter_model
+        self.search_model = search_model
+        self.twitter_links = []
+        self.search_links = []
+        self.uid_tasks: Dict[int, asyncio.Task] = {}
+        self.start_time = None
+
+        self.twitter_batcher = (
+            LinkBatcher(
+                name="twitter",
+                fetch=self.fetch_tweets,
+                max_queue_size=max_queue_size,
+                batch_size=batch_size,
+                batch_window=batch_window,
+            )
+            if twitter_model
+            else None
+        )
+        self.search_batcher = (
+            LinkBatcher(
+                name="web",
+                fetch=self.fetch_links,
+                max_queue_size=max_queue_size,
+                batch_size=batch_size,
+                batch_window=batch_window,
+            )
+            if search_model
+            else None
+        )
+
+    @property
+    def batchers(self) -> List[LinkBatcher]:
+        return [
+            batcher
+            for batcher in [self.twitter_batcher, self.search_batcher]
+            if batcher
+        ]
+
+    def start(self):
+        self.start_time = time.time()
+        for batcher in self.batchers:
+            batcher.start()
+
+    async def fetch_tweets(self, urls: List[str]) -> Dict[str, Any]:
+        tweets, _ = await self.twitter_model.fetch_tweets_with_retries(urls)
+        tweets_by_id = {tweet.id: tweet for tweet in tweets}
+        extract_tweet_id = self.twitter_model.tw_client.utils.extract_tweet_id
+
+        return {url: tweets_by_id.get(extract_tweet_id(url)) for url in urls}
+
+    async def fetch_links(self, urls: List[str]) -> Dict[str, Any]:
+        links_with_metadata, _ = await self.search_model.scrape_links_with_retries(
+            urls
+        )
+
+        return {link.get("url"): link for link in links_with_metadata}
+
+    async def submit(self, uid: int, response: ScraperStreamingSynapse):
+        futures = []
+
+        if self.twitter_batcher:
+            links = self.twitter_model.sample_links(response)
+            self.twitter_links.extend(links)
+            for link in links:
+                futures.append(await self.twitter_batcher.submit(link))
+
+        if self.search_batcher:
+            links = self.search_model.sample_links(response)
+            self.search_links.extend(links)
+            for link in links:
+                futures.append(await self.search_batcher.submit(link))
+
+        self.uid_tasks[uid] = asyncio.create_task(self.wait_for_uid(uid, futures))
+
+    async def wait_for_uid(self, uid: int, futures: List[asyncio.Future]):
+        results = await asyncio.gather(*futures)
+        bt.logging.debug(
+            f"ValidationPipeline: UID {uid} resolved {len([result for result in results if result is not None])}/{len(results)} "
+            f"links after {time.time() - self.start_time:.2f}s"
+        )
+
+    def collect(
+        self, batcher: LinkBatcher, links: List[str], key: Callable[[Any], Any]
+    ) -> PrefetchedLinks:
+        fetched = []
+        seen = set()
+        non_fetched_links = []
+
+        for url, future in batcher.futures.items():
+            result = future.result() if not future.cancelled() else None
+
+            if result is None:
+                non_fetched_links.append(url)
+                continue
+
+            # Different links (e.g. twitter.com and x.com) can point to the same item.
+            result_key = key(result)
+            if result_key not in seen:
+                seen.add(result_key)
+                fetched.append(result)
+
+        return PrefetchedLinks(
+            all_links=links, fetched=fetched, non_fetched_links=non_fetched_links
+        )
+
+    async def finish(self) -> Dict[str, PrefetchedLinks]:
+        """Flushes pending batches, waits for every lookup and returns the results keyed by reward model name."""
+        try:
+            for batcher in self.batchers:
+                await batcher.close()
+
+            await asyncio.gather(*self.uid_tasks.values())
+        except BaseException:
+            self.cancel()
+            raise
+
+        prefetched = {}
+
+        if self.twitter_batcher:
+            prefetched[RewardModelType.twitter_content_relevance.value] = self.collect(
+                self.twitter_batcher, self.twitter_links, key=lambda tweet: tweet.id
+            )
+
+        if self.search_batcher:
+            prefetched[RewardModelType.search_content_relevance.value] = self.collect(
+                self.search_batcher, self.search_links, key=lambda link: link.get("url")
+            )
+
+        bt.logging.info(
+            f"ValidationPipeline: resolved links of {len(self.uid_tasks)} miners in "
+            f"{time.time() - self.start_time:.2f}s with "
+            f"{sum(batcher.batches_count for batcher in self.batchers)} Apify batches"
+        )
+
+        return prefetched
+
+    def cancel(self):
+        for batcher in self.batchers:
+            batcher.cancel()
+
+        for task in self.uid_tasks.values():
+            task.cancel()
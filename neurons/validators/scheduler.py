@@ -0,0 +1,147 @@
+import time
+import random
+import asyncio
+import bittensor as bt
+from collections import deque
+from typing import Awaitable, Callable, Dict, List
+from datura import QUERY_MINERS
+
+
+class StepMetrics:
+    """Counters for the synthetic steps of one strategy."""
+
+    def __init__(self, strategy: QUERY_MINERS, history_size: int = 100):
+        self.strategy = strategy
+        self.scheduled = 0
+        self.skipped = 0
+        self.started = 0
+        self.finished = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.running = 0
+        self.max_running = 0
+        self.durations = deque(maxlen=history_size)
+
+    def on_start(self):
+        self.started += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+
+    def on_finish(self, duration: float):
+        self.running -= 1
+        self.durations.append(duration)
+
+    def to_dict(self) -> Dict:
+        durations = list(self.durations)
+        return {
+            "strategy": self.strategy.name,
+            "scheduled": self.scheduled,
+            "skipped": self.skipped,
+            "started": self.started,
+            "finished": self.finished,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "running": self.running,
+            "max_running": self.max_running,
+            "avg_duration": sum(durations) / len(durations) if durations else None,
+            "max_duration": max(durations) if durations else None,
+        }
+
+
+class SyntheticQueryScheduler:
+    """
+    Schedules synthetic steps per strategy on the validator's event loop.
+
+    Every strategy has a producer that puts a job on a bounded queue each `interval` seconds (plus jitter),
+    and `concurrency` workers that run the jobs with a deadline. When all workers are busy and the queue is full
+    the tick is skipped, so slow steps never pile up.
+    """
+
+    def __init__(
+        self,
+        run_step: Callable[[QUERY_MINERS], Awaitable[None]],
+        is_ready: Callable[[], bool] = lambda: True,
+        jitter: float = 0,
+        step_timeout: float = None,
+    ):
+        self.run_step = run_step
+        self.is_ready = is_ready
+        self.jitter = jitter
+        self.step_timeout = step_timeout
+        self.metrics: Dict[QUERY_MINERS, StepMetrics] = {}
+        self.tasks: List[asyncio.Task] = []
+
+    def add_strategy(self, strategy: QUERY_MINERS, interval: float, concurrency: int):
+        if interval <= 0:
+            bt.logging.info(f"Scheduler: {strategy.name} synthetic queries are disabled.")
+            return
+
+        concurrency = max(1, concurrency)
+        queue = asyncio.Queue(maxsize=concurrency)
+        self.metrics[strategy] = StepMetrics(strategy)
+
+        self.tasks.append(asyncio.create_task(self.produce(strategy, queue, interval)))
+        self.tasks.extend(
+            asyncio.create_task(self.work(strategy, queue)) for _ in range(concurrency)
+        )
+
+        bt.logging.info(
+            f"Scheduler: {strategy.name} every {interval}s with up to {concurrency} concurrent steps."
+        )
+
+    async def produce(self, strategy: QUERY_MINERS, queue: asyncio.Queue, interval: float):
+        metrics = self.metrics[strategy]
+
+        while True:
+            if not self.is_ready():
+                bt.logging.info("No available UIDs, sleeping for 10 seconds.")
+                await asyncio.sleep(10)
+                continue
+
+            try:
+                queue.put_nowait(time.time())
+                metrics.scheduled += 1
+            except asyncio.QueueFull:
+                metrics.skipped += 1
+                bt.logging.warning(
+                    f"Scheduler: skipping {strategy.name} step, {metrics.running} steps still running."
+                )
+
+            await asyncio.sleep(interval + random.uniform(0, self.jitter))
+
+    async def work(self, strategy: QUERY_MINERS, queue: asyncio.Queue):
+        metrics = self.metrics[strategy]
+
+        while True:
+            scheduled_at = await queue.get()
+            start_time = time.time()
+            metrics.on_start()
+
+            bt.logging.info(
+                f"Scheduler: starting {strategy.name} step after {start_time - scheduled_at:.2f}s in queue, "
+                f"{metrics.running} running."
+            )
+
+            try:
+                await asyncio.wait_for(self.run_step(strategy), self.step_timeout)
+                metrics.finished += 1
+            except asyncio.TimeoutError:
+                metrics.timed_out += 1
+                bt.logging.error(
+                    f"Scheduler: {strategy.name} step exceeded the deadline of {self.step_timeout}s and was cancelled."
+                )
+            except Exception as e:
+                metrics.failed += 1
+                bt.logging.error(f"Scheduler: {strategy.name} step failed: {e}")
+            finally:
+                metrics.on_finish(time.time() - start_time)
+                queue.task_done()
+
+            bt.logging.info(f"Scheduler metrics: {metrics.to_dict()}")
+
+    def get_metrics(self) -> List[Dict]:
+        return [metrics.to_dict() for metrics in self.metrics.values()]
+
+    def stop(self):
+        for task in self.tasks:
+            task.cancel()
@@ -1,3 +1,4 @@
+import os
 import math
 import torch
 import wandb
@@ -10,7 +11,10 @@ from datura.protocol import (
     TwitterPromptAnalysisResult,
     SearchSynapse,
 )
-from datura.stream import process_async_responses, process_single_response
+from datura.stream import (
+    process_async_responses_as_completed,
+    process_single_response,
+)
 from reward import RewardModelType, RewardScoringType
 from typing import List
 from utils.mock import MockRewardModel
@@ -31,11 +35,22 @@ from neurons.validators.reward.performance_reward import (
     PerformanceRewardModel,
 )
 from neurons.validators.reward.reward_llm import RewardLLM
+from neurons.validators.reward.validation_pipeline import ValidationPipeline
 from neurons.validators.utils.tasks import TwitterTask, SearchTask
+from neurons.validators.utils.single_flight import SingleFlight, organic_query_key
+from neurons.validators.utils.latency_tracker import LatencyTracker, is_cut_off
+from neurons.validators.utils.hedging import HedgedStream, HedgeStats
+from neurons.validators.utils.scored_response import ScoredResponse
+from neurons.validators.utils.tweet_cache import TweetCache
+from neurons.validators.utils.link_metadata_cache import LinkMetadataCache
+from neurons.validators.utils.llm_score_cache import LLMScoreCache
+from neurons.validators.utils.scoring_client import ScoringClient
 
 from datura.dataset import MockTwitterQuestionsDataset, QuestionsDataset
 from datura.services.twitter_api_wrapper import TwitterAPIClient
 from datura import QUERY_MINERS
+from datura.framing import get_stream_compression, get_stream_encoding
+from datura.stream_budget import StreamMemoryBudget
 import asyncio
 from aiostream import stream
 from datura.dataset.date_filters import (
@@ -54,6 +69,26 @@ class ScraperValidator:
         self.seed = 1234
         self.neuron = neuron
         self.timeout = 180
+        self.organic_flights = SingleFlight()
+        self.hedge_stats = HedgeStats()
+        self.latency_tracker = LatencyTracker(
+            path=os.path.join(
+                self.neuron.config.neuron.full_path, "latency_histograms.json"
+            )
+        )
+        self.tweet_cache = TweetCache(
+            path=os.path.join(
+                self.neuron.config.neuron.full_path, "tweet_cache.sqlite"
+            ),
+            ttl=self.neuron.config.neuron.tweet_cache_ttl,
+        )
+        self.link_metadata_cache = LinkMetadataCache(
+            path=os.path.join(
+                self.neuron.config.neuron.full_path, "link_metadata_cache.sqlite"
+            ),
+            ttl=self.neuron.config.neuron.link_metadata_cache_ttl,
+            failure_ttl=self.neuron.config.neuron.link_metadata_failure_ttl,
+        )
         self.tools = [
             ["Twitter Search", "Reddit Search"],
             ["Twitter Search", "Reddit Search"],
@@ -113,7 +148,21 @@ class ScraperValidator:
             bt.logging.error(message)
             raise Exception(message)
 
-        self.reward_llm = RewardLLM()
+        self.llm_score_cache = LLMScoreCache(
+            path=os.path.join(
+                self.neuron.config.neuron.full_path, "llm_score_cache.sqlite"
+            ),
+            max_entries=self.neuron.config.neuron.llm_score_cache_size,
+        )
+        self.scoring_client = ScoringClient(
+            max_concurrency=self.neuron.config.neuron.openai_max_concurrency,
+            rpm=self.neuron.config.neuron.openai_rpm,
+            tpm=self.neuron.config.neuron.openai_tpm,
+            max_retries=self.neuron.config.neuron.openai_max_retries,
+        )
+        self.reward_llm = RewardLLM(
+            score_cache=self.llm_score_cache, scoring_client=self.scoring_client
+        )
         # if (
         #     self.neuron.config.reward.twitter_content_weight > 0
         #     or self.neuron.config.reward.summary_relevance_weight > 0
@@ -135,6 +184,8 @@ class ScraperValidator:
                     device=self.neuron.config.neuron.device,
                     scoring_type=RewardScoringType.summary_relevance_score_template,
                     llm_reward=self.reward_llm,
+                    tweet_cache=self.tweet_cache,
+                    batch_size=self.neuron.config.reward.twitter_content_batch_size,
                 )
                 if self.neuron.config.reward.twitter_content_weight > 0
                 else MockRewardModel(RewardModelType.twitter_content_relevance.value)
@@ -144,6 +195,8 @@ class ScraperValidator:
                     device=self.neuron.config.neuron.device,
                     scoring_type=RewardScoringType.search_relevance_score_template,
                     llm_reward=self.reward_llm,
+                    link_metadata_cache=self.link_metadata_cache,
+                    batch_size=self.neuron.config.reward.web_search_relavance_batch_size,
                 )
                 if self.neuron.config.reward.web_search_relavance_weight > 0
                 else MockRewardModel(RewardModelType.search_content_relevance.value)
@@ -175,6 +228,7 @@ class ScraperValidator:
         language="en",
         region="us",
         google_date_filter="qdr:w",
+        is_adaptive_timeout=False,
     ):
         task_name = task.task_name
         prompt = task.compose_prompt()
@@ -208,63 +262,156 @@ class ScraperValidator:
             language=language,
             region=region,
             google_date_filter=google_date_filter,
+            stream_framing=self.neuron.config.neuron.stream_framing,
+            stream_encoding=get_stream_encoding(
+                self.neuron.config.neuron.stream_encoding
+            ).value,
+            stream_compression=get_stream_compression(
+                self.neuron.config.neuron.stream_compression
+            ).value,
         )
 
+        config = self.neuron.config.neuron
+        memory_budget = StreamMemoryBudget(
+            max_frame_bytes=config.max_miner_frame_bytes,
+            max_stream_bytes=config.max_miner_stream_bytes,
+            max_step_bytes=config.step_memory_budget_bytes,
+        )
+        synapse.set_memory_budget(memory_budget)
+        event["stream_memory_budget"] = memory_budget
+
         # Make calls to the network with the prompt.
-        async_responses = await self.neuron.dendrite.forward(
-            axons=axons,
-            synapse=synapse,
-            timeout=self.timeout,
-            streaming=self.streaming,
-            deserialize=False,
+        if is_adaptive_timeout:
+            async_responses = await self.fanout_with_adaptive_timeouts(
+                uids=uids, axons=axons, synapse=synapse
+            )
+        else:
+            async_responses = await self.fanout(
+                axons=axons,
+                synapse=synapse,
+                timeout=self.timeout,
+            )
+
+        return async_responses, uids, event, start_time
+
+    def get_adaptive_timeout(self, uid: int, axon) -> float:
+        return self.latency_tracker.get_timeout(
+            uid=uid,
+            hotkey=axon.hotkey,
+            default_timeout=self.timeout,
+            margin=self.neuron.config.neuron.organic_timeout_margin,
+            min_timeout=self.neuron.config.neuron.organic_min_timeout,
+            min_samples=self.neuron.config.neuron.organic_timeout_min_samples,
         )
 
-        axon_group_1 = axons[:80]
-        axon_group_2 = axons[80:160]
-        axon_group_3 = axons[160:]
+    async def fanout_with_adaptive_timeouts(self, uids, axons, synapse):
+        """Fans out with a deadline per UID based on its observed latency. Responses keep the order of the axons."""
+        indices_by_timeout = {}
+
+        for index, (uid, axon) in enumerate(zip(uids, axons)):
+            uid = uid.item() if hasattr(uid, "item") else uid
+            timeout = self.get_adaptive_timeout(uid, axon)
+            indices_by_timeout.setdefault(timeout, []).append(index)
 
-        async_response_groups = await asyncio.gather(
+        bt.logging.debug(
+            f"Adaptive timeouts: { {timeout: len(indices) for timeout, indices in indices_by_timeout.items()} }"
+        )
+
+        response_groups = await asyncio.gather(
             *[
-                asyncio.create_task(
-                    self.neuron.dendrite1.forward(
-                        axons=axon_group_1,
-                        synapse=synapse,
-                        timeout=self.timeout,
-                        streaming=self.streaming,
-                        deserialize=False,
-                    )
-                ),
-                asyncio.create_task(
-                    self.neuron.dendrite2.forward(
-                        axons=axon_group_2,
-                        synapse=synapse,
-                        timeout=self.timeout,
-                        streaming=self.streaming,
-                        deserialize=False,
-                    )
-                ),
-                asyncio.create_task(
-                    self.neuron.dendrite3.forward(
-                        axons=axon_group_3,
-                        synapse=synapse,
-                        timeout=self.timeout,
-                        streaming=self.streaming,
-                        deserialize=False,
-                    )
-                ),
+                self.fanout(
+                    axons=[axons[index] for index in indices],
+                    synapse=synapse,
+                    timeout=timeout,
+                )
+                for timeout, indices in indices_by_timeout.items()
+            ]
+        )
+
+        async_responses = [None] * len(axons)
+
+        for indices, responses in zip(indices_by_timeout.values(), response_groups):
+            for index, response in zip(indices, responses):
+                async_responses[index] = response
+
+        return async_responses
+
+    async def fanout(self, axons, synapse, timeout):
+        """Sends the synapse to every axon exactly once, sharding the axons over the dendrite pool.
+
+        Responses are returned in the same order as the given axons.
+        """
+        dendrites = self.neuron.dendrites
+        shard_size = max(1, self.neuron.config.neuron.fanout_shard_size)
+        shards = [axons[i : i + shard_size] for i in range(0, len(axons), shard_size)]
+
+        async def forward_shard(shard_index, shard_axons):
+            dendrite = dendrites[shard_index % len(dendrites)]
+            shard_start_time = time.time()
+            responses = await dendrite.forward(
+                axons=shard_axons,
+                synapse=synapse,
+                timeout=timeout,
+                streaming=self.streaming,
+                deserialize=False,
+            )
+            bt.logging.debug(
+                f"Fan-out shard {shard_index + 1}/{len(shards)}: {len(shard_axons)} axons "
+                f"via dendrite {shard_index % len(dendrites)} in {time.time() - shard_start_time:.2f}s"
+            )
+            return responses
+
+        fanout_start_time = time.time()
+        response_shards = await asyncio.gather(
+            *[
+                forward_shard(shard_index, shard_axons)
+                for shard_index, shard_axons in enumerate(shards)
             ]
         )
 
         async_responses = []
 
-        for async_response_group in async_response_groups:
-            async_responses.extend(async_response_group)
+        for response_shard in response_shards:
+            async_responses.extend(response_shard)
 
-        return async_responses, uids, event, start_time
+        bt.logging.info(
+            f"Fan-out to {len(axons)} axons in {len(shards)} shards over {len(dendrites)} dendrites "
+            f"took {time.time() - fanout_start_time:.2f}s"
+        )
+
+        return async_responses
+
+    def create_validation_pipeline(self) -> ValidationPipeline:
+        twitter_model = next(
+            (
+                reward_fn
+                for reward_fn in self.reward_functions
+                if isinstance(reward_fn, TwitterContentRelevanceModel)
+            ),
+            None,
+        )
+        search_model = next(
+            (
+                reward_fn
+                for reward_fn in self.reward_functions
+                if isinstance(reward_fn, WebSearchContentRelevanceModel)
+            ),
+            None,
+        )
+
+        return ValidationPipeline(
+            twitter_model=twitter_model,
+            search_model=search_model,
+            max_queue_size=self.neuron.config.neuron.validation_queue_size,
+            batch_size=self.neuron.config.neuron.validation_batch_size,
+            batch_window=self.neuron.config.neuron.validation_batch_window,
+        )
 
     async def compute_rewards_and_penalties(
-        self, event, prompt, task, responses, uids, start_time
+        self, event, prompt, task, responses, uids, start_time, prefetched=None
     ):
+        # `responses` are the ScoredResponse of each uid, callers release the synapses they were
+        # built from: scoring and the background log task only keep what they read from them.
         try:
             if not len(uids):
                 bt.logging.warning("No UIDs provided for logging event.")
@@ -272,6 +419,37 @@ class ScraperValidator:
 
             bt.logging.info("Computing rewards and penalties")
 
+            memory_budget = event.pop("stream_memory_budget", None)
+
+            if memory_budget is not None:
+                memory_event = memory_budget.get_event()
+                event.update(memory_event)
+                bt.logging.info(f"Stream memory: {memory_event}")
+
+            scoring_stats = self.scoring_client.start_step()
+
+            self.latency_tracker.record_responses(
+                uids, responses, full_timeout=self.timeout
+            )
+
+            # Miners are not scored against a deadline the validator shortened from their history.
+            scored_indices = [
+                index
+                for index, response in enumerate(responses)
+                if not is_cut_off(response, full_timeout=self.timeout)
+            ]
+
+            if len(scored_indices) < len(responses):
+                bt.logging.info(
+                    f"Skipping {len(responses) - len(scored_indices)} responses cut off by an adaptive timeout"
+                )
+                responses = [responses[index] for index in scored_indices]
+                uids = uids[scored_indices]
+
+            if not len(uids):
+                bt.logging.warning("No responses left to score.")
+                return
+
             rewards = torch.zeros(len(responses), dtype=torch.float32).to(
                 self.neuron.config.neuron.device
             )
@@ -280,17 +458,39 @@ class ScraperValidator:
             all_original_rewards = []
             val_score_responses_list = []
 
-            for weight_i, reward_fn_i in zip(
-                self.reward_weights, self.reward_functions
-            ):
-                start_time = time.time()
-                (
-                    reward_i_normalized,
-                    reward_event,
-                    val_score_responses,
-                    original_rewards,
-                ) = reward_fn_i.apply(task.base_text, responses, task.task_name, uids)
+            async def apply_reward_function(reward_fn_i):
+                reward_start_time = time.time()
+                result = await reward_fn_i.aapply(
+                    task.base_text,
+                    responses,
+                    task.task_name,
+                    uids,
+                    prefetched=prefetched.get(reward_fn_i.name) if prefetched else None,
+                )
+                execution_time = time.time() - reward_start_time
+                bt.logging.info(
+                    f"Applied reward function: {reward_fn_i.name} in {execution_time / 60:.2f} minutes"
+                )
+                return result
+
+            # Reward functions wait on Apify and OpenAI, so they run concurrently.
+            reward_results = await asyncio.gather(
+                *[
+                    apply_reward_function(reward_fn_i)
+                    for reward_fn_i in self.reward_functions
+                ]
+            )
+
+            scoring_event = scoring_stats.get_event()
+            event.update(scoring_event)
+            bt.logging.info(f"OpenAI scoring: {scoring_event}")
 
+            for weight_i, reward_fn_i, (
+                reward_i_normalized,
+                reward_event,
+                val_score_responses,
+                original_rewards,
+            ) in zip(self.reward_weights, self.reward_functions, reward_results):
                 all_rewards.append(reward_i_normalized)
                 all_original_rewards.append(original_rewards)
                 val_score_responses_list.append(val_score_responses)
@@ -300,11 +500,7 @@ class ScraperValidator:
                 )
                 if not self.neuron.config.neuron.disable_log_rewards:
                     event = {**event, **reward_event}
-                execution_time = time.time() - start_time
                 bt.logging.trace(str(reward_fn_i.name), reward_i_normalized.tolist())
-                bt.logging.info(
-                    f"Applied reward function: {reward_fn_i.name} in {execution_time / 60:.2f} minutes"
-                )
 
             for penalty_fn_i in self.penalty_functions:
                 raw_penalty_i, adjusted_penalty_i, applied_penalty_i = (
@@ -477,28 +673,65 @@ class ScraperValidator:
                 google_date_filter=self.date_filter,
             )
 
-            final_synapses = []
-            async for value in process_async_responses(
-                async_responses, uids, start_time
-            ):
-                if isinstance(value, bt.Synapse):
-                    final_synapses.append(value)
-                else:
-                    pass
+            pipeline = self.create_validation_pipeline()
+            pipeline.start()
+
+            try:
+                responses_by_uid = {}
+                async for uid, final_synapse in process_async_responses_as_completed(
+                    async_responses, uids, start_time
+                ):
+                    bt.logging.debug(
+                        f"Collected final synapse from UID {uid} ({len(responses_by_uid) + 1}/{len(uids)})"
+                    )
+
+                    # Start validating this miner's links while the others are still streaming
+                    await pipeline.submit(uid, final_synapse)
+
+                    # Only what scoring reads is kept, the synapse is released.
+                    responses_by_uid[uid] = ScoredResponse.from_synapse(final_synapse)
+
+                # The loop variable would keep the last synapse alive.
+                final_synapse = None
+                prefetched = await pipeline.finish()
+            except BaseException:
+                pipeline.cancel()
+                raise
+
+            # Restore the order of the queried uids, dropping miners without a final synapse.
+            responded_indices = [
+                index
+                for index, uid in enumerate(uids.tolist())
+                if uid in responses_by_uid
+            ]
+            responses = [
+                responses_by_uid.pop(uids[index].item()) for index in responded_indices
+            ]
+            uids = uids[responded_indices]
 
             await self.compute_rewards_and_penalties(
                 event=event,
                 prompt=prompt,
                 task=task,
-                responses=final_synapses,
+                responses=responses,
                 uids=uids,
                 start_time=start_time,
+                prefetched=prefetched,
             )
         except Exception as e:
             bt.logging.error(f"Error in query_and_score: {e}")
             raise e
 
-    async def organic(self, query):
+    def organic(self, query):
+        """
+        Streams the answer to an organic query. Identical queries asked while one is in flight
+        share its miner stream and its scoring.
+        """
+        return self.organic_flights.stream(
+            organic_query_key(query), lambda: self.organic_query(query)
+        )
+
+    async def organic_query(self, query):
         try:
             prompt = query["content"]
             tools = query.get("tools", [])
@@ -519,37 +752,85 @@ class ScraperValidator:
 
             date_filter = get_specified_date_filter(date_filter_type)
 
-            async_responses, uids, event, start_time = await self.run_task_and_score(
-                task=task,
-                strategy=QUERY_MINERS.RANDOM,
-                # This is set to false on Finney to allow all miners to participate from Datura UI
-                is_only_allowed_miner=self.neuron.config.subtensor.network != "finney",
-                is_intro_text=True,
-                tools=tools,
-                language=self.language,
-                region=self.region,
-                date_filter=date_filter,
-                google_date_filter=self.date_filter,
+            queried_uids = []
+            first_query = {}
+
+            async def launch():
+                specified_uids = None
+
+                # Hedges go to miners that weren't queried for this request yet.
+                if queried_uids:
+                    specified_uids = [
+                        uid
+                        for uid in self.neuron.available_uids
+                        if uid not in queried_uids
+                    ]
+                    if not specified_uids:
+                        return None
+
+                async_responses, uids, event, start_time = (
+                    await self.run_task_and_score(
+                        task=task,
+                        strategy=QUERY_MINERS.RANDOM,
+                        # This is set to false on Finney to allow all miners to participate from Datura UI
+                        is_only_allowed_miner=self.neuron.config.subtensor.network
+                        != "finney",
+                        is_intro_text=True,
+                        specified_uids=specified_uids,
+                        tools=tools,
+                        language=self.language,
+                        region=self.region,
+                        date_filter=date_filter,
+                        google_date_filter=self.date_filter,
+                        is_adaptive_timeout=True,
+                    )
+                )
+
+                if not len(uids):
+                    return None
+
+                uid = uids[0].item()
+                queried_uids.append(uid)
+
+                if not first_query:
+                    first_query.update(event=event, start_time=start_time)
+
+                return uid, async_responses[0]
+
+            hedged_stream = HedgedStream(
+                launch=launch,
+                hedge_delay=self.neuron.config.neuron.organic_hedge_delay,
+                max_streams=self.neuron.config.neuron.organic_hedge_max_miners,
+                stats=self.hedge_stats,
             )
-            final_synapses = []
-            for response in async_responses:
-                async for value in response:
-                    if isinstance(value, bt.Synapse):
-                        final_synapses.append(value)
-                    else:
-                        yield value
+
+            async for value in hedged_stream.stream():
+                yield value
+
+            if not first_query:
+                return
 
             async def process_and_score_responses():
+                # Losing miners are still scored once their streams complete.
+                uids, final_synapses = await hedged_stream.collect()
+                responses = ScoredResponse.from_synapses(final_synapses)
+                del final_synapses
+
                 await self.compute_rewards_and_penalties(
-                    event=event,
+                    event=first_query["event"],
                     prompt=prompt,
                     task=task,
-                    responses=final_synapses,
-                    uids=uids,
-                    start_time=start_time,
+                    responses=responses,
+                    uids=torch.tensor(uids),
+                    start_time=first_query["start_time"],
                 )
 
+            is_complete = hedged_stream.is_complete
             asyncio.create_task(process_and_score_responses())
+
+            # Lets callers tell a partial answer from a complete one, e.g. to not cache it.
+            if not is_complete:
+                raise RuntimeError("The miner stream ended before the answer was complete")
         except Exception as e:
             bt.logging.error(f"Error in organic: {e}")
             raise e
@@ -603,6 +884,7 @@ class ScraperValidator:
                 region=self.region,
                 date_filter=date_filter,
                 google_date_filter=self.date_filter,
+                is_adaptive_timeout=True,
             )
 
             async def stream_response(uid, async_response):
@@ -615,7 +897,10 @@ class ScraperValidator:
                     if isinstance(value, bt.Synapse):
                         yield value
                     else:
-                        yield json.dumps({"uid": uid, **json.loads(value)})
+                        data = value.decode()
+
+                        if isinstance(data, dict):
+                            yield json.dumps({"uid": uid, **data})
 
             async_responses_with_uid = [
                 stream_response(uid.item(), response)
@@ -625,16 +910,20 @@ class ScraperValidator:
             if len(async_responses_with_uid) > 0:
                 merged_stream_with_uid = stream.merge(*async_responses_with_uid)
 
-                final_synapses = []
+                responses = []
 
                 async with merged_stream_with_uid.stream() as streamer:
                     async for value in streamer:
                         if isinstance(value, bt.Synapse):
-                            final_synapses.append(value)
+                            # Only what scoring reads is kept, the synapse is released.
+                            responses.append(ScoredResponse.from_synapse(value))
                         else:
                             yield value
 
-                for uid_tensor, response in zip(uids, final_synapses):
+                    # The loop variable would keep the last synapse alive.
+                    value = None
+
+                for uid_tensor in uids[: len(responses)]:
                     uid = uid_tensor.item()
                     yield format_response(
                         uid, "\n\n----------------------------------------\n"
@@ -650,7 +939,7 @@ class ScraperValidator:
                         event=event,
                         prompt=prompt,
                         task=task,
-                        responses=final_synapses,
+                        responses=responses,
                         uids=uids,
                         start_time=start_time,
                     )
@@ -665,11 +954,17 @@ class ScraperValidator:
                         yield f"Waiting for reward scoring... {elapsed_time // 60} minutes elapsed.\n\n"
                         start_compute_time = time.time()  # Reset the timer
 
-                rewards, uids, val_score_responses_list, event = await rewards_task
+                result = await rewards_task
+
+                # Nothing is scored when every miner was cut off by its adaptive timeout.
+                if result is not None:
+                    rewards, uids, val_score_responses_list, event = result
+                else:
+                    uids = uids[:0]
+
                 for i, uid_tensor in enumerate(uids):
                     uid = uid_tensor.item()
                     reward = rewards[i].item()
-                    response = final_synapses[i]
 
                     # val_score_response = self.format_val_score_responses([val_score_responses_list[i]])
 
@@ -0,0 +1,233 @@
+import json
+import asyncio
+import bittensor as bt
+from datura.framing import Frame
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+# Returned by a launch function: the uid and the stream of a miner, or None when no miner is left.
+Launch = Callable[[], Awaitable[Optional[Tuple[int, AsyncIterator[Any]]]]]
+
+STREAM_DONE = object()
+
+
+def is_text_event(value: Any) -> bool:
+    if isinstance(value, Frame):
+        return value.type == "text"
+
+    try:
+        return json.loads(value).get("type") == "text"
+    except (TypeError, ValueError, AttributeError):
+        return False
+
+
+class HedgeStats:
+    """Counts how often organic requests are hedged and which stream wins."""
+
+    def __init__(self):
+        self.requests = 0
+        self.hedged_requests = 0
+        self.hedges = 0
+        self.wins_by_rank: Dict[int, int] = {}
+        self.no_winner = 0
+
+    def record(self, launched: int, winner_rank: Optional[int]):
+        self.requests += 1
+        self.hedges += launched - 1
+
+        if launched > 1:
+            self.hedged_requests += 1
+
+        if winner_rank is None:
+            self.no_winner += 1
+        else:
+            self.wins_by_rank[winner_rank] = self.wins_by_rank.get(winner_rank, 0) + 1
+
+    def get_stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "hedged_requests": self.hedged_requests,
+            "hedge_rate": self.hedged_requests / self.requests if self.requests else None,
+            "hedges": self.hedges,
+            "wins_by_rank": self.wins_by_rank,
+            "hedge_wins": sum(
+                count for rank, count in self.wins_by_rank.items() if rank > 0
+            ),
+            "no_winner": self.no_winner,
+        }
+
+
+class HedgedStream:
+    """
+    Streams the answer of the first miner that produces a `text` event.
+
+    The first miner is queried right away. While no stream has produced text, another miner is
+    queried every `hedge_delay` seconds, up to `max_streams` miners. Once a stream wins, its chunks
+    (including the ones it sent before winning) are yielded. The other streams keep running only
+    to collect their final synapses for scoring.
+    """
+
+    def __init__(
+        self,
+        launch: Launch,
+        hedge_delay: float,
+        max_streams: int,
+        stats: HedgeStats = None,
+    ):
+        self.launch = launch
+        self.hedge_delay = hedge_delay
+        self.max_streams = max(1, max_streams) if hedge_delay > 0 else 1
+        self.stats = stats
+        self.queue = asyncio.Queue()
+        self.uids: List[int] = []
+        self.chunks: List[List[Any]] = []
+        self.final_synapses: Dict[int, bt.Synapse] = {}
+        self.pumps: List[asyncio.Task] = []
+        self.is_exhausted = False
+        # Rank of the stream that is yielded, once a stream produced text.
+        self.winner: Optional[int] = None
+        self.failed_ranks: Set[int] = set()
+
+    async def pump(self, rank: int, uid: int, response: AsyncIterator[Any]):
+        try:
+            async for value in response:
+                if isinstance(value, bt.Synapse):
+                    self.final_synapses[rank] = value
+                elif self.winner is not None and self.winner != rank:
+                    # Losing streams only run on for their final synapse, nobody reads their chunks.
+                    continue
+                else:
+                    await self.queue.put((rank, value))
+        except Exception as e:
+            self.failed_ranks.add(rank)
+            bt.logging.error(f"HedgedStream: stream of UID {uid} failed: {e}")
+        finally:
+            await self.queue.put((rank, STREAM_DONE))
+
+    async def launch_next(self) -> bool:
+        if self.is_exhausted or len(self.pumps) >= self.max_streams:
+            return False
+
+        launched = await self.launch()
+
+        if launched is None:
+            self.is_exhausted = True
+            return False
+
+        uid, response = launched
+        rank = len(self.pumps)
+        self.uids.append(uid)
+        self.chunks.append([])
+        self.pumps.append(asyncio.create_task(self.pump(rank, uid, response)))
+
+        if rank > 0:
+            bt.logging.info(
+                f"HedgedStream: no text yet, hedging with UID {uid} ({rank + 1}/{self.max_streams})"
+            )
+
+        return True
+
+    async def stream(self) -> AsyncIterator[Any]:
+        loop = asyncio.get_event_loop()
+        done = set()
+        is_completed = False
+
+        if not await self.launch_next():
+            return
+
+        if self.max_streams == 1:
+            self.winner = 0
+
+        next_hedge_at = loop.time() + self.hedge_delay
+
+        try:
+            while True:
+                timeout = None
+
+                if (
+                    self.winner is None
+                    and len(self.pumps) < self.max_streams
+                    and not self.is_exhausted
+                ):
+                    timeout = max(0, next_hedge_at - loop.time())
+
+                try:
+                    rank, value = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    await self.launch_next()
+                    next_hedge_at = loop.time() + self.hedge_delay
+                    continue
+
+                if value is STREAM_DONE:
+                    done.add(rank)
+
+                    if rank == self.winner:
+                        break
+
+                    if len(done) == len(self.pumps) and not await self.launch_next():
+                        break
+
+                    continue
+
+                if self.winner is None:
+                    self.chunks[rank].append(value)
+
+                    if is_text_event(value):
+                        self.winner = rank
+                        chunks, self.chunks = self.chunks[rank], []
+
+                        for chunk in chunks:
+                            yield chunk
+                elif rank == self.winner:
+                    yield value
+
+            # No miner produced text, fall back to whatever the first miner sent.
+            if self.winner is None and self.chunks:
+                chunks, self.chunks = self.chunks[0], []
+
+                for chunk in chunks:
+                    yield chunk
+
+            is_completed = True
+        finally:
+            if not is_completed:
+                self.cancel()
+
+            if self.stats:
+                self.stats.record(len(self.pumps), self.winner)
+
+            bt.logging.info(
+                f"HedgedStream: queried UIDs {self.uids}, winner: {self.uids[self.winner] if self.winner is not None else None}"
+            )
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether a stream won and ended with a successful final synapse, before `collect`."""
+        if self.winner is None or self.winner in self.failed_ranks:
+            return False
+
+        final_synapse = self.final_synapses.get(self.winner)
+        return final_synapse is not None and final_synapse.is_success
+
+    async def collect(self) -> Tuple[List[int], List[bt.Synapse]]:
+        """Waits for every stream and hands over the uids and final synapses to score."""
+        await asyncio.gather(*self.pumps, return_exceptions=True)
+
+        final_synapses, self.final_synapses = self.final_synapses, {}
+        ranks = sorted(final_synapses.keys())
+        return [self.uids[rank] for rank in ranks], [
+            final_synapses[rank] for rank in ranks
+        ]
+
+    def cancel(self):
+        for pump in self.pumps:
+            pump.cancel()
@@ -0,0 +1,153 @@
+import os
+import json
+import bittensor as bt
+from typing import Dict, List, Optional
+
+# Upper bounds in seconds of the histogram buckets, the last bucket holds everything slower.
+LATENCY_BUCKETS = [1, 2, 3, 5, 7.5, 10, 15, 20, 25, 30, 40, 50, 60, 75, 90, 120, 150, 180]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram. Counts are halved when they exceed `max_samples` so old samples fade out."""
+
+    def __init__(self, hotkey: str = None, counts: List[float] = None):
+        self.hotkey = hotkey
+        self.counts = counts or [0.0] * (len(LATENCY_BUCKETS) + 1)
+
+    @property
+    def total(self) -> float:
+        return sum(self.counts)
+
+    def record(self, seconds: float, max_samples: int):
+        index = next(
+            (i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound),
+            len(LATENCY_BUCKETS),
+        )
+        self.counts[index] += 1
+
+        if self.total > max_samples:
+            self.counts = [count / 2 for count in self.counts]
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket containing the q-th percentile."""
+        threshold = self.total * q
+        cumulative = 0
+
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= threshold:
+                break
+
+        return (
+            LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else LATENCY_BUCKETS[-1]
+        )
+
+
+def is_cut_off(response, full_timeout: float) -> bool:
+    """Whether a response timed out on a deadline shortened below the full timeout."""
+    is_timed_out = (
+        response.dendrite.status_code == 408 or response.dendrite.process_time is None
+    )
+    return is_timed_out and response.timeout < full_timeout
+
+
+class LatencyTracker:
+    """
+    Latency histograms of every miner UID, persisted as JSON so they survive restarts.
+    Recording only updates memory, the histograms are written by the validator's maintenance task.
+    """
+
+    def __init__(self, path: str, max_samples: int = 200):
+        self.path = path
+        self.max_samples = max_samples
+        self.histograms: Dict[int, LatencyHistogram] = {}
+        self.is_dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+
+            self.histograms = {
+                int(uid): LatencyHistogram(
+                    hotkey=histogram["hotkey"], counts=histogram["counts"]
+                )
+                for uid, histogram in data.items()
+                if len(histogram["counts"]) == len(LATENCY_BUCKETS) + 1
+            }
+            bt.logging.info(
+                f"Loaded latency histograms of {len(self.histograms)} UIDs from {self.path}"
+            )
+        except Exception as e:
+            bt.logging.error(f"Failed to load latency histograms from {self.path}: {e}")
+
+    def snapshot(self) -> Optional[Dict]:
+        """Copy of the histograms to save, None when nothing was recorded since the last one."""
+        if not self.is_dirty:
+            return None
+
+        self.is_dirty = False
+
+        return {
+            str(uid): {"hotkey": histogram.hotkey, "counts": list(histogram.counts)}
+            for uid, histogram in self.histograms.items()
+        }
+
+    def save(self, data: Dict):
+        try:
+            with open(self.path, "w") as file:
+                json.dump(data, file)
+        except Exception as e:
+            bt.logging.error(f"Failed to save latency histograms to {self.path}: {e}")
+
+    def record(self, uid: int, hotkey: str, seconds: float):
+        histogram = self.histograms.get(uid)
+
+        # A new hotkey on the UID is a different miner.
+        if histogram is None or histogram.hotkey != hotkey:
+            histogram = LatencyHistogram(hotkey=hotkey)
+            self.histograms[uid] = histogram
+
+        histogram.record(seconds, self.max_samples)
+        self.is_dirty = True
+
+    def record_responses(self, uids, responses, full_timeout: float):
+        for uid, response in zip(uids, responses):
+            uid = uid.item() if hasattr(uid, "item") else uid
+            process_time = response.dendrite.process_time
+
+            # A timeout shortened by this tracker says nothing about how long the miner would take.
+            if is_cut_off(response, full_timeout):
+                continue
+
+            # Timed out miners have no process time, they count as taking the whole timeout.
+            if response.dendrite.status_code == 408 or process_time is None:
+                process_time = response.timeout
+
+            self.record(uid, response.axon.hotkey, float(process_time))
+
+    def get_timeout(
+        self,
+        uid: int,
+        hotkey: str,
+        default_timeout: float,
+        margin: float,
+        min_timeout: float,
+        min_samples: int,
+        q: float = 0.95,
+    ) -> float:
+        """Returns the q-th percentile latency plus a margin, or the default timeout without enough samples."""
+        histogram: Optional[LatencyHistogram] = self.histograms.get(uid)
+
+        if (
+            histogram is None
+            or histogram.hotkey != hotkey
+            or histogram.total < min_samples
+        ):
+            return default_timeout
+
+        return min(default_timeout, max(min_timeout, histogram.percentile(q) + margin))
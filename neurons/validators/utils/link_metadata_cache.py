@@ -0,0 +1,218 @@
+import json
+import time
+import sqlite3
+import asyncio
+import bittensor as bt
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from datura.services.link_extraction import get_link_domain
+
+# Titles of reference pages barely change, discussions get renamed or removed more often.
+DOMAIN_TTL: Dict[str, int] = {
+    "wikipedia.org": 7 * 24 * 60 * 60,
+    "arxiv.org": 30 * 24 * 60 * 60,
+    "youtube.com": 7 * 24 * 60 * 60,
+    "reddit.com": 24 * 60 * 60,
+    "news.ycombinator.com": 24 * 60 * 60,
+}
+
+# Stays below the default limit of SQLite variables in a single statement.
+MAX_QUERY_URLS = 500
+
+# Scrapes links with retries, returns the metadata of the scraped links and the links that failed.
+Scrape = Callable[[List[str]], Awaitable[Tuple[List[Dict], List[str]]]]
+
+
+class LinkMetadataCache:
+    """
+    Metadata of the links scraped from Apify, persisted in SQLite and keyed by URL.
+
+    Links of known domains expire after the TTL of their domain in `DOMAIN_TTL`, other links after
+    `ttl` seconds. Links that still failed after every retry are cached as failed for `failure_ttl`
+    seconds, so they are not scraped again in every step.
+
+    One cache is shared by the steps running concurrently, a link being scraped for one step is
+    awaited by the others instead of being scraped twice.
+    """
+
+    def __init__(self, path: str, ttl: float, failure_ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.connection = None
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.failure_hits = 0
+        self.in_flight_hits = 0
+        self.misses = 0
+        self.apify_links = 0
+
+        if self.is_enabled:
+            self.open()
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.ttl > 0
+
+    def open(self):
+        try:
+            self.connection = sqlite3.connect(self.path)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS links "
+                "(url TEXT PRIMARY KEY, data TEXT, expires_at REAL NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS links_expires_at ON links (expires_at)"
+            )
+            self.prune()
+        except sqlite3.Error as e:
+            bt.logging.error(
+                f"Failed to open the link metadata cache at {self.path}: {e}"
+            )
+            self.connection = None
+
+    def get_ttl(self, url: str) -> float:
+        return DOMAIN_TTL.get(get_link_domain(url), self.ttl)
+
+    def get_many(self, urls: List[str]) -> Dict[str, Optional[Dict]]:
+        """Returns the cached metadata of the links that are not expired, None for failed links."""
+        if self.connection is None or not urls:
+            return {}
+
+        now = time.time()
+        cached = {}
+
+        try:
+            for start in range(0, len(urls), MAX_QUERY_URLS):
+                chunk = urls[start : start + MAX_QUERY_URLS]
+                rows = self.connection.execute(
+                    "SELECT url, data FROM links WHERE expires_at >= ? "
+                    f"AND url IN ({', '.join('?' * len(chunk))})",
+                    [now, *chunk],
+                )
+
+                for url, data in rows:
+                    cached[url] = json.loads(data) if data is not None else None
+        except Exception as e:
+            bt.logging.error(f"Failed to read the link metadata cache: {e}")
+            return {}
+
+        return cached
+
+    def set_many(self, links_with_metadata: List[Dict], failed_urls: List[str]):
+        if self.connection is None:
+            return
+
+        now = time.time()
+        rows = [
+            (link["url"], json.dumps(link), now + self.get_ttl(link["url"]))
+            for link in links_with_metadata
+        ]
+        rows.extend((url, None, now + self.failure_ttl) for url in failed_urls)
+
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO links (url, data, expires_at) "
+                    "VALUES (?, ?, ?)",
+                    rows,
+                )
+            self.prune()
+        except sqlite3.Error as e:
+            bt.logging.error(f"Failed to write the link metadata cache: {e}")
+
+    def prune(self):
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM links WHERE expires_at < ?", (time.time(),)
+            )
+
+    async def fetch(
+        self, urls: List[str], scrape: Scrape
+    ) -> Tuple[List[Dict], List[str]]:
+        """
+        Returns the metadata of the links and the links that could not be scraped.
+        Only links that are neither cached nor being scraped for another step are scraped.
+        """
+        urls = list(dict.fromkeys(urls))
+        cached = self.get_many(urls)
+        links_with_metadata = [link for link in cached.values() if link is not None]
+        non_fetched_links = [url for url, link in cached.items() if link is None]
+
+        missing_urls = [url for url in urls if url not in cached]
+        in_flight = {
+            url: self.in_flight[url] for url in missing_urls if url in self.in_flight
+        }
+        urls_to_scrape = [url for url in missing_urls if url not in in_flight]
+
+        self.hits += len(links_with_metadata)
+        self.failure_hits += len(non_fetched_links)
+        self.in_flight_hits += len(in_flight)
+        self.misses += len(urls_to_scrape)
+
+        if urls_to_scrape:
+            scraped_links = await self.scrape_missing(urls_to_scrape, scrape)
+            links_with_metadata.extend(scraped_links.values())
+            non_fetched_links.extend(
+                url for url in urls_to_scrape if url not in scraped_links
+            )
+
+        for url, future in in_flight.items():
+            link = await asyncio.shield(future)
+
+            if link is not None:
+                links_with_metadata.append(link)
+            else:
+                non_fetched_links.append(url)
+
+        return links_with_metadata, non_fetched_links
+
+    async def scrape_missing(self, urls: List[str], scrape: Scrape) -> Dict[str, Dict]:
+        loop = asyncio.get_event_loop()
+        futures = {url: loop.create_future() for url in urls}
+        self.in_flight.update(futures)
+        scraped_links = {}
+
+        try:
+            links_with_metadata, failed_urls = await scrape(urls)
+            self.apify_links += len(urls)
+
+            # Nothing scraped at all points to Apify failing rather than the links.
+            if not links_with_metadata:
+                failed_urls = []
+
+            self.set_many(links_with_metadata, failed_urls)
+            scraped_links = {link["url"]: link for link in links_with_metadata}
+        finally:
+            for url, future in futures.items():
+                self.in_flight.pop(url, None)
+                future.set_result(scraped_links.get(url))
+
+        return scraped_links
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.failure_hits + self.in_flight_hits + self.misses
+        size = 0
+
+        if self.connection is not None:
+            try:
+                size = self.connection.execute(
+                    "SELECT COUNT(*) FROM links"
+                ).fetchone()[0]
+            except sqlite3.Error:
+                pass
+
+        return {
+            "enabled": self.is_enabled,
+            "size": size,
+            "hits": self.hits,
+            "failure_hits": self.failure_hits,
+            "in_flight_hits": self.in_flight_hits,
+            "misses": self.misses,
+            "hit_rate": (
+                (self.hits + self.failure_hits + self.in_flight_hits) / lookups
+                if lookups
+                else None
+            ),
+            "apify_links": self.apify_links,
+        }
@@ -0,0 +1,160 @@
+import json
+import time
+import sqlite3
+import hashlib
+import bittensor as bt
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from neurons.validators.utils import prompts
+
+# Scores are cached for a week on disk, the in-memory LRU only holds the most recent ones.
+DISK_TTL = 7 * 24 * 60 * 60
+
+# Rough size of a token of English text, OpenAI token counts are not kept with the scores.
+CHARS_PER_TOKEN = 4
+
+
+def get_prompt_templates_version() -> str:
+    """Hash of every scoring prompt template, scores cached with other templates are discarded."""
+    templates = [
+        value
+        for name, value in sorted(vars(prompts).items())
+        if name.endswith("_template") and isinstance(value, str)
+    ]
+    return hashlib.sha256("\0".join(templates).encode("utf-8")).hexdigest()[:16]
+
+
+def get_score_key(model: str, messages: List[Dict]) -> str:
+    """Content address of a scoring request: the model and its system and user messages."""
+    data = json.dumps([model, messages], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(messages: List[Dict], response: str) -> int:
+    characters = sum(len(message.get("content") or "") for message in messages)
+    return (characters + len(response)) // CHARS_PER_TOKEN
+
+
+class LLMScoreCache:
+    """
+    LLM responses of scoring requests, keyed by a hash of the model and messages.
+
+    The most recent `max_entries` responses are kept in an in-memory LRU in front of a SQLite
+    store, entries of other prompt template versions are dropped when the store is opened.
+    Hits and estimated saved tokens are counted per reward model.
+    """
+
+    def __init__(self, path: str, max_entries: int, version: str = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.version = version or get_prompt_templates_version()
+        self.entries: "OrderedDict[str, str]" = OrderedDict()
+        self.connection = None
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+        if self.is_enabled:
+            self.open()
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def open(self):
+        try:
+            self.connection = sqlite3.connect(self.path)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, version TEXT "
+                "NOT NULL, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM scores WHERE version != ? OR created_at < ?",
+                    (self.version, time.time() - DISK_TTL),
+                )
+        except sqlite3.Error as e:
+            bt.logging.error(f"Failed to open the LLM score cache at {self.path}: {e}")
+            self.connection = None
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.is_enabled:
+            return None
+
+        response = self.entries.get(key)
+
+        if response is not None:
+            self.entries.move_to_end(key)
+            return response
+
+        if self.connection is None:
+            return None
+
+        try:
+            row = self.connection.execute(
+                "SELECT response FROM scores "
+                "WHERE key = ? AND version = ? AND created_at >= ?",
+                (key, self.version, time.time() - DISK_TTL),
+            ).fetchone()
+        except sqlite3.Error as e:
+            bt.logging.error(f"Failed to read the LLM score cache: {e}")
+            return None
+
+        if row is None:
+            return None
+
+        self.remember(key, row[0])
+        return row[0]
+
+    def set(self, key: str, response: str):
+        if not self.is_enabled or not response:
+            return
+
+        self.remember(key, response)
+
+        if self.connection is None:
+            return
+
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO scores "
+                    "(key, version, response, created_at) VALUES (?, ?, ?, ?)",
+                    (key, self.version, response, time.time()),
+                )
+        except sqlite3.Error as e:
+            bt.logging.error(f"Failed to write the LLM score cache: {e}")
+
+    def remember(self, key: str, response: str):
+        self.entries[key] = response
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def record(self, name: str, messages: List[Dict], response: Optional[str]):
+        """Counts a lookup of a reward model, a hit when the cached response is given."""
+        stats = self.stats.setdefault(
+            name or "unknown", {"lookups": 0, "hits": 0, "saved_tokens": 0}
+        )
+        stats["lookups"] += 1
+
+        if response is not None:
+            stats["hits"] += 1
+            stats["saved_tokens"] += estimate_tokens(messages, response)
+
+    def get_stats(self) -> Dict:
+        return {
+            "enabled": self.is_enabled,
+            "version": self.version,
+            "memory_entries": len(self.entries),
+            "reward_models": {
+                name: {
+                    **stats,
+                    "hit_rate": (
+                        stats["hits"] / stats["lookups"] if stats["lookups"] else None
+                    ),
+                }
+                for name, stats in self.stats.items()
+            },
+        }
@@ -43,9 +43,11 @@ class MockRewardModel(BaseRewardModel):
     def set_counter_to_half(self):
         pass
 
-    def apply(self, prompt: str, completion: List[str], name: str, uids) -> torch.FloatTensor:
+    async def aapply(
+        self, prompt: str, completion: List[str], name: str, uids, prefetched=None
+    ) -> torch.FloatTensor:
         mock_reward = torch.tensor([1 for _ in completion], dtype=torch.float32)
-        return mock_reward, {}
+        return mock_reward, {}, [{} for _ in completion], mock_reward.tolist()
 
     def reset(self):
         return self
@@ -17,7 +17,9 @@
 # DEALINGS IN THE SOFTWARE.
 
 import re
+import json
 import random
+from typing import Dict
 
 
 class BasePrompt:
@@ -212,6 +214,50 @@ class SearchSummaryRelevancePrompt(ScoringPrompt):
         return 0
 
 
+class BatchLinkContentPrompt(ScoringPrompt):
+    r"""Scores several contents on a scale from 0 to 10 in one request, given a question."""
+
+    def __init__(self):
+        super().__init__()
+        self.template = user_message_question_answer_batch_template
+
+    def get_system_message(self):
+        return system_message_question_answer_batch_template
+
+    def text(self, prompt: str, contents: Dict[str, str]) -> str:
+        r"""Formats the question and the contents by id, without the tags of the prompt."""
+        tags = find_unique_tags(user_message_question_answer_template)
+
+        def sanitize(text: str) -> str:
+            for tag in tags:
+                text = text.replace(tag, "")
+            return text
+
+        answers = "\n".join(
+            f'<Answer id="{id}">\n{sanitize(content)}\n</Answer>'
+            for id, content in contents.items()
+        )
+        return self.template.format(sanitize(prompt), answers)
+
+    def extract_scores(self, response: str) -> Dict[str, float]:
+        r"""Extract the scores by id from the JSON output, invalid scores are left out."""
+        try:
+            scores = json.loads(response).get("scores")
+        except (TypeError, ValueError, AttributeError):
+            return {}
+
+        if not isinstance(scores, dict):
+            return {}
+
+        return {
+            str(id): float(score)
+            for id, score in scores.items()
+            if isinstance(score, (int, float))
+            and not isinstance(score, bool)
+            and 0 <= score <= 10
+        }
+
+
 def find_unique_tags(input_text: str):
     r"""Find all substrings that match the pattern '<...>'."""
     matches = re.findall("<([^>]*)>", input_text)
@@ -353,3 +399,26 @@ And the answer content:
 
 Please evaluate the above <Question></Question> and <Answer></Answer> using relevance Scoring Guide in the system message.
 """
+
+
+# The relevance scoring guide, with the scores of several answers returned as JSON.
+system_message_question_answer_batch_template = (
+    system_message_question_answer_template.split("Output Format:")[0]
+    + """Output Format:
+A JSON object with the score of every answer content, keyed by the id of the answer:
+{"scores": {"<id>": <2, 5, or 9>}}
+"""
+)
+
+
+user_message_question_answer_batch_template = """
+Here is the question:
+<Question>
+{}
+</Question>
+
+And the answer contents, each with its id:
+{}
+
+Please evaluate every <Answer></Answer> against the above <Question></Question> using relevance Scoring Guide in the system message.
+"""
@@ -0,0 +1,112 @@
+import time
+import bittensor as bt
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional
+from datura.dataset.date_filters import DateFilterType
+
+# Answers about the last day go stale quickly, answers about the last years barely change.
+DATE_FILTER_TTL: Dict[DateFilterType, int] = {
+    DateFilterType.PAST_24_HOURS: 5 * 60,
+    DateFilterType.PAST_2_DAYS: 15 * 60,
+    DateFilterType.PAST_WEEK: 30 * 60,
+    DateFilterType.PAST_2_WEEKS: 60 * 60,
+    DateFilterType.PAST_MONTH: 2 * 60 * 60,
+    DateFilterType.PAST_2_MONTHS: 4 * 60 * 60,
+    DateFilterType.PAST_YEAR: 12 * 60 * 60,
+    DateFilterType.PAST_2_YEARS: 24 * 60 * 60,
+}
+
+
+@dataclass
+class CachedResponse:
+    chunks: List[str]
+    size: int
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    LRU cache of recorded organic answer streams, bounded by the total size of the chunks in bytes.
+    Entries expire after a TTL that depends on the date filter of the query.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def get_ttl(date_filter: str) -> int:
+        try:
+            return DATE_FILTER_TTL[DateFilterType(date_filter)]
+        except ValueError:
+            return DATE_FILTER_TTL[DateFilterType.PAST_WEEK]
+
+    def remove(self, key: Hashable) -> CachedResponse:
+        entry = self.entries.pop(key)
+        self.size -= entry.size
+        return entry
+
+    def get(self, key: Hashable) -> Optional[List[str]]:
+        entry = self.entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.time():
+            self.remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry.chunks
+
+    def set(self, key: Hashable, chunks: List[str], date_filter: str):
+        size = sum(len(chunk.encode("utf-8")) for chunk in chunks)
+
+        if size > self.max_bytes:
+            bt.logging.debug(
+                f"ResponseCache: response of {size} bytes exceeds the cache size of {self.max_bytes} bytes"
+            )
+            return
+
+        if key in self.entries:
+            self.remove(key)
+
+        while self.size + size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= evicted.size
+            self.evictions += 1
+
+        self.entries[key] = CachedResponse(
+            chunks=chunks,
+            size=size,
+            expires_at=time.time() + self.get_ttl(date_filter),
+        )
+        self.size += size
+
+    def get_stats(self) -> Dict:
+        requests = self.hits + self.misses
+        return {
+            "enabled": self.is_enabled,
+            "entries": len(self.entries),
+            "size_bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / requests if requests else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
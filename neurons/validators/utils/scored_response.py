@@ -0,0 +1,100 @@
+from typing import Any, Dict, List, Optional
+from datura.framing import Frame
+from datura.protocol import ScraperStreamingSynapse, ToolResult
+
+
+class ScoredResponse:
+    """
+    What the reward models, penalties and logs read from a miner's final synapse.
+
+    Built once streaming is over so the synapses can be released: a step keeps one of these per
+    queried UID until its background log task completes. Tool results stay as the raw frames the
+    miner sent, possibly spilled to disk, and are decoded on every access instead of being cached.
+    """
+
+    __slots__ = (
+        "dendrite",
+        "axon",
+        "timeout",
+        "completion",
+        "texts",
+        "tools",
+        "start_date",
+        "end_date",
+        "date_filter_type",
+        "prompt_analysis",
+        "miner_tweets",
+        "completion_links",
+        "search_completion_links",
+        "validator_tweets",
+        "validator_links",
+        "is_stream_truncated",
+        "twitter_completion",
+        "search_completion",
+        "tool_result_frames",
+        "miner_tweets_by_id",
+    )
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name))
+
+    @classmethod
+    def from_synapse(cls, synapse: ScraperStreamingSynapse) -> "ScoredResponse":
+        return cls(
+            dendrite=synapse.dendrite,
+            axon=synapse.axon,
+            timeout=synapse.timeout,
+            completion=synapse.completion,
+            texts=synapse.texts or {},
+            tools=synapse.tools or [],
+            start_date=synapse.start_date,
+            end_date=synapse.end_date,
+            date_filter_type=synapse.date_filter_type,
+            prompt_analysis=synapse.prompt_analysis,
+            miner_tweets=synapse.miner_tweets or {},
+            completion_links=synapse.completion_links or [],
+            search_completion_links=synapse.search_completion_links or [],
+            validator_tweets=synapse.validator_tweets or [],
+            validator_links=synapse.validator_links or [],
+            is_stream_truncated=synapse.is_stream_truncated,
+            twitter_completion=synapse.get_twitter_completion(),
+            search_completion=synapse.get_search_completion(),
+            tool_result_frames=dict(synapse._tool_result_frames or {}),
+        )
+
+    @classmethod
+    def from_synapses(
+        cls, synapses: List[ScraperStreamingSynapse]
+    ) -> List["ScoredResponse"]:
+        return [cls.from_synapse(synapse) for synapse in synapses]
+
+    def __getattr__(self, name: str) -> Any:
+        # Tool results declared on the synapse, e.g. `search_results`.
+        attribute = getattr(ScraperStreamingSynapse, name, None)
+
+        if isinstance(attribute, ToolResult):
+            return self.get_tool_result(attribute.event_type)
+
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+    def get_tool_result(self, event_type: str) -> Any:
+        frame: Optional[Frame] = self.tool_result_frames.get(event_type)
+        content = frame.decode_content() if frame is not None else None
+        return content if content is not None else {}
+
+    def get_twitter_completion(self) -> Optional[str]:
+        return self.twitter_completion
+
+    def get_search_completion(self) -> Dict[str, str]:
+        return self.search_completion
+
+    def get_miner_tweet(self, tweet_id: str) -> Optional[Dict]:
+        if self.miner_tweets_by_id is None:
+            self.miner_tweets_by_id = {
+                tweet.get("id"): tweet for tweet in self.miner_tweets.get("data", [])
+            }
+
+        return self.miner_tweets_by_id.get(tweet_id)
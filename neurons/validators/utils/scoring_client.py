@@ -0,0 +1,298 @@
+import os
+import re
+import time
+import random
+import asyncio
+import bittensor as bt
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from openai import APIConnectionError, APIStatusError
+from datura import client as openai_client
+from neurons.validators.utils.llm_score_cache import estimate_tokens
+
+# OpenAI reports reset times as durations such as "1s", "6m0s" or "20ms".
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+# Scoring responses are a few words, reserved in the token bucket on top of the prompt.
+COMPLETION_TOKENS = 16
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = DURATION_PATTERN.findall(value)
+
+    if not parts:
+        return None
+
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def parse_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Limits an amount per minute, requests or tokens, refilled continuously.
+
+    A limit of 0 is taken from the `x-ratelimit-limit-*` headers of the first response, until then
+    nothing is limited. The remaining amount reported by OpenAI lowers the bucket when other
+    clients of the same key used part of the limit.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.tokens = float(per_minute)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.capacity > 0
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.capacity / 60
+        )
+        self.updated_at = now
+
+    async def acquire(self, amount: float) -> float:
+        """Waits until `amount` is available and takes it, returns the time waited."""
+        if not self.is_enabled:
+            return 0
+
+        waited = 0
+        amount = min(amount, self.capacity)
+
+        async with self.lock:
+            while True:
+                self.refill()
+
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+
+                delay = (amount - self.tokens) * 60 / self.capacity
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def update(
+        self,
+        limit: Optional[int],
+        remaining: Optional[int],
+        reset: Optional[float],
+    ):
+        if not self.is_enabled:
+            if not limit:
+                return
+
+            self.capacity = limit
+            self.tokens = float(limit)
+
+        if remaining is None:
+            return
+
+        self.refill()
+
+        # Nothing left until the reset, the bucket stays empty for that long.
+        if remaining <= 0 and reset:
+            self.tokens = min(self.tokens, -reset * self.capacity / 60)
+        else:
+            self.tokens = min(self.tokens, remaining)
+
+
+class ScoringStats:
+    """Latency, retries and dropped requests of the OpenAI scoring calls."""
+
+    def __init__(self):
+        self.requests = 0
+        self.completed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.dropped = 0
+        self.throttled_seconds = 0.0
+        self.latencies: List[float] = []
+
+    def get_event(self) -> Dict:
+        latencies = sorted(self.latencies)
+
+        return {
+            "openai_requests": self.requests,
+            "openai_retries": self.retries,
+            "openai_rate_limited": self.rate_limited,
+            "openai_dropped": self.dropped,
+            "openai_throttled_seconds": round(self.throttled_seconds, 3),
+            "openai_latency_mean": (
+                sum(latencies) / len(latencies) if latencies else None
+            ),
+            "openai_latency_p95": (
+                latencies[int(0.95 * (len(latencies) - 1))] if latencies else None
+            ),
+        }
+
+
+# Stats of the step being scored, reward functions gathered by the step share them.
+step_stats: ContextVar[Optional[ScoringStats]] = ContextVar(
+    "scoring_step_stats", default=None
+)
+
+
+class ScoringClient:
+    """
+    OpenAI chat completions for scoring, bounded and paced for the whole validator.
+
+    At most `max_concurrency` requests are in flight, and requests wait on token buckets for
+    `rpm` requests and `tpm` tokens per minute. Rate limited and failed requests are retried
+    with jittered exponential backoff, a `retry-after` header pauses every request. Requests
+    that still fail after `max_retries` retries are dropped and return None.
+
+    Stats are kept in total and per step, for the steps started with `start_step`.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        rpm: int = 0,
+        tpm: int = 0,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        client=None,
+    ):
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.requests_bucket = TokenBucket(rpm)
+        self.tokens_bucket = TokenBucket(tpm)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.client = client or openai_client
+        self.resume_at = 0.0
+        self.stats = ScoringStats()
+
+    def start_step(self) -> ScoringStats:
+        """Counts the requests of the current task and of the tasks it starts."""
+        stats = ScoringStats()
+        step_stats.set(stats)
+        return stats
+
+    def count(self, name: str, amount: float = 1):
+        for stats in (self.stats, step_stats.get()):
+            if stats is not None:
+                setattr(stats, name, getattr(stats, name) + amount)
+
+    def get_backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def update_limits(self, headers):
+        self.requests_bucket.update(
+            parse_int(headers.get("x-ratelimit-limit-requests")),
+            parse_int(headers.get("x-ratelimit-remaining-requests")),
+            parse_duration(headers.get("x-ratelimit-reset-requests")),
+        )
+        self.tokens_bucket.update(
+            parse_int(headers.get("x-ratelimit-limit-tokens")),
+            parse_int(headers.get("x-ratelimit-remaining-tokens")),
+            parse_duration(headers.get("x-ratelimit-reset-tokens")),
+        )
+
+    async def throttle(self, tokens: int):
+        started_at = time.monotonic()
+
+        while self.resume_at > time.monotonic():
+            await asyncio.sleep(self.resume_at - time.monotonic())
+
+        await self.requests_bucket.acquire(1)
+        await self.tokens_bucket.acquire(tokens)
+        self.count("throttled_seconds", time.monotonic() - started_at)
+
+    async def complete(
+        self, messages: List[Dict], model: str, **kwargs
+    ) -> Optional[str]:
+        if not os.environ.get("OPENAI_API_KEY"):
+            bt.logging.warning("Please set the OPENAI_API_KEY environment variable.")
+            return None
+
+        create = self.client.chat.completions.with_raw_response.create
+        tokens = estimate_tokens(messages, "") + COMPLETION_TOKENS
+        self.count("requests")
+
+        async with self.semaphore:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    self.count("retries")
+
+                await self.throttle(tokens)
+                started_at = time.monotonic()
+
+                try:
+                    response = await create(model=model, messages=messages, **kwargs)
+                except (APIStatusError, APIConnectionError) as e:
+                    headers = getattr(getattr(e, "response", None), "headers", {})
+                    status_code = getattr(e, "status_code", None)
+
+                    if headers:
+                        self.update_limits(headers)
+
+                    if status_code is not None and status_code < 500:
+                        if status_code != 429:
+                            bt.logging.error(f"OpenAI scoring request failed: {e}")
+                            break
+
+                        self.count("rate_limited")
+
+                    if attempt == self.max_retries:
+                        bt.logging.error(f"OpenAI scoring request dropped: {e}")
+                        break
+
+                    delay = self.get_backoff(attempt)
+                    retry_after = parse_duration(headers.get("retry-after"))
+
+                    if retry_after:
+                        delay = max(delay, retry_after)
+                        self.resume_at = max(self.resume_at, time.monotonic() + delay)
+
+                    bt.logging.debug(
+                        f"OpenAI scoring request failed, retrying in {delay:.2f}s: {e}"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                except Exception as e:
+                    bt.logging.error(f"Error when calling OpenAI: {e}")
+                    break
+
+                self.count("completed")
+
+                for stats in (self.stats, step_stats.get()):
+                    if stats is not None:
+                        stats.latencies.append(time.monotonic() - started_at)
+
+                # Only the latest latencies are kept in the totals.
+                del self.stats.latencies[:-1000]
+
+                self.update_limits(response.headers)
+                return response.parse().choices[0].message.content
+
+        self.count("dropped")
+        return None
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats.get_event(),
+            "openai_completed": self.stats.completed,
+            "requests_per_minute": self.requests_bucket.capacity,
+            "tokens_per_minute": self.tokens_bucket.capacity,
+            "available_requests": int(self.requests_bucket.tokens),
+            "available_tokens": int(self.tokens_bucket.tokens),
+        }
@@ -0,0 +1,103 @@
+import asyncio
+import bittensor as bt
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Tuple
+from datura.dataset.date_filters import DateFilterType
+
+
+def organic_query_key(query: dict) -> Tuple[str, Tuple[str, ...], str]:
+    """Key of an organic query: whitespace and case normalized content, sorted tools and the date filter."""
+    content = " ".join(query.get("content", "").lower().split())
+    tools = tuple(sorted(query.get("tools", [])))
+    date_filter = query.get("date_filter", DateFilterType.PAST_WEEK.value)
+
+    return content, tools, date_filter
+
+
+class InFlightStream:
+    """Records the chunks of a running stream so that any number of subscribers can follow it."""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.is_done = False
+        self.error: BaseException = None
+        self.updated = asyncio.Event()
+        self.subscribers = 0
+        # The event loop only keeps weak references to tasks.
+        self.task: asyncio.Task = None
+
+    def notify(self):
+        updated, self.updated = self.updated, asyncio.Event()
+        updated.set()
+
+    def append(self, chunk: Any):
+        self.chunks.append(chunk)
+        self.notify()
+
+    def finish(self, error: BaseException = None):
+        self.is_done = True
+        self.error = error
+        self.notify()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        """Replays the chunks recorded so far and then follows the stream live."""
+        self.subscribers += 1
+        index = 0
+
+        while True:
+            updated = self.updated
+
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+
+            if self.is_done:
+                if self.error is not None:
+                    raise self.error
+                return
+
+            await updated.wait()
+
+
+class SingleFlight:
+    """
+    Runs one stream per key at a time. Callers asking for a key that is already running
+    are attached to that stream instead of starting a new one.
+
+    The stream runs as a background task, so it completes (and schedules its scoring)
+    even if the caller that started it disconnects.
+    """
+
+    def __init__(self):
+        self.in_flight: Dict[Hashable, InFlightStream] = {}
+
+    async def run(self, key: Hashable, stream: InFlightStream, source: AsyncIterator[Any]):
+        try:
+            async for chunk in source:
+                stream.append(chunk)
+            stream.finish()
+        except Exception as e:
+            stream.finish(e)
+        except asyncio.CancelledError as e:
+            stream.finish(e)
+            raise
+        finally:
+            self.in_flight.pop(key, None)
+            bt.logging.debug(
+                f"SingleFlight: stream finished with {len(stream.chunks)} chunks for {stream.subscribers} subscribers"
+            )
+
+    def stream(
+        self, key: Hashable, factory: Callable[[], AsyncIterator[Any]]
+    ) -> AsyncIterator[Any]:
+        stream = self.in_flight.get(key)
+
+        if stream is None:
+            stream = InFlightStream()
+            self.in_flight[key] = stream
+            stream.task = asyncio.create_task(self.run(key, stream, factory()))
+        else:
+            bt.logging.info(
+                f"SingleFlight: attaching to an in-flight stream, replaying {len(stream.chunks)} chunks"
+            )
+
+        return stream.subscribe()
@@ -0,0 +1,128 @@
+import time
+import sqlite3
+import bittensor as bt
+from typing import Dict, Iterable, List
+from datura.protocol import TwitterScraperTweet
+
+# Stays below the default limit of SQLite variables in a single statement.
+MAX_QUERY_IDS = 500
+
+
+class TweetCache:
+    """
+    Tweets fetched from Apify, persisted in SQLite and keyed by tweet id.
+
+    Miners cite the same popular tweets over and over, a cached tweet is verified without another
+    Apify run until it is `ttl` seconds old. Text and creation date, which scoring compares, never
+    change. Apify runs are counted even when the cache is disabled with a `ttl` of 0.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self.connection = None
+        self.hits = 0
+        self.misses = 0
+        self.apify_runs = 0
+        self.apify_tweets = 0
+
+        if self.is_enabled:
+            self.open()
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.ttl > 0
+
+    def open(self):
+        try:
+            self.connection = sqlite3.connect(self.path)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS tweets "
+                "(id TEXT PRIMARY KEY, data TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS tweets_fetched_at ON tweets (fetched_at)"
+            )
+            self.prune()
+        except sqlite3.Error as e:
+            bt.logging.error(f"Failed to open the tweet cache at {self.path}: {e}")
+            self.connection = None
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, TwitterScraperTweet]:
+        """Returns the cached tweets that are not expired, keyed by id."""
+        ids = list({tweet_id for tweet_id in ids if tweet_id})
+
+        if self.connection is None or not ids:
+            return {}
+
+        min_fetched_at = time.time() - self.ttl
+        tweets = {}
+
+        try:
+            for start in range(0, len(ids), MAX_QUERY_IDS):
+                chunk = ids[start : start + MAX_QUERY_IDS]
+                rows = self.connection.execute(
+                    "SELECT id, data FROM tweets WHERE fetched_at >= ? "
+                    f"AND id IN ({', '.join('?' * len(chunk))})",
+                    [min_fetched_at, *chunk],
+                )
+
+                for tweet_id, data in rows:
+                    tweets[tweet_id] = TwitterScraperTweet.parse_raw(data)
+        except Exception as e:
+            bt.logging.error(f"Failed to read the tweet cache: {e}")
+            return {}
+
+        self.hits += len(tweets)
+        self.misses += len(ids) - len(tweets)
+        return tweets
+
+    def set_many(self, tweets: List[TwitterScraperTweet]):
+        if self.connection is None:
+            return
+
+        now = time.time()
+
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO tweets (id, data, fetched_at) "
+                    "VALUES (?, ?, ?)",
+                    [(tweet.id, tweet.json(), now) for tweet in tweets if tweet.id],
+                )
+            self.prune()
+        except sqlite3.Error as e:
+            bt.logging.error(f"Failed to write the tweet cache: {e}")
+
+    def prune(self):
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM tweets WHERE fetched_at < ?", (time.time() - self.ttl,)
+            )
+
+    def record_apify_run(self, tweets_count: int):
+        self.apify_runs += 1
+        self.apify_tweets += tweets_count
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        size = 0
+
+        if self.connection is not None:
+            try:
+                size = self.connection.execute(
+                    "SELECT COUNT(*) FROM tweets"
+                ).fetchone()[0]
+            except sqlite3.Error:
+                pass
+
+        return {
+            "enabled": self.is_enabled,
+            "size": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "apify_runs": self.apify_runs,
+            "apify_tweets": self.apify_tweets,
+        }
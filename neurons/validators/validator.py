@@ -13,13 +13,19 @@ import sys
 from typing import List
 from datura.protocol import IsAlive
 from neurons.validators.scraper_validator import ScraperValidator
+from neurons.validators.scheduler import SyntheticQueryScheduler
 from config import add_args, check_config, config
 from weights import init_wandb, set_weights, get_weights
 from traceback import print_exception
 from base_validator import AbstractNeuron
 from datura import QUERY_MINERS
 from datura.misc import ttl_get_block
-from datura.utils import resync_metagraph, save_logs_in_chunks
+from datura.utils import (
+    resync_metagraph,
+    fetch_metagraph,
+    apply_metagraph,
+    save_logs_in_chunks,
+)
 
 
 class Neuron(AbstractNeuron):
@@ -39,8 +45,10 @@ class Neuron(AbstractNeuron):
     wallet: "bt.wallet"
     metagraph: "bt.metagraph"
     dendrite: "bt.dendrite"
+    dendrites: List["bt.dendrite"]
 
     scraper_validator: "ScraperValidator"
+    scheduler: "SyntheticQueryScheduler" = None
     moving_average_scores: torch.Tensor = None
     uid: int = None
     shutdown_event: asyncio.Event()
@@ -78,8 +86,11 @@ class Neuron(AbstractNeuron):
         self.thread_executor = concurrent.futures.ThreadPoolExecutor(
             thread_name_prefix="asyncio"
         )
-        # Init sync with the network. Updates the metagraph.
-        self.sync()
+        self.last_metagraph_sync_block = None
+        self.last_set_weights_time = None
+        # Init sync with the network. Updates the metagraph, weights are set by run_maintenance.
+        self.check_registered()
+        resync_metagraph(self)
 
     async def run_sync_in_async(self, fn):
         return await self.loop.run_in_executor(self.thread_executor, fn)
@@ -94,9 +105,10 @@ class Neuron(AbstractNeuron):
         self.metagraph = self.subtensor.metagraph(self.config.netuid)
         self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
         self.dendrite = bt.dendrite(wallet=self.wallet)
-        self.dendrite1 = bt.dendrite(wallet=self.wallet)
-        self.dendrite2 = bt.dendrite(wallet=self.wallet)
-        self.dendrite3 = bt.dendrite(wallet=self.wallet)
+        self.dendrites = [
+            bt.dendrite(wallet=self.wallet)
+            for _ in range(max(1, self.config.neuron.dendrite_pool_size))
+        ]
         self.uid = self.metagraph.hotkeys.index(self.wallet.hotkey.ss58_address)
         if self.wallet.hotkey.ss58_address not in self.metagraph.hotkeys:
             bt.logging.error(
@@ -108,10 +120,6 @@ class Neuron(AbstractNeuron):
         while True:
             start_time = time.time()
             try:
-                # if self.should_sync_metagraph():
-                #     resync_metagraph(self)
-
-                # unless it's used elsewhere.
                 self.available_uids = await self.get_available_uids_is_alive()
                 bt.logging.info(
                     f"Number of available UIDs for periodic update: Amount: {len(self.available_uids)}, UIDs: {self.available_uids}"
@@ -230,7 +238,7 @@ class Neuron(AbstractNeuron):
                     original_search_rewards=all_original_rewards[2],
                     tweet_scores=val_score_responses_list[1],
                     search_scores=val_score_responses_list[2],
-                    weights=get_weights(self),
+                    weights=await self.run_sync_in_async(lambda: get_weights(self)),
                     neuron=neuron,
                     netuid=self.config.netuid,
                 )
@@ -277,44 +285,22 @@ class Neuron(AbstractNeuron):
             await self.scraper_validator.query_and_score(strategy)
         except Exception as e:
             bt.logging.error(f"General exception: {e}\n{traceback.format_exc()}")
-            await asyncio.sleep(100)
+            raise
 
     async def run_synthetic_queries(self, strategy=QUERY_MINERS.RANDOM):
         bt.logging.info(f"Starting run_synthetic_queries with strategy={strategy}")
         total_start_time = time.time()
+        # Failures are raised to the scheduler, which counts them in its step metrics.
         try:
-
-            async def run_forward():
-                start_time = time.time()
-                bt.logging.info(
-                    f"Running step forward for query_synapse, Step: {self.step}"
-                )
-                coroutines = [self.query_synapse(strategy) for _ in range(1)]
-                await asyncio.gather(*coroutines)
-                end_time = time.time()
-                bt.logging.info(
-                    f"Completed gathering coroutines for query_synapse in {end_time - start_time:.2f} seconds"
-                )
-
-            bt.logging.info("Running coroutines with run_until_complete")
-            self.loop.run_until_complete(run_forward())
-            bt.logging.info("Completed running coroutines with run_until_complete")
-
-            sync_start_time = time.time()
-            bt.logging.info("Calling sync method")
-            self.sync()
-            bt.logging.info("Completed calling sync method")
-
-            sync_end_time = time.time()
+            start_time = time.time()
+            bt.logging.info(f"Running step forward for query_synapse, Step: {self.step}")
+            await self.query_synapse(strategy)
             bt.logging.info(
-                f"Sync method execution time: {sync_end_time - sync_start_time:.2f} seconds"
+                f"Completed query_synapse in {time.time() - start_time:.2f} seconds"
             )
 
             self.step += 1
             bt.logging.info(f"Incremented step to {self.step}")
-        except Exception as err:
-            bt.logging.error("Error in run_synthetic_queries", str(err))
-            bt.logging.debug(print_exception(type(err), err, err.__traceback__))
         finally:
             total_end_time = time.time()
             total_execution_time = (total_end_time - total_start_time) / 60
@@ -322,29 +308,57 @@ class Neuron(AbstractNeuron):
                 f"Total execution time for run_synthetic_queries: {total_execution_time:.2f} minutes"
             )
 
-    def sync(self):
+    async def run_maintenance(self):
         """
-        Wrapper for synchronizing the state of the network for the given miner or validator.
+        Keeps the metagraph up to date on a block cadence, sets weights every
+        `update_weight_interval` seconds and saves the latency histograms, away from the query steps.
+        Chain calls run in the thread executor, the new metagraph is published on the event loop.
         """
-        # Ensure miner or validator hotkey is still registered on the network.
-        self.check_registered()
+        while True:
+            try:
+                block = await self.run_sync_in_async(lambda: self.block)
+
+                if (
+                    self.last_metagraph_sync_block is None
+                    or block - self.last_metagraph_sync_block
+                    >= self.config.neuron.metagraph_sync_blocks
+                ):
+                    sync_start_time = time.time()
+                    await self.run_sync_in_async(self.check_registered)
+                    metagraph = await self.run_sync_in_async(
+                        lambda: fetch_metagraph(self)
+                    )
+                    apply_metagraph(self, metagraph)
+                    self.last_metagraph_sync_block = block
+                    bt.logging.info(
+                        f"Synced metagraph at block {block} in {time.time() - sync_start_time:.2f} seconds"
+                    )
 
-        if self.should_sync_metagraph():
-            bt.logging.info("Syncing metagraph as per condition.")
-            resync_metagraph(self)
-        else:
-            bt.logging.info("No need to sync metagraph at this moment.")
-
-        if self.should_set_weights():
-            weight_set_start_time = time.time()
-            bt.logging.info("Setting weights as per condition.")
-            set_weights(self)
-            weight_set_end_time = time.time()
-            bt.logging.info(
-                f"Weight setting execution time: {weight_set_end_time - weight_set_start_time:.2f} seconds"
-            )
-        else:
-            bt.logging.info("No need to set weights at this moment.")
+                if not self.config.neuron.disable_set_weights and (
+                    self.last_set_weights_time is None
+                    or time.time() - self.last_set_weights_time
+                    >= self.config.neuron.update_weight_interval
+                ):
+                    weight_set_start_time = time.time()
+                    bt.logging.info(f"Setting weights at block {block}.")
+                    await self.run_sync_in_async(lambda: set_weights(self))
+                    self.last_set_weights_time = weight_set_start_time
+                    bt.logging.info(
+                        f"Weight setting execution time: {time.time() - weight_set_start_time:.2f} seconds"
+                    )
+
+                latency_tracker = self.scraper_validator.latency_tracker
+                latency_data = latency_tracker.snapshot()
+
+                if latency_data is not None:
+                    await self.run_sync_in_async(
+                        lambda: latency_tracker.save(latency_data)
+                    )
+            except Exception as err:
+                bt.logging.error("Error in run_maintenance", str(err))
+                bt.logging.debug(print_exception(type(err), err, err.__traceback__))
+
+            await asyncio.sleep(self.config.neuron.maintenance_interval)
 
     def check_registered(self):
         # --- Check for registration.
@@ -358,83 +372,32 @@ class Neuron(AbstractNeuron):
             )
             sys.exit()
 
-    def should_sync_metagraph(self):
-        """
-        Check if enough epoch blocks have elapsed since the last checkpoint to sync.
-        """
-        difference = self.block - self.metagraph.last_update[self.uid]
-        print(
-            f"Current block: {self.block}, Last update for UID {self.uid}: {self.metagraph.last_update[self.uid]}, Difference: {difference}"
-        )
-        should_set = difference > self.config.neuron.checkpoint_block_length
-        bt.logging.info(f"Should set weights: {should_set}")
-        # return should_set
-        return True  # Update right not based on interval of synthetic data
-
-    def should_set_weights(self) -> bool:
-        # Don't set weights on initialization.
-        # if self.step == 0:
-        #     bt.logging.info("Skipping weight setting on initialization.")
-        #     return False
-
-        # Check if enough epoch blocks have elapsed since the last epoch.
-        if self.config.neuron.disable_set_weights:
-            bt.logging.info("Weight setting is disabled by configuration.")
-            return False
-
-        # Define appropriate logic for when set weights.
-        difference = self.block - self.metagraph.last_update[self.uid]
-        print(
-            f"Current block: {self.block}, Last update for UID {self.uid}: {self.metagraph.last_update[self.uid]}, Difference: {difference}"
-        )
-        should_set = difference > self.config.neuron.checkpoint_block_length
-        bt.logging.info(f"Should set weights: {should_set}")
-        # return should_set
-        return True  # Update right not based on interval of synthetic data
-
     async def run(self):
         await asyncio.sleep(10)
-        self.sync()
+        self.loop.create_task(self.run_maintenance())
         self.loop.create_task(self.update_available_uids_periodically())
-        bt.logging.info(f"Validator starting at block: {self.block}")
+        bt.logging.info(
+            f"Validator starting at block: {await self.run_sync_in_async(lambda: self.block)}"
+        )
 
         try:
-
-            async def run_with_interval(interval, strategy):
-                query_count = 0  # Initialize query count
-                while True:
-                    try:
-                        if not self.available_uids:
-                            bt.logging.info(
-                                "No available UIDs, sleeping for 10 seconds."
-                            )
-                            await asyncio.sleep(10)
-                            continue
-                        self.loop.create_task(self.run_synthetic_queries(strategy))
-
-                        await asyncio.sleep(
-                            interval
-                        )  # Wait for 1800 seconds (30 minutes)
-                    except Exception as e:
-                        bt.logging.error(f"Error during task execution: {e}")
-                        await asyncio.sleep(interval)  # Wait before retrying
-
-            if self.config.neuron.run_random_miner_syn_qs_interval > 0:
-                self.loop.create_task(
-                    run_with_interval(
-                        self.config.neuron.run_all_miner_syn_qs_interval,
-                        QUERY_MINERS.RANDOM,
-                    )
-                )
-
-            if self.config.neuron.run_all_miner_syn_qs_interval > 0:
-                self.loop.create_task(
-                    run_with_interval(
-                        self.config.neuron.run_all_miner_syn_qs_interval,
-                        QUERY_MINERS.ALL,
-                    )
-                )
-                # If someone intentionally stops the validator, it'll safely terminate operations.
+            self.scheduler = SyntheticQueryScheduler(
+                run_step=self.run_synthetic_queries,
+                is_ready=lambda: bool(self.available_uids),
+                jitter=self.config.neuron.syn_qs_jitter,
+                step_timeout=self.config.neuron.syn_qs_step_timeout,
+            )
+            self.scheduler.add_strategy(
+                QUERY_MINERS.RANDOM,
+                interval=self.config.neuron.run_random_miner_syn_qs_interval,
+                concurrency=self.config.neuron.random_miner_syn_qs_concurrency,
+            )
+            self.scheduler.add_strategy(
+                QUERY_MINERS.ALL,
+                interval=self.config.neuron.run_all_miner_syn_qs_interval,
+                concurrency=self.config.neuron.all_miner_syn_qs_concurrency,
+            )
+        # If someone intentionally stops the validator, it'll safely terminate operations.
         except KeyboardInterrupt:
             self.axon.stop()
             bt.logging.success("Validator killed by keyboard interrupt.")
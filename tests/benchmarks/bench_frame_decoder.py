@@ -0,0 +1,116 @@
+"""
+Compares the incremental JSONFrameDecoder with the previous buffer based extract_json_chunk
+on multi-megabyte search payloads split into 1-16 KB chunks.
+
+Usage: python tests/benchmarks/bench_frame_decoder.py [--payload-mb 2] [--chunk-kb 1 4 16]
+"""
+
+import json
+import time
+import random
+import string
+import argparse
+from datura.framing import JSONFrameDecoder
+
+
+def legacy_extract_json_chunk(chunk, buffer=""):
+    """Copy of the former datura.protocol.extract_json_chunk, without logging."""
+    buffer += chunk
+    json_objects = []
+
+    while True:
+        try:
+            json_obj, end = json.JSONDecoder(strict=False).raw_decode(buffer)
+            json_objects.append(json_obj)
+            buffer = buffer[end:]
+        except json.JSONDecodeError as e:
+            if e.pos == len(buffer):
+                break
+            elif e.msg.startswith("Unterminated string"):
+                break
+            else:
+                break
+
+    return json_objects, buffer
+
+
+def random_text(length):
+    return "".join(random.choices(string.ascii_letters + ' {}"\\', k=length))
+
+
+def build_stream(payload_mb):
+    """A miner stream: a few text events followed by a large SERP event."""
+    results = []
+    size = 0
+
+    while size < payload_mb * 1024 * 1024:
+        result = {
+            "title": random_text(80),
+            "link": f"https://example.com/{random_text(20)}",
+            "snippet": random_text(400),
+        }
+        results.append(result)
+        size += len(json.dumps(result))
+
+    events = [{"type": "text", "role": "intro", "content": random_text(50)}] * 20
+    events.append({"type": "search", "content": {"organic_results": results}})
+    events.append({"type": "completion", "content": random_text(2000)})
+
+    return "".join(json.dumps(event) for event in events).encode("utf-8"), len(events)
+
+
+def split(data, chunk_size):
+    return [data[i : i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def run_legacy(chunks):
+    buffer = ""
+    objects = []
+    for chunk in chunks:
+        json_objects, buffer = legacy_extract_json_chunk(
+            chunk.decode("utf-8", errors="ignore"), buffer
+        )
+        objects.extend(json_objects)
+    return objects
+
+
+def run_decoder(chunks):
+    decoder = JSONFrameDecoder()
+    objects = []
+    for chunk in chunks:
+        objects.extend(decoder.feed(chunk))
+    return objects
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--payload-mb", type=float, default=2)
+    parser.add_argument("--chunk-kb", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    random.seed(0)
+    data, events_count = build_stream(args.payload_mb)
+    print(f"Stream of {len(data) / 1024 / 1024:.2f} MB with {events_count} events")
+
+    for chunk_kb in args.chunk_kb:
+        chunks = split(data, chunk_kb * 1024)
+
+        start_time = time.perf_counter()
+        decoder_objects = run_decoder(chunks)
+        decoder_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        legacy_objects = run_legacy(chunks)
+        legacy_time = time.perf_counter() - start_time
+
+        assert decoder_objects == legacy_objects
+
+        print(
+            f"{chunk_kb:>3} KB chunks ({len(chunks)} chunks): "
+            f"legacy {legacy_time:.3f}s, decoder {decoder_time:.3f}s, "
+            f"speedup {legacy_time / decoder_time:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
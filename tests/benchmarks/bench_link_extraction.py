@@ -0,0 +1,151 @@
+"""
+Compares link extraction of one validator step: the per-domain regexes of WebSearchUtils and a
+TwitterUtils built per response, against the precompiled single pass of datura.services.link_extraction.
+
+Every response has a twitter completion and search, Reddit and Hacker News summaries of about 10 KB
+with markdown links to the validated domains and to other sites.
+
+Usage: python tests/benchmarks/bench_link_extraction.py [--responses 256] [--summary-kb 10]
+"""
+
+import time
+import random
+import string
+import argparse
+from datura.services.link_extraction import extract_markdown_links, find_twitter_links
+from datura.services.twitter_utils import TwitterUtils
+from datura.services.web_search_utils import WebSearchUtils
+
+DOMAINS = [
+    "reddit.com",
+    "news.ycombinator.com",
+    "wikipedia.org",
+    "arxiv.org",
+    "youtube.com",
+]
+
+LINK_HOSTS = [
+    "www.reddit.com",
+    "old.reddit.com",
+    "news.ycombinator.com",
+    "en.wikipedia.org",
+    "arxiv.org",
+    "www.youtube.com",
+    "www.nytimes.com",
+    "github.com",
+    "blog.example.org",
+]
+
+
+def random_words(count):
+    return " ".join(
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(2, 9)))
+        for _ in range(count)
+    )
+
+
+def random_link():
+    host = random.choice(LINK_HOSTS)
+    path = "/".join(random_words(3).split())
+    return f"[{random_words(random.randint(1, 6))}](https://{host}/{path})"
+
+
+def random_tweet_link():
+    username = "".join(random.choices(string.ascii_letters, k=random.randint(4, 15)))
+    status = random.randint(10**17, 10**19)
+    host = random.choice(["x.com", "twitter.com"])
+    return f"[{random_words(3)}](https://{host}/{username}/status/{status})"
+
+
+def build_summary(size, make_link):
+    parts = []
+
+    while sum(len(part) for part in parts) < size:
+        parts.append(f"- **{random_words(4)}**: {random_words(30)} {make_link()}\n")
+
+    return "".join(parts)
+
+
+def extract_with_web_search_utils(completion, summaries):
+    twitter_links = TwitterUtils().find_twitter_links(completion)
+    search_links = []
+
+    for summary in summaries:
+        search_links.append(
+            (
+                WebSearchUtils.find_links(summary),
+                {
+                    domain: WebSearchUtils.find_links_by_domain(summary, domain)
+                    for domain in DOMAINS
+                },
+            )
+        )
+
+    return twitter_links, search_links
+
+
+def extract_in_one_pass(completion, summaries):
+    twitter_links = find_twitter_links(completion)
+    search_links = []
+
+    for summary in summaries:
+        links, links_by_domain = extract_markdown_links(summary)
+        search_links.append(
+            (
+                links,
+                {domain: links_by_domain.get(domain, []) for domain in DOMAINS},
+            )
+        )
+
+    return twitter_links, search_links
+
+
+def run_step(responses, extract):
+    start_time = time.process_time()
+    results = [extract(completion, summaries) for completion, summaries in responses]
+    return results, time.process_time() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--responses", type=int, default=256)
+    parser.add_argument("--summary-kb", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    size = args.summary_kb * 1024
+    responses = [
+        (
+            build_summary(size, random_tweet_link),
+            [build_summary(size, random_link) for _ in range(3)],
+        )
+        for _ in range(args.responses)
+    ]
+    print(f"{args.responses} responses, 4 summaries of {args.summary_kb} KB each")
+
+    baseline_time = None
+
+    for name, extract in [
+        ("WebSearchUtils + TwitterUtils", extract_with_web_search_utils),
+        ("link_extraction", extract_in_one_pass),
+    ]:
+        times = []
+
+        for _ in range(args.repeat):
+            results, step_time = run_step(responses, extract)
+            times.append(step_time)
+
+        if baseline_time is None:
+            baseline_time, baseline_results = min(times), results
+
+        assert results == baseline_results
+
+        print(
+            f"{name:<30} {min(times) * 1000:8.1f} ms per step "
+            f"({min(times) / baseline_time:4.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Compares compression of large tool result events for an ALL-miner step: bytes on the wire,
+CPU time to compress on the miners and decompress in the validator's frame decoder, and the
+resulting transfer time at a given validator bandwidth.
+
+Usage: python tests/benchmarks/bench_stream_compression.py [--streams 256] [--mbps 100] [--chunk-kb 4]
+"""
+
+import time
+import random
+import argparse
+from bench_stream_encoding import build_events, split
+from datura.framing import (
+    JSONFrameDecoder,
+    StreamCompression,
+    StreamEncoding,
+    StreamFraming,
+    encode_frame,
+    encode_framing_event,
+    zstandard,
+)
+
+
+def encode_stream(events, compression):
+    framing = StreamFraming.LENGTH_PREFIXED
+    encoding = StreamEncoding.JSON
+
+    return encode_framing_event(framing, encoding, compression) + b"".join(
+        encode_frame(event, framing, encoding, compression) for event in events
+    )
+
+
+def run_step(streams_events, compression, chunk_size):
+    start_time = time.process_time()
+    streams = [encode_stream(events, compression) for events in streams_events]
+    compress_time = time.process_time() - start_time
+
+    chunks = [split(stream, chunk_size) for stream in streams]
+    decoders = [JSONFrameDecoder() for _ in streams]
+    decoded = [[] for _ in streams]
+
+    start_time = time.process_time()
+    for index in range(max(len(stream_chunks) for stream_chunks in chunks)):
+        for stream_index, stream_chunks in enumerate(chunks):
+            if index < len(stream_chunks):
+                decoded[stream_index].extend(
+                    decoders[stream_index].feed(stream_chunks[index])
+                )
+    decompress_time = time.process_time() - start_time
+
+    assert decoded == streams_events
+
+    return sum(len(stream) for stream in streams), compress_time, decompress_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=256)
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--mbps", type=float, default=100)
+    parser.add_argument("--chunk-kb", type=int, default=4)
+    args = parser.parse_args()
+
+    random.seed(0)
+    streams_events = [build_events(args.tokens) for _ in range(args.streams)]
+    print(f"{args.streams} streams, validator bandwidth {args.mbps} Mbit/s")
+
+    baseline = None
+
+    for compression in StreamCompression:
+        if compression == StreamCompression.ZSTD and zstandard is None:
+            print(f"{compression.value}: skipped, zstandard is not installed")
+            continue
+
+        size, compress_time, decompress_time = run_step(
+            streams_events, compression, args.chunk_kb * 1024
+        )
+        transfer_time = size * 8 / (args.mbps * 1000 * 1000)
+        # Miners compress in parallel, so only one stream's share is on the critical path.
+        latency = transfer_time + compress_time / args.streams + decompress_time
+        baseline = baseline or (size, latency)
+
+        print(
+            f"{compression.value:<5} {size / 1024 / 1024:7.2f} MB ({size / baseline[0]:4.0%}), "
+            f"compress {compress_time:.3f}s, decompress {decompress_time:.3f}s, "
+            f"transfer {transfer_time:.3f}s, step latency {latency:.3f}s "
+            f"({latency - baseline[1]:+.3f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
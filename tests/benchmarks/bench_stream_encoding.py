@@ -0,0 +1,163 @@
+"""
+Compares the stream formats a miner can answer with: bytes on the wire and CPU time per step,
+where one step is 256 concurrent miner streams (token events, tweets, search results, texts
+and completion) decoded by one validator.
+
+Miner streams are encoded up front, then their chunks are fed round-robin to one decoder per
+stream, the way a validator interleaves responses. Decoding is measured twice: decoding every
+event, and routing raw frames by their type without decoding them.
+
+Usage: python tests/benchmarks/bench_stream_encoding.py [--streams 256] [--tokens 400] [--chunk-kb 4]
+"""
+
+import time
+import random
+import string
+import argparse
+from datura.framing import (
+    JSONFrameDecoder,
+    StreamEncoding,
+    StreamFraming,
+    encode_frame,
+    encode_framing_event,
+    msgpack,
+)
+
+FORMATS = [
+    (StreamFraming.CONCATENATED, StreamEncoding.JSON),
+    (StreamFraming.NDJSON, StreamEncoding.JSON),
+    (StreamFraming.LENGTH_PREFIXED, StreamEncoding.JSON),
+    (StreamFraming.LENGTH_PREFIXED, StreamEncoding.MSGPACK),
+]
+
+
+def random_text(length):
+    return "".join(random.choices(string.ascii_letters + "  .,", k=length))
+
+
+def build_events(tokens):
+    """Events of one miner answer."""
+    events = [
+        {"type": "text", "role": "intro", "content": random_text(random.randint(1, 8))}
+        for _ in range(tokens)
+    ]
+    events.append(
+        {
+            "type": "tweets",
+            "content": [
+                {
+                    "id": str(random.randint(10**17, 10**18)),
+                    "full_text": random_text(240),
+                    "like_count": random.randint(0, 10000),
+                    "user": {"username": random_text(12), "followers_count": 100},
+                }
+                for _ in range(20)
+            ],
+        }
+    )
+    events.append(
+        {
+            "type": "search",
+            "content": {
+                "organic_results": [
+                    {
+                        "title": random_text(60),
+                        "link": f"https://example.com/{random_text(20)}",
+                        "snippet": random_text(300),
+                        "position": position,
+                    }
+                    for position in range(10)
+                ]
+            },
+        }
+    )
+    events.append({"type": "texts", "content": {"intro": random_text(2000)}})
+    events.append({"type": "completion", "content": random_text(2000)})
+    return events
+
+
+def encode_stream(events, framing, encoding):
+    frames = [encode_frame(event, framing, encoding) for event in events]
+
+    if framing != StreamFraming.CONCATENATED:
+        frames.insert(0, encode_framing_event(framing, encoding))
+
+    return b"".join(frames)
+
+
+def split(data, chunk_size):
+    return [data[i : i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def run_step(streams_events, framing, encoding, chunk_size):
+    start_time = time.process_time()
+    streams = [encode_stream(events, framing, encoding) for events in streams_events]
+    encode_time = time.process_time() - start_time
+
+    chunks = [split(stream, chunk_size) for stream in streams]
+    decoders = [JSONFrameDecoder() for _ in streams]
+    decoded = [[] for _ in streams]
+
+    start_time = time.process_time()
+    for index in range(max(len(stream_chunks) for stream_chunks in chunks)):
+        for stream_index, stream_chunks in enumerate(chunks):
+            if index < len(stream_chunks):
+                decoded[stream_index].extend(
+                    decoders[stream_index].feed(stream_chunks[index])
+                )
+    decode_time = time.process_time() - start_time
+
+    assert decoded == streams_events
+
+    decoders = [JSONFrameDecoder(raw_frames=True) for _ in streams]
+    types = [[] for _ in streams]
+
+    start_time = time.process_time()
+    for index in range(max(len(stream_chunks) for stream_chunks in chunks)):
+        for stream_index, stream_chunks in enumerate(chunks):
+            if index < len(stream_chunks):
+                types[stream_index].extend(
+                    frame.type
+                    for frame in decoders[stream_index].feed(stream_chunks[index])
+                )
+    route_time = time.process_time() - start_time
+
+    assert types == [[event["type"] for event in events] for events in streams_events]
+
+    return sum(len(stream) for stream in streams), encode_time, decode_time, route_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=256)
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--chunk-kb", type=int, default=4)
+    args = parser.parse_args()
+
+    random.seed(0)
+    streams_events = [build_events(args.tokens) for _ in range(args.streams)]
+    events_count = sum(len(events) for events in streams_events)
+    print(f"{args.streams} streams, {events_count} events, {args.chunk_kb} KB chunks")
+
+    baseline_bytes = None
+
+    for framing, encoding in FORMATS:
+        if encoding == StreamEncoding.MSGPACK and msgpack is None:
+            print(f"{framing.value}/{encoding.value}: skipped, msgpack is not installed")
+            continue
+
+        size, encode_time, decode_time, route_time = run_step(
+            streams_events, framing, encoding, args.chunk_kb * 1024
+        )
+        baseline_bytes = baseline_bytes or size
+
+        print(
+            f"{framing.value + '/' + encoding.value:<24} "
+            f"{size / 1024 / 1024:7.2f} MB ({size / baseline_bytes:4.0%}), "
+            f"miner encode {encode_time:.3f}s, validator decode {decode_time:.3f}s, "
+            f"route by type {route_time:.3f}s per step"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import json
+import unittest
+import tracemalloc
+from datura.framing import (
+    COMPRESSION_THRESHOLD,
+    JSONFrameDecoder,
+    StreamCompression,
+    StreamEncoding,
+    StreamFraming,
+    encode_frame,
+    encode_framing_event,
+    msgpack,
+    negotiate_stream_format,
+)
+from datura.stream_budget import StreamMemoryBudget
+
+events = [
+    {"type": "text", "role": "intro", "content": 'He said "hi" \\ {not a brace} ü 🚀'},
+    {"type": "tweets", "content": [{"full_text": "}" * 5, "id": "1"}] * 20},
+    {"type": "completion", "content": "\\\\"},
+]
+stream = "".join(json.dumps(event, ensure_ascii=False) for event in events).encode(
+    "utf-8"
+)
+
+
+class JSONFrameDecoderTestCase(unittest.TestCase):
+    def feed_in_chunks(self, data, chunk_size):
+        decoder = JSONFrameDecoder()
+        objects = []
+        for i in range(0, len(data), chunk_size):
+            objects.extend(decoder.feed(data[i : i + chunk_size]))
+        return decoder, objects
+
+    def test_whole_stream(self):
+        _, objects = self.feed_in_chunks(stream, len(stream))
+        self.assertEqual(objects, events)
+
+    def test_every_chunk_size(self):
+        # Splits land inside strings, escapes and multi-byte characters.
+        for chunk_size in range(1, 40):
+            decoder, objects = self.feed_in_chunks(stream, chunk_size)
+            self.assertEqual(objects, events)
+            self.assertEqual(decoder.pending, 0)
+
+    def test_incomplete_frame_is_kept(self):
+        decoder = JSONFrameDecoder()
+        self.assertEqual(decoder.feed(b'{"type": "text", "content": "a'), [])
+        self.assertEqual(
+            decoder.feed(b'b"}'), [{"type": "text", "content": "ab"}]
+        )
+
+    def test_invalid_frame_is_skipped(self):
+        decoder = JSONFrameDecoder()
+        objects = decoder.feed(b'{"a": 1} \n{invalid}{"b": 2}')
+        self.assertEqual(objects, [{"a": 1}, {"b": 2}])
+
+    def test_negotiated_framings(self):
+        for framing in (StreamFraming.NDJSON, StreamFraming.LENGTH_PREFIXED):
+            framed = encode_framing_event(framing) + b"".join(
+                encode_frame(event, framing) for event in events
+            )
+
+            for chunk_size in (1, 7, len(framed)):
+                decoder, objects = self.feed_in_chunks(framed, chunk_size)
+                self.assertEqual(objects, events)
+                self.assertEqual(decoder.framing, framing)
+                self.assertEqual(decoder.pending, 0)
+
+    def test_unknown_framing_falls_back_to_concatenated(self):
+        decoder = JSONFrameDecoder()
+        objects = decoder.feed(b'{"type": "framing", "content": "xml"}{"a": 1}')
+        self.assertEqual(objects, [{"a": 1}])
+        self.assertEqual(decoder.framing, StreamFraming.CONCATENATED)
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_encoding(self):
+        framing, encoding, _ = negotiate_stream_format("ndjson", "msgpack")
+        self.assertEqual(framing, StreamFraming.LENGTH_PREFIXED)
+
+        framed = encode_framing_event(framing, encoding) + b"".join(
+            encode_frame(event, framing, encoding) for event in events
+        )
+
+        for chunk_size in (1, 7, len(framed)):
+            decoder, objects = self.feed_in_chunks(framed, chunk_size)
+            self.assertEqual(objects, events)
+            self.assertEqual(decoder.encoding, StreamEncoding.MSGPACK)
+
+    def test_raw_frames_are_passed_through(self):
+        decoder = JSONFrameDecoder(raw_frames=True)
+        frames = decoder.feed(stream + b'{"type": "text", invalid}')
+
+        self.assertEqual(
+            [frame.text for frame in frames[:-1]],
+            [json.dumps(event, ensure_ascii=False) for event in events],
+        )
+        self.assertEqual(
+            [frame.type for frame in frames], ["text", "tweets", "completion", "text"]
+        )
+        self.assertEqual([frame.data for frame in frames[:-1]], events)
+        self.assertIsNone(frames[-1].content)
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_type_is_read_without_decoding(self):
+        framing, encoding, _ = negotiate_stream_format(None, "msgpack")
+        decoder = JSONFrameDecoder(raw_frames=True)
+        frames = decoder.feed(
+            encode_framing_event(framing, encoding)
+            + b"".join(encode_frame(event, framing, encoding) for event in events)
+        )
+
+        self.assertEqual(
+            [frame.type for frame in frames], ["text", "tweets", "completion"]
+        )
+        self.assertFalse(any(frame._is_decoded for frame in frames))
+        self.assertEqual([frame.data for frame in frames], events)
+
+    def test_compressed_frames(self):
+        large_event = {"type": "search", "content": "x" * COMPRESSION_THRESHOLD}
+
+        for compression in (StreamCompression.GZIP, StreamCompression.ZSTD):
+            framing, encoding, compression = negotiate_stream_format(
+                None, "json", compression.value
+            )
+            framed = encode_framing_event(framing, encoding, compression) + b"".join(
+                encode_frame(event, framing, encoding, compression)
+                for event in events + [large_event]
+            )
+            self.assertLess(len(framed), COMPRESSION_THRESHOLD)
+
+            for chunk_size in (1, 7, len(framed)):
+                decoder, objects = self.feed_in_chunks(framed, chunk_size)
+                self.assertEqual(objects, events + [large_event])
+                self.assertEqual(decoder.pending, 0)
+
+    def test_compressed_frames_over_the_limit_are_dropped(self):
+        # A few kilobytes on the wire that would decompress to 10 MB.
+        bomb = {"type": "search", "content": "x" * 10**7}
+
+        for compression in (StreamCompression.GZIP, StreamCompression.ZSTD):
+            framing, encoding, compression = negotiate_stream_format(
+                None, "json", compression.value
+            )
+            framed = encode_framing_event(framing, encoding, compression) + b"".join(
+                encode_frame(event, framing, encoding, compression)
+                for event in [events[0], bomb, events[2]]
+            )
+            self.assertLess(len(framed), 10**5)
+
+            budget = StreamMemoryBudget(
+                max_frame_bytes=10**5, max_stream_bytes=0, max_step_bytes=0
+            )
+            decoder = JSONFrameDecoder(budget=budget)
+
+            tracemalloc.start()
+            objects = decoder.feed(framed)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            # Decompression stops as soon as the frame is over the limit.
+            self.assertLess(peak, 10**6)
+            self.assertEqual(objects, [events[0], events[2]])
+            self.assertEqual(decoder.dropped_frames, 1)
+
+    def test_oversized_frames_are_dropped(self):
+        large_event = {"type": "search", "content": "x" * 1000}
+
+        for framing in StreamFraming:
+            framed = b"".join(
+                encode_frame(event, framing)
+                for event in [events[0], large_event, events[2]]
+            )
+
+            if framing != StreamFraming.CONCATENATED:
+                framed = encode_framing_event(framing) + framed
+
+            for chunk_size in (1, 7, len(framed)):
+                budget = StreamMemoryBudget(
+                    max_frame_bytes=900, max_stream_bytes=0, max_step_bytes=0
+                )
+                decoder = JSONFrameDecoder(budget=budget)
+                objects = []
+                for i in range(0, len(framed), chunk_size):
+                    objects.extend(decoder.feed(framed[i : i + chunk_size]))
+                    self.assertLessEqual(decoder.pending, 900 + 16)
+
+                self.assertEqual(objects, [events[0], events[2]])
+                self.assertEqual(decoder.dropped_frames, 1)
+
+    def test_frames_over_budget_are_spilled(self):
+        budget = StreamMemoryBudget(
+            max_frame_bytes=10**6,
+            max_stream_bytes=10**6,
+            max_step_bytes=1000,
+            spill_min_bytes=100,
+        )
+        decoder = JSONFrameDecoder(raw_frames=True, budget=budget)
+        large_events = [{"type": "search", "content": str(i) * 600} for i in range(3)]
+        frames = decoder.feed(b"".join(json.dumps(e).encode() for e in large_events))
+
+        self.assertEqual([frame.data for frame in frames], large_events)
+        self.assertEqual(budget.spilled_frames, 2)
+        self.assertNotIsInstance(frames[1].raw, bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
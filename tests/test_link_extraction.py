@@ -0,0 +1,52 @@
+import unittest
+from datura.services.link_extraction import (
+    extract_markdown_links,
+    find_twitter_links,
+    get_link_domain,
+)
+from datura.services.twitter_utils import TwitterUtils
+from datura.services.web_search_utils import WebSearchUtils
+
+summary = (
+    "See [a thread](https://www.reddit.com/r/python/comments/1) and "
+    "[HN](https://news.ycombinator.com/item?id=2), [paper](https://arxiv.org/abs/1) "
+    "[not reddit](https://notreddit.com/r/x) [evil](https://reddit.com.evil.io/x) "
+    "[root](https://reddit.com/) [wiki](https://en.wikipedia.org/wiki/Python) "
+    "[video](https://youtube.com/watch?v=1) [other](https://example.com/page) "
+    "[bare](https://arxiv.org) https://x.com/user/status/123 "
+    "[tweet](https://twitter.com/user/status/456)"
+)
+
+
+class TestLinkExtraction(unittest.TestCase):
+    def test_matches_web_search_utils(self):
+        links, links_by_domain = extract_markdown_links(summary)
+
+        self.assertEqual(links, WebSearchUtils.find_links(summary))
+
+        for domain in [
+            "reddit.com",
+            "news.ycombinator.com",
+            "wikipedia.org",
+            "arxiv.org",
+            "youtube.com",
+        ]:
+            self.assertEqual(
+                links_by_domain.get(domain, []),
+                WebSearchUtils.find_links_by_domain(summary, domain),
+            )
+
+    def test_link_domains(self):
+        self.assertEqual(get_link_domain("https://old.reddit.com/r/x"), "reddit.com")
+        self.assertIsNone(get_link_domain("https://notreddit.com/r/x"))
+        self.assertIsNone(get_link_domain("https://ycombinator.com/companies"))
+        self.assertIsNone(get_link_domain("https://example.com/page"))
+
+    def test_twitter_links(self):
+        self.assertEqual(
+            find_twitter_links(summary), TwitterUtils().find_twitter_links(summary)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import asyncio
+import unittest
+import tracemalloc
+from types import SimpleNamespace
+from datura.protocol import ScraperStreamingSynapse
+from datura.stream import collect_generator_results
+from datura.stream_budget import StreamMemoryBudget
+
+FRAME_SIZE = 4 * 1024 * 1024
+
+
+class FakeContent:
+    def __init__(self, data, chunk_size):
+        self.data = data
+        self.chunk_size = chunk_size
+
+    async def iter_any(self):
+        for i in range(0, len(self.data), self.chunk_size):
+            yield self.data[i : i + self.chunk_size]
+
+
+async def dendrite_stream(synapse, data):
+    response = SimpleNamespace(
+        real_url=SimpleNamespace(host="127.0.0.1", port=8091),
+        content=FakeContent(data, chunk_size=64 * 1024),
+    )
+
+    async for chunk in synapse.process_streaming_response(response):
+        yield chunk
+
+    yield synapse
+
+
+class StreamTestCase(unittest.TestCase):
+    def test_spilled_frames_are_not_copied(self):
+        events = [
+            {"type": "text", "content": "Hello"},
+            {"type": "reddit_search", "content": {"data": "x" * FRAME_SIZE}},
+        ]
+        data = b"".join(json.dumps(event).encode() for event in events)
+
+        budget = StreamMemoryBudget(
+            max_frame_bytes=2 * FRAME_SIZE,
+            max_stream_bytes=2 * FRAME_SIZE,
+            max_step_bytes=0,
+            spill_min_bytes=1024,
+        )
+        synapse = ScraperStreamingSynapse(messages="", model="", seed=1)
+        synapse.set_memory_budget(budget)
+
+        tracemalloc.start()
+        # Consumers such as the organic stream keep the forwarded chunks.
+        chunks = asyncio.run(collect_generator_results(dendrite_stream(synapse, data)))
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertIs(chunks[-1], synapse)
+        self.assertEqual(budget.spilled_frames, 1)
+        # The receive buffer and the frame copied out of it, the spilled frame is not copied again.
+        self.assertLess(peak, 2.5 * FRAME_SIZE)
+        self.assertLess(current, FRAME_SIZE / 4)
+        self.assertEqual(chunks[1].data, events[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
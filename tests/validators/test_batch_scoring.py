@@ -0,0 +1,98 @@
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+from neurons.validators.reward.reward_llm import RewardLLM
+from neurons.validators.utils.llm_score_cache import LLMScoreCache
+from neurons.validators.utils.prompts import BatchLinkContentPrompt, LinkContentPrompt
+
+
+class FakeScoringClient:
+    def __init__(self):
+        self.requests = []
+
+    async def complete(self, messages, response_format=None, **kwargs):
+        self.requests.append(messages)
+
+        if response_format is None:
+            return "Score: 2, Explanation: single"
+
+        # The second content is left out of the batch output.
+        return json.dumps({"scores": {"1": 9, "2": "high", "3": 5}})
+
+
+def get_messages(prompt, contents):
+    scoring_prompt = LinkContentPrompt()
+    return [
+        {
+            key: [
+                {"role": "system", "content": scoring_prompt.get_system_message()},
+                {"role": "user", "content": scoring_prompt.text(prompt, content)},
+            ]
+        }
+        for key, content in contents.items()
+    ]
+
+
+class BatchScoringTestCase(unittest.TestCase):
+    def test_extract_scores(self):
+        prompt = BatchLinkContentPrompt()
+
+        self.assertEqual(
+            prompt.extract_scores('{"scores": {"1": 9, "2": 11, "3": true, "4": 5}}'),
+            {"1": 9.0, "4": 5.0},
+        )
+        self.assertEqual(prompt.extract_scores("Score: 9"), {})
+        self.assertEqual(prompt.extract_scores('["scores"]'), {})
+
+    def test_malformed_items_are_scored_one_by_one(self):
+        scoring_client = FakeScoringClient()
+        reward_llm = RewardLLM(scoring_client=scoring_client)
+        contents = {"a": "first", "b": "second", "c": "third"}
+
+        responses = asyncio.run(
+            reward_llm.llm_batch_processing(
+                "question",
+                contents,
+                get_messages("question", contents),
+                batch_size=10,
+            )
+        )
+
+        self.assertEqual(len(scoring_client.requests), 2)
+        self.assertEqual(list(responses), ["a", "b", "c"])
+        self.assertEqual(responses["a"], "Score: 9")
+        self.assertEqual(responses["b"], "Score: 2, Explanation: single")
+        self.assertEqual(LinkContentPrompt().extract_score(responses["c"]), 5)
+
+    def test_batched_scores_are_not_cached_as_single_scores(self):
+        path = os.path.join(tempfile.mkdtemp(), "llm_score_cache.sqlite")
+        scoring_client = FakeScoringClient()
+        reward_llm = RewardLLM(
+            score_cache=LLMScoreCache(path, max_entries=10),
+            scoring_client=scoring_client,
+        )
+        contents = {"a": "first"}
+        messages = get_messages("question", contents)
+
+        for _ in range(2):
+            responses = asyncio.run(
+                reward_llm.llm_batch_processing(
+                    "question", contents, messages, batch_size=10
+                )
+            )
+            self.assertEqual(responses["a"], "Score: 9")
+
+        # The second batch is served from the cache.
+        self.assertEqual(len(scoring_client.requests), 1)
+
+        # With a batch size of 1 the single message is sent, it never produced that score.
+        responses = asyncio.run(reward_llm.get_score_by_openai(messages))
+
+        self.assertEqual(responses["a"], "Score: 2, Explanation: single")
+        self.assertEqual(len(scoring_client.requests), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import asyncio
+import unittest
+import bittensor as bt
+from neurons.validators.utils.hedging import HedgedStream
+
+
+def text_event(content):
+    return json.dumps({"type": "text", "content": content})
+
+
+class HedgedStreamTestCase(unittest.TestCase):
+    def test_losing_chunks_are_dropped(self):
+        final_synapses = [bt.Synapse(), bt.Synapse()]
+        final_synapses[0].dendrite.status_code = 200
+        winner_done = asyncio.Event()
+
+        async def winner():
+            # Slower than the hedge delay, the second miner is queried meanwhile.
+            await asyncio.sleep(0.05)
+            yield json.dumps({"type": "search", "content": {}})
+            yield text_event("Hello")
+            yield final_synapses[0]
+
+        async def loser():
+            await winner_done.wait()
+
+            for index in range(100):
+                yield text_event(str(index))
+
+            yield final_synapses[1]
+
+        streams = [(1, winner()), (2, loser())]
+
+        async def launch():
+            return streams.pop(0) if streams else None
+
+        async def run():
+            hedged_stream = HedgedStream(launch, hedge_delay=0.01, max_streams=2)
+            chunks = []
+            async for chunk in hedged_stream.stream():
+                chunks.append(chunk)
+
+            is_complete = hedged_stream.is_complete
+            winner_done.set()
+            uids, synapses = await hedged_stream.collect()
+            return hedged_stream, chunks, is_complete, uids, synapses
+
+        hedged_stream, chunks, is_complete, uids, synapses = asyncio.run(run())
+
+        self.assertEqual(len(chunks), 2)
+        self.assertTrue(is_complete)
+        self.assertEqual(uids, [1, 2])
+        self.assertEqual(synapses, final_synapses)
+        self.assertEqual(hedged_stream.chunks, [])
+        # Only the end of the losing stream was queued.
+        self.assertEqual(hedged_stream.queue.qsize(), 1)
+
+    def test_failed_winner_is_not_complete(self):
+        async def failing():
+            yield text_event("Hello")
+            raise RuntimeError("Connection lost")
+
+        streams = [(1, failing())]
+
+        async def launch():
+            return streams.pop(0) if streams else None
+
+        async def run():
+            hedged_stream = HedgedStream(launch, hedge_delay=0, max_streams=1)
+            chunks = [chunk async for chunk in hedged_stream.stream()]
+            return hedged_stream, chunks
+
+        hedged_stream, chunks = asyncio.run(run())
+
+        self.assertEqual(len(chunks), 1)
+        self.assertFalse(hedged_stream.is_complete)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from neurons.validators.utils.latency_tracker import LatencyTracker, is_cut_off
+
+
+def create_response(status_code, process_time, timeout, hotkey="hotkey"):
+    return SimpleNamespace(
+        dendrite=SimpleNamespace(status_code=status_code, process_time=process_time),
+        axon=SimpleNamespace(hotkey=hotkey),
+        timeout=timeout,
+    )
+
+
+class LatencyTrackerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "latency_histograms.json")
+
+    def test_cut_off_responses(self):
+        self.assertTrue(is_cut_off(create_response(408, None, 30), full_timeout=180))
+        self.assertFalse(is_cut_off(create_response(408, None, 180), full_timeout=180))
+        self.assertFalse(is_cut_off(create_response(200, 12.0, 30), full_timeout=180))
+
+    def test_histograms_are_saved_from_snapshots(self):
+        tracker = LatencyTracker(self.path)
+        tracker.record_responses(
+            [1, 2],
+            [create_response(200, 12.0, 30), create_response(408, None, 30)],
+            full_timeout=180,
+        )
+
+        # Recording does not write to disk, the cut off response is not recorded.
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(list(tracker.histograms), [1])
+
+        tracker.save(tracker.snapshot())
+
+        self.assertIsNone(tracker.snapshot())
+        self.assertEqual(list(LatencyTracker(self.path).histograms), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
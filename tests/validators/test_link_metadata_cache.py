@@ -0,0 +1,46 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from neurons.validators.utils.link_metadata_cache import LinkMetadataCache
+
+
+class LinkMetadataCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "link_metadata_cache.sqlite")
+        self.scraped_urls = []
+
+    async def scrape(self, urls):
+        self.scraped_urls.extend(urls)
+        await asyncio.sleep(0.01)
+
+        return [{"url": url, "title": url} for url in urls if "broken" not in url], [
+            url for url in urls if "broken" in url
+        ]
+
+    def test_links_are_scraped_once(self):
+        cache = LinkMetadataCache(self.path, ttl=60, failure_ttl=60)
+        urls = ["https://en.wikipedia.org/wiki/Python", "https://broken.com/page"]
+
+        async def run():
+            # Two steps running concurrently, then a later step.
+            await asyncio.gather(
+                cache.fetch(urls, self.scrape), cache.fetch(urls, self.scrape)
+            )
+            return await cache.fetch(urls, self.scrape)
+
+        links_with_metadata, non_fetched_links = asyncio.run(run())
+
+        self.assertEqual(self.scraped_urls, urls)
+        self.assertEqual([link["url"] for link in links_with_metadata], urls[:1])
+        self.assertEqual(non_fetched_links, urls[1:])
+
+    def test_domain_ttl(self):
+        cache = LinkMetadataCache(self.path, ttl=60, failure_ttl=60)
+
+        self.assertGreater(cache.get_ttl("https://arxiv.org/abs/1"), 60)
+        self.assertEqual(cache.get_ttl("https://example.com/page"), 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
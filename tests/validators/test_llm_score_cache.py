@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from neurons.validators.utils.llm_score_cache import LLMScoreCache, get_score_key
+
+messages = [
+    {"role": "system", "content": "Score the content."},
+    {"role": "user", "content": "<Question>Q</Question><Answer>A</Answer>"},
+]
+
+
+class LLMScoreCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "llm_score_cache.sqlite")
+
+    def test_scores_are_read_back_from_disk(self):
+        key = get_score_key("gpt-3.5-turbo-0125", messages)
+        LLMScoreCache(self.path, max_entries=10).set(key, "Score: 8")
+
+        cache = LLMScoreCache(self.path, max_entries=10)
+
+        self.assertEqual(cache.get(key), "Score: 8")
+        self.assertIsNone(cache.get(get_score_key("gpt-4", messages)))
+
+    def test_prompt_template_change_invalidates_scores(self):
+        key = get_score_key("gpt-3.5-turbo-0125", messages)
+        LLMScoreCache(self.path, max_entries=10, version="1").set(key, "Score: 8")
+
+        cache = LLMScoreCache(self.path, max_entries=10, version="2")
+
+        self.assertIsNone(cache.get(key))
+
+    def test_lru_and_stats(self):
+        cache = LLMScoreCache(self.path, max_entries=2)
+
+        for index in range(3):
+            cache.set(str(index), "Score: 5")
+
+        self.assertEqual(list(cache.entries), ["1", "2"])
+
+        cache.record("twitter_content_relevance", messages, "Score: 5")
+        cache.record("twitter_content_relevance", messages, None)
+        stats = cache.get_stats()["reward_models"]["twitter_content_relevance"]
+
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertGreater(stats["saved_tokens"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,26 @@
+import asyncio
+import unittest
+from datura import QUERY_MINERS
+from neurons.validators.scheduler import SyntheticQueryScheduler
+
+
+class SyntheticQuerySchedulerTestCase(unittest.TestCase):
+    def test_failed_steps_are_counted(self):
+        async def run_step(strategy):
+            raise RuntimeError("No miner responded")
+
+        async def run():
+            scheduler = SyntheticQueryScheduler(run_step=run_step, step_timeout=1)
+            scheduler.add_strategy(QUERY_MINERS.RANDOM, interval=0.01, concurrency=1)
+            await asyncio.sleep(0.05)
+            scheduler.stop()
+            return scheduler.get_metrics()[0]
+
+        metrics = asyncio.run(run())
+
+        self.assertGreater(metrics["failed"], 0)
+        self.assertEqual(metrics["finished"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
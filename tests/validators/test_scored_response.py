@@ -0,0 +1,21 @@
+import json
+import unittest
+from datura.framing import Frame, StreamEncoding
+from neurons.validators.utils.scored_response import ScoredResponse
+
+
+class ScoredResponseTestCase(unittest.TestCase):
+    def test_tool_results_are_not_cached(self):
+        content = {"data": [{"title": "Bittensor"}]}
+        raw = json.dumps({"type": "reddit_search", "content": content}).encode()
+        frame = Frame(raw, StreamEncoding.JSON)
+        response = ScoredResponse(tool_result_frames={"reddit_search": frame})
+
+        self.assertEqual(response.reddit_search_results, content)
+        self.assertEqual(response.hacker_news_search_results, {})
+        # Only the raw frame stays in memory.
+        self.assertIsNone(frame._data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import httpx
+import asyncio
+import unittest
+from types import SimpleNamespace
+from openai import BadRequestError, RateLimitError
+from neurons.validators.utils.scoring_client import (
+    ScoringClient,
+    TokenBucket,
+    parse_duration,
+)
+
+messages = [{"role": "user", "content": "Score the content."}]
+request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+class FakeCompletions:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+
+        if self.errors:
+            raise self.errors.pop(0)
+
+        completion = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Score: 8"))]
+        )
+        return SimpleNamespace(
+            headers={
+                "x-ratelimit-limit-requests": "600",
+                "x-ratelimit-remaining-requests": "599",
+                "x-ratelimit-reset-requests": "100ms",
+            },
+            parse=lambda: completion,
+        )
+
+
+def create_client(errors, **kwargs):
+    completions = FakeCompletions(errors)
+    client = SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(with_raw_response=completions)
+        )
+    )
+    return ScoringClient(client=client, backoff_base=0.01, **kwargs), completions
+
+
+class ScoringClientTestCase(unittest.TestCase):
+    def setUp(self):
+        os.environ.setdefault("OPENAI_API_KEY", "test")
+
+    def test_rate_limited_requests_are_retried(self):
+        rate_limited = RateLimitError(
+            "Rate limit reached",
+            response=httpx.Response(
+                429, headers={"retry-after": "0.01"}, request=request
+            ),
+            body=None,
+        )
+        scoring_client, completions = create_client(
+            [rate_limited], max_concurrency=2
+        )
+
+        async def run():
+            stats = scoring_client.start_step()
+            response = await scoring_client.complete(messages, model="gpt")
+            return response, stats
+
+        response, stats = asyncio.run(run())
+
+        self.assertEqual(response, "Score: 8")
+        self.assertEqual(completions.calls, 2)
+        self.assertEqual(stats.retries, 1)
+        self.assertEqual(stats.rate_limited, 1)
+        self.assertEqual(len(stats.latencies), 1)
+        # The limit of requests is learned from the headers.
+        self.assertEqual(scoring_client.requests_bucket.capacity, 600)
+
+    def test_invalid_requests_are_dropped(self):
+        bad_request = BadRequestError(
+            "Invalid request",
+            response=httpx.Response(400, request=request),
+            body=None,
+        )
+        scoring_client, completions = create_client([bad_request], max_concurrency=2)
+
+        response = asyncio.run(scoring_client.complete(messages, model="gpt"))
+
+        self.assertIsNone(response)
+        self.assertEqual(completions.calls, 1)
+        self.assertEqual(scoring_client.stats.dropped, 1)
+
+    def test_empty_bucket_waits_for_reset(self):
+        bucket = TokenBucket(per_minute=600)
+        bucket.update(limit=600, remaining=0, reset=parse_duration("50ms"))
+
+        waited = asyncio.run(bucket.acquire(1))
+
+        self.assertGreater(waited, 0.1)
+        self.assertEqual(parse_duration("6m0s"), 360)
+
+
+if __name__ == "__main__":
+    unittest.main()
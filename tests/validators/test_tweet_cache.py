@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+from datura.protocol import TwitterScraperTweet
+from neurons.validators.utils.tweet_cache import TweetCache
+
+
+class TweetCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "tweet_cache.sqlite")
+
+    def test_cached_tweets_survive_restarts(self):
+        cache = TweetCache(self.path, ttl=60)
+        cache.set_many([TwitterScraperTweet(id="1", full_text="hello")])
+
+        tweets = TweetCache(self.path, ttl=60).get_many(["1", "2"])
+
+        self.assertEqual(list(tweets), ["1"])
+        self.assertEqual(tweets["1"].full_text, "hello")
+
+    def test_expired_tweets_are_misses(self):
+        cache = TweetCache(self.path, ttl=60)
+        cache.set_many([TwitterScraperTweet(id="1", full_text="hello")])
+        cache.connection.execute("UPDATE tweets SET fetched_at = 0")
+
+        self.assertEqual(cache.get_many(["1"]), {})
+        self.assertEqual(cache.get_stats()["hit_rate"], 0)
+
+    def test_disabled_cache_counts_apify_runs(self):
+        cache = TweetCache(self.path, ttl=0)
+        cache.set_many([TwitterScraperTweet(id="1")])
+        cache.record_apify_run(1)
+
+        self.assertEqual(cache.get_many(["1"]), {})
+        self.assertEqual(cache.get_stats()["apify_runs"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()